@@ -1,33 +1,216 @@
-from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for
-import pandas as pd
-import json
+from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for, Response, stream_with_context
 import os
 from datetime import datetime
-from scraper.rainmeter_scraper import RainmeterScraper
+from scraper.rainmeter_scraper import RainmeterScraper, ENGINES
+from scraper.dataset_index import DatasetIndex
+from scraper.dataset_store import DatasetStore
+from scraper.dataset_cache import DatasetCache
+from scraper.html_parser import PARSERS, DEFAULT_PARSER
+from scraper.parse_pool import DEFAULT_PARSE_WORKERS
+from scraper.progress_events import ProgressBroadcaster, DEFAULT_MAX_RATE
+from scraper.metrics import CrawlMetrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from scraper.job_manager import JobManager, JobQueueFull, initial_status, QUEUED, CANCELLED, FAILED
+from scraper.record_sink import export_csv, export_json
+from scraper.rate_limiter import HostRateLimiter
+import re
 import threading
-import time
 
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-here'
 
-# Global variables for scraping status
-scraping_status = {
-    'is_running': False,
-    'progress': 0,
-    'current_task': 'Ready to start',
-    'total_found': 0,
-    'scraped_count': 0,
-    'discovered_count': 0,
-    'discovery_complete': False,
-    'errors': [],
-    'start_time': None,
-    'estimated_time': None,
-    'scraping_rate': 0,  # skins per minute
-    'discovery_rate': 0  # URLs per minute
-}
-
-scraper_instance = None
-scraper_thread = None
+# Scrape jobs: at most MAX_RUNNING_JOBS crawl at once, MAX_QUEUED_JOBS more may wait for a slot
+MAX_RUNNING_JOBS = int(os.environ.get('SCRAPER_MAX_JOBS', 1))
+MAX_QUEUED_JOBS = int(os.environ.get('SCRAPER_JOB_QUEUE', 10))
+JOBS_DIR = 'data/jobs'
+# Politeness budget per host shared by all running jobs; a job's own delay can only slow it down further
+site_rate_limiter = HostRateLimiter.from_delay(float(os.environ.get('SCRAPER_DELAY', 1)),
+                                               burst=int(os.environ.get('SCRAPER_BURST', 1)))
+# Shared by every run so counters keep increasing for Prometheus; queue and pool gauges sum the running jobs
+crawl_metrics = CrawlMetrics()
+
+# Dataset served by the API; CSV and JSON are export formats only
+DATASET_PREFIX = 'data/rainmeter_skins'
+dataset_store = DatasetStore(f'{DATASET_PREFIX}.db')
+# Loaded once and shared by all requests until the store changes
+dataset_cache = DatasetCache(dataset_store)
+# Jobs finishing together publish into the dataset one at a time
+publish_lock = threading.Lock()
+
+def get_dataset():
+    """Cached dataset snapshot, importing an older run's CSV/JSON export when there is no store"""
+    if not dataset_store.exists():
+        index = DatasetIndex.load(DATASET_PREFIX)
+        if len(index):
+            dataset_store.replace(index.records.values())
+    return dataset_cache.snapshot()
+
+def live_progress():
+    """Progress of the current job (the newest running one), or an idle status when there is none"""
+    job = job_manager.current()
+    return job.progress() if job else initial_status()
+
+def requested_job():
+    """The job named by ?job_id= (or a JSON body's job_id), else the current one; returns (job, error response)"""
+    job_id = request.args.get('job_id') or (request.get_json(silent=True) or {}).get('job_id')
+    if not job_id:
+        return job_manager.current(), None
+    job = job_manager.get(job_id)
+    if job is None:
+        return None, (jsonify({'error': f'Unknown job {job_id}'}), 404)
+    return job, None
+
+# Pushes coalesced progress deltas to /api/scraping_events subscribers
+progress_events = ProgressBroadcaster(live_progress)
+
+def parse_job_params(data):
+    """Validate the scrape parameters of a request body; raises ValueError or TypeError"""
+    max_pages = data.get('max_pages', None)
+    parse_workers = data.get('parse_workers')  # Parser processes, one per core by default
+    categories = data.get('categories') or []
+    if isinstance(categories, str):
+        categories = [category for category in categories.split(',') if category.strip()]
+    
+    params = {
+        'max_pages': int(max_pages) if max_pages else None,
+        'delay': float(data.get('delay', 1)),
+        'burst': int(data.get('burst', 1)),
+        'max_workers': int(data.get('max_workers', 8)),
+        'parse_workers': DEFAULT_PARSE_WORKERS if parse_workers is None else int(parse_workers),
+        'engine': data.get('engine', 'threads'),
+        'concurrency': int(data.get('concurrency', 100)),
+        'parser': data.get('parser', DEFAULT_PARSER),
+        'use_cache': bool(data.get('use_cache', True)),
+        'incremental': bool(data.get('incremental', False)),
+        'max_age_days': float(data.get('max_age_days', 7)),
+        'use_sitemaps': bool(data.get('use_sitemaps', True)),
+        'categories': [category.strip().strip('/') for category in categories],
+        'resume_from': None
+    }
+    
+    if params['engine'] not in ENGINES:
+        raise ValueError(f"unknown engine '{params['engine']}'")
+    if params['parser'] not in PARSERS:
+        raise ValueError(f"unknown parser '{params['parser']}'")
+    if params['parse_workers'] < 0:
+        raise ValueError("parse_workers must be 0 or more")
+    for category in params['categories']:
+        if not re.fullmatch(r'[\w-]+', category):
+            raise ValueError(f"invalid category '{category}'")
+    
+    # resume: true continues the newest stopped or failed job, or pass that job's id
+    resume = data.get('resume', False)
+    if resume:
+        if resume is True:
+            stopped = [job for job in job_manager.jobs() if job.state in (CANCELLED, FAILED)]
+            if not stopped:
+                raise ValueError("there is no stopped job to resume")
+            resume = stopped[0].id
+        if not re.fullmatch(r'[0-9a-f]+', str(resume)) or not os.path.isdir(os.path.join(JOBS_DIR, resume)):
+            raise ValueError(f"unknown job '{resume}'")
+        if any(job.output_dir == os.path.join(JOBS_DIR, resume) for job in job_manager.active_jobs()):
+            raise ValueError(f"job '{resume}' is still active")
+        params['resume_from'] = resume
+    return params
+
+def run_scrape_job(job):
+    """Crawl with the job's parameters and publish the records into the dataset served by the API"""
+    params = job.params
+    os.makedirs(job.output_dir, exist_ok=True)
+    scraper = RainmeterScraper(
+        delay=params['delay'], 
+        burst=params['burst'], 
+        max_workers=params['max_workers'], 
+        parse_workers=params['parse_workers'], 
+        use_sitemaps=params['use_sitemaps'], 
+        engine=params['engine'], 
+        concurrency=params['concurrency'], 
+        parser=params['parser'], 
+        cache_dir='data/http_cache' if params['use_cache'] else None,
+        checkpoint_path=job.outputs['checkpoint'],
+        categories=params['categories'],
+        metrics=crawl_metrics,
+        shared_rate_limiter=site_rate_limiter
+    )
+    scraper.progress_listener = job.notify
+    job.scraper = scraper
+    if job.cancel_requested:
+        scraper.cancel('Stopped by user')
+    
+    job.update(current_task='Starting parallel discovery and scraping...', progress=5)
+    
+    # Incremental and category crawls only cover part of the site, so they are merged
+    # into the dataset; a category crawl refetches all of its skins unless incremental
+    merge = params['incremental'] or bool(params['categories'])
+    scraper.scrape_all_skins_parallel(
+        max_pages=params['max_pages'], 
+        incremental=merge, 
+        max_age_days=params['max_age_days'] if params['incremental'] else 0, 
+        dataset_prefix=job.dataset_prefix, 
+        index_prefix=DATASET_PREFIX, 
+        resume=bool(params['resume_from'])
+    )
+    
+    if job.cancel_requested:
+        job.update(current_task='Stopped by user')
+        return
+    if scraper.interrupted:
+        # Publishing a partial crawl would replace the served dataset; its journal is kept for resume instead
+        raise RuntimeError(f"Crawl interrupted after {len(scraper.scraped_data)} skins. "
+                           f"Resume job {job.id} to finish it")
+    
+    job.update(current_task='Cleaning and saving data...', progress=95)
+    
+    scraper.clean_data()
+    scraper.remove_duplicates()
+    job.stats = {**scraper.get_stats(), 'published': publish_records(scraper.scraped_data, merge),
+                 'dataset': dataset_store.path}
+    
+    job.update(current_task='Completed!', progress=100)
+
+def publish_records(records, merge):
+    """Write a finished job's records to the dataset store and its exports; returns the skins saved"""
+    if not records:
+        return 0
+    
+    with publish_lock:
+        if merge:
+            # Another job may have published since this one loaded the dataset: keep the newest copy of each skin
+            records = DatasetIndex.load(DATASET_PREFIX).merge_newest(records).records.values()
+        count = dataset_store.replace(records)
+        dataset_cache.invalidate()
+        export_csv(dataset_store.records(), f'{DATASET_PREFIX}.csv')
+        export_json(dataset_store.records(), f'{DATASET_PREFIX}.json')
+    return count
+
+job_manager = JobManager(run_scrape_job, max_running=MAX_RUNNING_JOBS, max_queued=MAX_QUEUED_JOBS,
+                         output_root=JOBS_DIR, on_change=progress_events.notify)
+
+def submit_job(data):
+    """Create a job from a request body; returns (job, None) or (None, error response)"""
+    try:
+        params = parse_job_params(data)
+    except (ValueError, TypeError) as e:
+        return None, (jsonify({'error': f'Invalid parameters: {str(e)}'}), 400)
+    
+    output_dir = os.path.join(JOBS_DIR, params['resume_from']) if params['resume_from'] else None
+    try:
+        return job_manager.submit(params, output_dir=output_dir), None
+    except JobQueueFull as e:
+        return None, (jsonify({'error': str(e)}), 429)
+
+def event_stream(broadcaster):
+    """Server-Sent Events response for a progress broadcaster, honoring ?max_rate="""
+    try:
+        max_rate = float(request.args.get('max_rate', DEFAULT_MAX_RATE))
+    except ValueError:
+        return jsonify({'error': 'max_rate must be a number'}), 400
+    max_rate = min(max(max_rate, 0.1), 20.0)
+    
+    return Response(
+        stream_with_context(broadcaster.events(max_rate)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
 @app.route('/')
 def index():
@@ -46,203 +229,118 @@ def viewer_page():
 
 @app.route('/api/start_scraping', methods=['POST'])
 def start_scraping():
-    """Start the scraping process"""
-    global scraping_status, scraper_instance, scraper_thread
-    
-    if scraping_status['is_running']:
-        return jsonify({'error': 'Scraping is already in progress'}), 400
+    """Queue a scrape job; it starts right away when a job slot is free"""
+    job, error = submit_job(request.get_json() or {})
+    if error:
+        return error
     
-    # Get parameters from request
-    try:
-        data = request.get_json() or {}
-        max_pages = data.get('max_pages', None)
-        delay = float(data.get('delay', 1))
-        max_workers = int(data.get('max_workers', 8))  # New parameter for thread count
-        
-        if max_pages:
-            max_pages = int(max_pages)
-            
-    except (ValueError, TypeError) as e:
-        return jsonify({'error': f'Invalid parameters: {str(e)}'}), 400
-    
-    # Reset status
-    scraping_status = {
-        'is_running': True,
-        'progress': 0,
-        'current_task': 'Initializing parallel scraper...',
-        'total_found': 0,
-        'scraped_count': 0,
-        'discovered_count': 0,
-        'discovery_complete': False,
-        'errors': [],
-        'start_time': datetime.now().isoformat(),
-        'estimated_time': None,
-        'scraping_rate': 0,
-        'discovery_rate': 0
-    }
-    
-    # Start scraping in background thread
-    def run_parallel_scraper():
-        global scraper_instance, scraping_status
-        try:
-            scraper_instance = RainmeterScraper(delay=delay, max_workers=max_workers)
-            
-            scraping_status['current_task'] = 'Starting parallel discovery and scraping...'
-            scraping_status['progress'] = 5
-            
-            start_time = time.time()
-            last_update_time = start_time
-            last_discovered = 0
-            last_scraped = 0
-            
-            # Start parallel scraping
-            scraper_instance.scrape_all_skins_parallel(max_pages=max_pages)
-            
-            if not scraping_status['is_running']:
-                scraping_status['current_task'] = 'Stopped by user'
-                return
-            
-            scraping_status['current_task'] = 'Cleaning and saving data...'
-            scraping_status['progress'] = 95
-            
-            scraper_instance.clean_data()
-            scraper_instance.remove_duplicates()
-            
-            # Ensure data directory exists
-            os.makedirs('data', exist_ok=True)
-            
-            scraper_instance.save_to_csv('data/rainmeter_skins.csv')
-            scraper_instance.save_to_json('data/rainmeter_skins.json')
-            
-            scraping_status['current_task'] = 'Completed!'
-            scraping_status['progress'] = 100
-            
-            # Final statistics
-            final_stats = scraper_instance.get_progress_stats()
-            scraping_status['scraped_count'] = final_stats['scraped_count']
-            scraping_status['discovered_count'] = final_stats['discovered_count']
-            
-        except Exception as e:
-            scraping_status['errors'].append(str(e))
-            scraping_status['current_task'] = f'Error: {str(e)}'
-        finally:
-            scraping_status['is_running'] = False
-    
-    scraper_thread = threading.Thread(target=run_parallel_scraper)
-    scraper_thread.daemon = True
-    scraper_thread.start()
+    message = 'Parallel scraping started successfully' if job.state != QUEUED else \
+        f'Scraping job queued behind {len(job_manager.active_jobs()) - 1} other job(s)'
+    return jsonify({'message': message, 'job_id': job.id, 'state': job.state})
+
+@app.route('/api/jobs', methods=['GET', 'POST'])
+def jobs():
+    """List all jobs, newest first, or create a job from the same parameters as /api/start_scraping"""
+    if request.method == 'POST':
+        job, error = submit_job(request.get_json() or {})
+        if error:
+            return error
+        return jsonify(job.to_dict()), 201
     
-    return jsonify({'message': 'Parallel scraping started successfully'})
+    return jsonify({
+        'jobs': [job.to_dict() for job in job_manager.jobs()],
+        'max_running': job_manager.max_running,
+        'max_queued': job_manager.max_queued
+    })
+
+@app.route('/api/jobs/<job_id>')
+def job_detail(job_id):
+    """Status, stats and output paths of one job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': f'Unknown job {job_id}'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Cancel a queued job or stop a running one"""
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return jsonify({'error': f'Unknown job {job_id}'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/jobs/<job_id>/events')
+def job_events(job_id):
+    """Server-Sent Events stream of one job's progress"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': f'Unknown job {job_id}'}), 404
+    return event_stream(job.events)
 
 @app.route('/api/scraping_status')
 def get_scraping_status():
-    """Get current scraping status with enhanced parallel information"""
-    global scraper_instance, scraping_status
-    
-    # If scraper is running, get live stats
-    if scraper_instance and scraping_status['is_running']:
-        try:
-            live_stats = scraper_instance.get_progress_stats()
-            scraping_status.update({
-                'discovered_count': live_stats['discovered_count'],
-                'scraped_count': live_stats['scraped_count'],
-                'discovery_complete': live_stats['discovery_complete'],
-                'failed_count': live_stats.get('failed_count', 0)
-            })
-        except:
-            pass  # Continue with cached status if live update fails
-    
-    return jsonify(scraping_status)
+    """Scraping status of the job given by ?job_id=, or of the current job when none is given"""
+    job, error = requested_job()
+    if error:
+        return error
+    return jsonify(job.progress() if job else initial_status())
+
+@app.route('/api/scraping_events')
+def scraping_events():
+    """SSE stream of scraping progress (?job_id= for one job, else whichever job is current)"""
+    if request.args.get('job_id'):
+        return job_events(request.args['job_id'])
+    return event_stream(progress_events)
+
+@app.route('/metrics')
+def metrics():
+    """Crawl metrics in the Prometheus text format"""
+    return Response(crawl_metrics.render(), content_type=METRICS_CONTENT_TYPE)
 
 @app.route('/api/stop_scraping', methods=['POST'])
 def stop_scraping():
-    """Stop the scraping process and save current data"""
-    global scraping_status, scraper_instance
-    
-    if scraping_status['is_running']:
-        scraping_status['is_running'] = False
-        scraping_status['current_task'] = 'Stopping and saving data...'
-        
-        # Force save current data if scraper instance exists
-        if scraper_instance and hasattr(scraper_instance, 'scraped_data') and scraper_instance.scraped_data:
-            try:
-                # Save current data immediately
-                cleaned_data = scraper_instance.clean_data()
-                if cleaned_data:
-                    filename = scraper_instance.save_to_files(cleaned_data)
-                    scraping_status['current_task'] = f'Data saved to {filename}'
-                    scraping_status['scraped_count'] = len(cleaned_data)
-                    print(f"✅ Force saved {len(cleaned_data)} skins to {filename}")
-                else:
-                    scraping_status['current_task'] = 'No valid data to save'
-            except Exception as e:
-                print(f"❌ Error saving data: {e}")
-                scraping_status['current_task'] = f'Error saving data: {e}'
-        
-        scraping_status['is_running'] = False
-        return jsonify({'message': 'Scraping stopped and data saved'})
-    else:
+    """Cancel every queued and running job; records scraped so far stay in each job's record file"""
+    active = job_manager.active_jobs()
+    if not active:
         return jsonify({'message': 'No scraping process running'})
+    
+    for job in active:
+        job_manager.cancel(job.id)
+    return jsonify({
+        'message': f'Stopping {len(active)} job(s)',
+        'jobs': [job.id for job in active],
+        'records': [job.outputs['records'] for job in active]
+    })
 
 @app.route('/api/force_save', methods=['POST'])
 def force_save():
-    """Force save current scraped data without stopping the scraper"""
-    global scraper_instance
-    
-    if scraper_instance and hasattr(scraper_instance, 'scraped_data') and scraper_instance.scraped_data:
-        try:
-            cleaned_data = scraper_instance.clean_data()
-            if cleaned_data:
-                filename = scraper_instance.save_to_files(cleaned_data)
-                return jsonify({
-                    'message': f'Successfully saved {len(cleaned_data)} skins',
-                    'filename': filename,
-                    'count': len(cleaned_data)
-                })
-            else:
-                return jsonify({'error': 'No valid data to save'})
-        except Exception as e:
-            return jsonify({'error': f'Error saving data: {e}'})
-    else:
+    """Flush a job's scraped records (the current job's unless job_id is given) to its record file"""
+    job, error = requested_job()
+    if error:
+        return error
+    if job is None or job.scraper is None or not job.scraper.scraped_data:
         return jsonify({'error': 'No scraped data available'})
+    
+    try:
+        job.scraper.scraped_data.flush()
+        return jsonify({
+            'message': f'Successfully saved {len(job.scraper.scraped_data)} skins',
+            'filename': job.outputs['records'],
+            'count': len(job.scraper.scraped_data)
+        })
+    except Exception as e:
+        return jsonify({'error': f'Error saving data: {e}'})
 
 @app.route('/api/get_data')
 def get_data():
     """Get scraped data for display"""
     try:
-        data = []
-        
-        # Try to load from the most recent file
-        csv_path = 'data/rainmeter_skins.csv'
-        json_path = 'data/rainmeter_skins.json'
-        
-        if os.path.exists(csv_path):
-            try:
-                df = pd.read_csv(csv_path)
-                data = df.fillna('').to_dict('records')
-            except Exception as e:
-                print(f"Error reading CSV: {e}")
-        
-        if not data and os.path.exists(json_path):
-            try:
-                with open(json_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-            except Exception as e:
-                print(f"Error reading JSON: {e}")
-        
-        # Get summary statistics
-        stats = {
-            'total_skins': len(data),
-            'unique_developers': len(set(item.get('developer', '') for item in data if item.get('developer', '').strip())),
-            'with_downloads': len([item for item in data if item.get('download_url', '').strip()]),
-            'with_thumbnails': len([item for item in data if item.get('thumbnail_url', '').strip()]),
-            'categories': list(set(item.get('category', '') for item in data if item.get('category', '').strip()))
-        }
+        dataset = get_dataset()
         
         return jsonify({
-            'data': data[:50],  # Limit to first 50 for performance
-            'total_count': len(data),
-            'stats': stats
+            'data': dataset.records[:50],  # Limit to first 50 for performance
+            'total_count': len(dataset),
+            'stats': dataset.summary
         })
         
     except Exception as e:
@@ -268,44 +366,15 @@ def search_data():
         page = max(1, int(request.args.get('page', 1)))
         per_page = min(50, max(10, int(request.args.get('per_page', 20))))
         
-        # Load data
-        data = []
-        csv_path = 'data/rainmeter_skins.csv'
-        
-        if os.path.exists(csv_path):
-            df = pd.read_csv(csv_path)
-            data = df.fillna('').to_dict('records')
-        
-        # Filter data
-        filtered_data = []
-        for item in data:
-            # Text search
-            if query:
-                searchable_fields = [
-                    item.get('name', ''),
-                    item.get('description', ''),
-                    item.get('tags', ''),
-                    item.get('developer', '')
-                ]
-                searchable_text = ' '.join(str(field) for field in searchable_fields).lower()
-                if query not in searchable_text:
-                    continue
-            
-            # Category filter
-            if category and item.get('category', '') != category:
-                continue
-            
-            filtered_data.append(item)
-        
-        # Pagination
-        total_pages = (len(filtered_data) + per_page - 1) // per_page
-        start_idx = (page - 1) * per_page
-        end_idx = start_idx + per_page
-        paginated_data = filtered_data[start_idx:end_idx]
+        # Ranked full-text search over the cached dataset
+        paginated_data, total_count = get_dataset().search(
+            query, category, limit=per_page, offset=(page - 1) * per_page
+        )
+        total_pages = (total_count + per_page - 1) // per_page
         
         return jsonify({
             'data': paginated_data,
-            'total_count': len(filtered_data),
+            'total_count': total_count,
             'page': page,
             'per_page': per_page,
             'total_pages': total_pages
@@ -343,17 +412,9 @@ def export_data(format):
 def get_stats():
     """Get detailed statistics"""
     try:
-        if os.path.exists('data/rainmeter_skins.csv'):
-            df = pd.read_csv('data/rainmeter_skins.csv')
-            
-            stats = {
-                'total_skins': len(df),
-                'unique_developers': df['developer'].nunique(),
-                'avg_rating': df['rating'].astype(str).str.extract(r'(\d+\.?\d*)').astype(float).mean().iloc[0] if 'rating' in df.columns else 0,
-                'top_developers': df['developer'].value_counts().head(10).to_dict(),
-                'top_categories': df['category'].value_counts().head(10).to_dict() if 'category' in df.columns else {},
-                'scraping_date': datetime.now().isoformat()
-            }
+        dataset = get_dataset()
+        if len(dataset):
+            stats = dict(dataset.stats, scraping_date=datetime.now().isoformat())
             
             return jsonify(stats)
         else:
@@ -364,23 +425,21 @@ def get_stats():
 
 @app.route('/api/performance_stats')
 def get_performance_stats():
-    """Get performance statistics for parallel scraping"""
-    global scraper_instance, scraping_status
-    
-    if scraper_instance and scraping_status['is_running']:
-        try:
-            stats = scraper_instance.get_progress_stats()
-            return jsonify({
-                'discovery_rate': scraping_status.get('discovery_rate', 0),
-                'scraping_rate': scraping_status.get('scraping_rate', 0),
-                'discovered_count': stats['discovered_count'],
-                'scraped_count': stats['scraped_count'],
-                'failed_count': stats.get('failed_count', 0),
-                'discovery_complete': stats['discovery_complete'],
-                'estimated_time': scraping_status.get('estimated_time', 'Calculating...')
-            })
-        except:
-            pass
+    """Get performance statistics for parallel scraping (of ?job_id= or the current job)"""
+    job, error = requested_job()
+    if error:
+        return error
+    status = job.progress() if job else initial_status()
+    if status['is_running']:
+        return jsonify({
+            'discovery_rate': status.get('discovery_rate', 0),
+            'scraping_rate': status.get('scraping_rate', 0),
+            'discovered_count': status['discovered_count'],
+            'scraped_count': status['scraped_count'],
+            'failed_count': status.get('failed_count', 0),
+            'discovery_complete': status['discovery_complete'],
+            'estimated_time': status.get('estimated_time') or 'Calculating...'
+        })
     
     return jsonify({
         'discovery_rate': 0,
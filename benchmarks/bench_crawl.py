@@ -0,0 +1,217 @@
+"""
+Benchmark: end-to-end crawl throughput against a synthetic site
+
+Serves a FixtureSite (see benchmarks/fixture_site.py) from a separate
+process, or uses --base-url to target a server that is already running,
+and crawls it with RainmeterScraper once per engine. Every crawl runs in a
+fresh process so its peak RSS is its own. Reports per run:
+
+  pages/s      fetched pages (200 and 304 answers) per second of wall time
+  p50/p99      fetch latency in ms, without the rate-limit wait
+  parse        mean parse time per page in ms (from the parse spans)
+  cpu          CPU time per page in ms, crawler and parser processes together
+  peak RSS     maximum resident set size in MB, crawler or a parser process
+
+--save writes the results as JSON; --compare checks them against a saved
+run and exits with status 1 when throughput, p99 latency or CPU per page
+is worse by more than --tolerance.
+
+Usage: python -m benchmarks.bench_crawl [--skins N] [--engine threads|async|both] [--save FILE] [--compare FILE]
+"""
+
+import argparse
+import json
+import logging
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.fixture_site import add_site_arguments
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def span_seconds(span):
+    return (span.end_ns - span.start_ns) / 1e9
+
+
+def run_one(config):
+    """Crawl config['base_url'] in this process and return the measurements"""
+    from scraper.rainmeter_scraper import RainmeterScraper
+    from scraper.tracing import Tracer
+
+    logging.disable(logging.CRITICAL)
+    tracer = Tracer(enabled=True)
+    with tempfile.TemporaryDirectory() as directory:
+        scraper = RainmeterScraper(
+            base_url=config['base_url'],
+            delay=config['delay'],
+            max_workers=config['max_workers'],
+            engine=config['engine'],
+            concurrency=config['concurrency'],
+            parse_workers=config['parse_workers'],
+            use_sitemaps=config['sitemaps'],
+            cache_dir=None,
+            checkpoint_path=None,
+            tracer=tracer
+        )
+        started = time.perf_counter()
+        scraper.scrape_all_skins(dataset_prefix=os.path.join(directory, 'bench'))
+        wall = time.perf_counter() - started
+        scraped = len(scraper.scraped_data)
+        failed = len(scraper.failed_urls)
+
+    # Fetch latency excludes the time spent waiting for the rate limiter
+    waits = {}
+    for span in tracer.spans:
+        if span.name == 'rate_limit':
+            waits[span.parent_id] = waits.get(span.parent_id, 0.0) + span_seconds(span)
+    fetches = [span for span in tracer.spans if span.name == 'fetch']
+    latencies = [(span_seconds(span) - waits.get(span.span_id, 0.0)) * 1000 for span in fetches]
+    pages = sum(1 for span in fetches if span.attributes.get('status') in (200, 304))
+    parses = [span_seconds(span) * 1000 for span in tracer.spans if span.name == 'parse']
+
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+    return {
+        'wall_seconds': round(wall, 3),
+        'pages': pages,
+        'requests': len(fetches),
+        'skins': scraped,
+        'failed': failed,
+        'pages_per_sec': round(pages / wall, 2) if wall else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50), 2),
+        'p99_ms': round(percentile(latencies, 0.99), 2),
+        'parse_ms_per_page': round(statistics.mean(parses), 3) if parses else 0.0,
+        'cpu_ms_per_page': round(cpu * 1000 / pages, 3) if pages else 0.0,
+        # ru_maxrss is in kilobytes on Linux
+        'peak_rss_mb': round(max(own.ru_maxrss, children.ru_maxrss) / 1024, 1)
+    }
+
+
+def run_in_subprocess(config):
+    process = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_crawl', '--run-one', json.dumps(config)],
+        cwd=PROJECT_DIR, capture_output=True, text=True
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"Crawl {config['label']} failed:\n{process.stderr.strip()}")
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def start_fixture_server(args):
+    """Serve the synthetic site from a child process; returns (process, base_url)"""
+    command = [sys.executable, '-m', 'benchmarks.fixture_site', '--port', '0',
+               '--skins', str(args.skins), '--categories', str(args.categories),
+               '--per-page', str(args.per_page), '--latency', str(args.latency),
+               '--jitter', str(args.jitter), '--error-rate', str(args.error_rate), '--seed', str(args.seed)]
+    if args.pages_per_category:
+        command += ['--pages-per-category', str(args.pages_per_category)]
+    if args.no_sitemaps:
+        command.append('--no-sitemaps')
+    server = subprocess.Popen(command, cwd=PROJECT_DIR, stdout=subprocess.PIPE, text=True)
+    banner = server.stdout.readline()
+    if not banner:
+        server.wait()
+        raise RuntimeError("Fixture server failed to start")
+    return server, banner.rsplit(' at ', 1)[1].strip().rstrip('/')
+
+
+def find_regressions(results, baseline, tolerance):
+    """Describe every run that is worse than the baseline run with the same label"""
+    previous = {run['label']: run for run in baseline['runs']}
+    regressions = []
+    for run in results['runs']:
+        before = previous.get(run['label'])
+        if not before:
+            continue
+        checks = (('pages_per_sec', -1), ('p99_ms', 1), ('cpu_ms_per_page', 1))
+        for key, direction in checks:
+            if before[key] and (run[key] - before[key]) * direction > tolerance * before[key]:
+                regressions.append(f"{run['label']}: {key} {before[key]} -> {run[key]}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark end-to-end crawls against a synthetic site')
+    add_site_arguments(parser)
+    parser.add_argument('--base-url', default=None, help='Crawl a running server instead of starting one')
+    parser.add_argument('--engine', choices=['threads', 'async', 'both'], default='both', help='Engines to run')
+    parser.add_argument('--max-workers', type=int, default=8, help='Download threads (threads engine)')
+    parser.add_argument('--concurrency', type=int, default=100, help='In-flight requests (async engine)')
+    parser.add_argument('--parse-workers', type=int, default=0, help='Parser processes (default: 0, inline)')
+    parser.add_argument('--delay', type=float, default=0.0, help='Politeness delay between requests')
+    parser.add_argument('--save', default=None, help='Write the results to this JSON file')
+    parser.add_argument('--compare', default=None, help='Compare against results saved with --save')
+    parser.add_argument('--tolerance', type=float, default=0.10, help='Allowed slowdown for --compare (default: 0.10)')
+    parser.add_argument('--run-one', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        print(json.dumps(run_one(json.loads(args.run_one))))
+        return
+
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        server, base_url = start_fixture_server(args)
+
+    engines = ['threads', 'async'] if args.engine == 'both' else [args.engine]
+    results = {'site': {'base_url': base_url, 'skins': args.skins, 'categories': args.categories,
+                        'latency': args.latency, 'error_rate': args.error_rate}, 'runs': []}
+    try:
+        print(f"{'run':28} {'pages/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'parse ms':>9} {'cpu ms':>8} "
+              f"{'RSS MB':>8} {'skins':>7}")
+        for engine in engines:
+            width = args.max_workers if engine == 'threads' else args.concurrency
+            config = {
+                'label': f"{engine}-{width}-parse{args.parse_workers}",
+                'base_url': base_url,
+                'engine': engine,
+                'max_workers': args.max_workers,
+                'concurrency': args.concurrency,
+                'parse_workers': args.parse_workers,
+                'delay': args.delay,
+                'sitemaps': not args.no_sitemaps
+            }
+            run = {'label': config['label'], **run_in_subprocess(config)}
+            results['runs'].append(run)
+            print(f"{run['label']:28} {run['pages_per_sec']:9.1f} {run['p50_ms']:8.2f} {run['p99_ms']:8.2f} "
+                  f"{run['parse_ms_per_page']:9.3f} {run['cpu_ms_per_page']:8.3f} {run['peak_rss_mb']:8.1f} "
+                  f"{run['skins']:7d}")
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        site = {key: value for key, value in results['site'].items() if key != 'base_url'}
+        if any(baseline['site'].get(key) != value for key, value in site.items()):
+            print(f"Note: {args.compare} was measured against a different site: {baseline['site']}")
+        regressions = find_regressions(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark: single-pass link extraction vs. the original selector loop
+
+Runs both implementations over the saved listing pages in
+benchmarks/fixtures/, checks that they report identical link sets and
+prints the per-page CPU time of each.
+
+Usage: python -m benchmarks.bench_link_extraction [--repeat N]
+"""
+
+import argparse
+import json
+import os
+import time
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from scraper.link_extractor import LinkExtractor
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+# The selector list used by parse_listing_page before the single-pass extractor
+LEGACY_SELECTORS = [
+    'a[href*="/skin/"]',
+    'h1 a[href*="/skin/"]', 'h2 a[href*="/skin/"]', 'h3 a[href*="/skin/"]', 'h4 a[href*="/skin/"]',
+    '.entry-title a', '.post-title a', '.skin-title a',
+    'article a[href*="/skin/"]', '.content a[href*="/skin/"]', '.post-content a[href*="/skin/"]',
+    '.grid-item a', '.list-item a', '.skin-item a', '.item a',
+    '.thumbnail a', '.image a', '.featured-image a',
+    '.card a', '.widget a', '.skin-card a',
+    '.more-link', '.read-more', '.continue-reading',
+    'a[title*="Skin"]', 'a[title*="skin"]', 'a[title*="Rainmeter"]', 'a[title*="rainmeter"]',
+    '.entry a', '.post a', 'main a', '#content a',
+    '.search-result a', '.result a',
+    '.navigation a', '.pagination a', '.page-numbers a',
+]
+
+
+def legacy_extract_links(soup, page_url, base_url="https://visualskins.com"):
+    """Reference implementation: returns (links, candidates) as sets"""
+    links = set()
+    candidates = set()
+
+    for selector in LEGACY_SELECTORS:
+        for link in soup.select(selector):
+            href = link.get('href')
+            if href:
+                full_url = urljoin(base_url, href)
+                if (('/skin/' in full_url or '/theme/' in full_url or
+                     '/widget/' in full_url or '/rainmeter/' in full_url) and
+                        'visualskins.com' in full_url and
+                        not any(exclude in full_url.lower() for exclude in [
+                            'javascript:', 'mailto:', 'tel:',
+                            'contact', 'about', 'privacy', 'terms',
+                            'how-to', 'tutorial', 'guide'
+                        ])):
+                    candidates.add(full_url)
+                    links.add(full_url)
+
+    if any(keyword in page_url.lower() for keyword in ['best-rainmeter', 'collection', 'rainmeter-', 'tag/']):
+        for link in soup.find_all('a', href=True):
+            href = link.get('href')
+            if href:
+                full_url = urljoin(base_url, href)
+                if ('visualskins.com' in full_url and full_url not in links and
+                        not any(exclude in full_url.lower() for exclude in [
+                            'javascript:', 'mailto:', 'tel:', 'contact',
+                            'about', 'privacy', 'wp-', 'admin'
+                        ])):
+                    link_text = link.get_text().lower()
+                    if any(keyword in link_text for keyword in [
+                        'skin', 'theme', 'widget', 'rainmeter', 'clock',
+                        'visualizer', 'weather', 'system', 'monitor'
+                    ]):
+                        links.add(full_url)
+
+    return links, candidates
+
+
+def load_listing_fixtures():
+    """Return [(name, page_url, html)] for the saved listing pages"""
+    with open(os.path.join(FIXTURES_DIR, 'listing_pages.json'), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    pages = []
+    for name, page_url in manifest.items():
+        with open(os.path.join(FIXTURES_DIR, name), 'r', encoding='utf-8') as f:
+            pages.append((name, page_url, f.read()))
+    return pages
+
+
+def time_per_page(func, soups, repeat):
+    start = time.process_time()
+    for _ in range(repeat):
+        for page_url, soup in soups:
+            func(soup, page_url)
+    return (time.process_time() - start) / (repeat * len(soups))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark listing link extraction')
+    parser.add_argument('--repeat', type=int, default=50, help='Passes over the fixture pages')
+    args = parser.parse_args()
+
+    extractor = LinkExtractor()
+    pages = load_listing_fixtures()
+    soups = [(page_url, BeautifulSoup(html, 'html.parser')) for _, page_url, html in pages]
+
+    for (name, _, _), (page_url, soup) in zip(pages, soups):
+        expected_links, expected_candidates = legacy_extract_links(soup, page_url)
+        extracted = extractor.extract(soup, page_url)
+        status = 'ok' if (set(extracted.links) == expected_links and
+                          extracted.candidates == expected_candidates) else 'MISMATCH'
+        print(f"{name:40} {len(extracted.links):4} links  {status}")
+
+    legacy = time_per_page(legacy_extract_links, soups, args.repeat)
+    single_pass = time_per_page(extractor.extract, soups, args.repeat)
+    print(f"\nlegacy selectors: {legacy * 1000:8.3f} ms/page")
+    print(f"single pass:      {single_pass * 1000:8.3f} ms/page")
+    print(f"speedup:          {legacy / single_pass:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: skin detail page parsing
+
+For every available parser backend, times building the full document tree,
+building only the regions kept by SKIN_PAGE_STRAINER, and the complete
+parse_skin_details call on the saved skin pages in benchmarks/fixtures/,
+or on the skin pages of an archive recorded with run_scraper.py --record.
+
+Usage: python -m benchmarks.bench_skin_parsing [--repeat N] [--archive ARCHIVE]
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+
+from scraper.html_parser import PARSERS, make_soup, parser_available
+from scraper.link_extractor import LinkExtractor
+from scraper.page_parser import SKIN_PAGE_STRAINER
+from scraper.rainmeter_scraper import RainmeterScraper
+from scraper.web_archive import ArchiveReader
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def load_skin_pages():
+    """Return [(skin_url, body bytes)] for the saved skin pages"""
+    with open(os.path.join(FIXTURES_DIR, 'skin_pages.json'), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    pages = []
+    for name, skin_url in manifest.items():
+        with open(os.path.join(FIXTURES_DIR, name), 'rb') as f:
+            pages.append((skin_url, f.read()))
+    return pages
+
+
+def load_archived_skin_pages(path):
+    """Return [(skin_url, body bytes)] for the skin pages recorded in a web archive"""
+    reader = ArchiveReader(path)
+    extractor = LinkExtractor(reader.base_url or 'https://visualskins.com')
+    try:
+        return [(url, body) for url, body in reader.responses() if extractor.is_skin_url(url)]
+    finally:
+        reader.close()
+
+
+def time_per_page(func, pages, repeat):
+    start = time.process_time()
+    for _ in range(repeat):
+        for skin_url, body in pages:
+            func(skin_url, body)
+    return (time.process_time() - start) / (repeat * len(pages)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark skin page parsing')
+    parser.add_argument('--repeat', type=int, default=50, help='Passes over the fixture pages')
+    parser.add_argument('--archive', default=None, help='Use the skin pages of a recorded .warc.gz archive')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    pages = load_archived_skin_pages(args.archive) if args.archive else load_skin_pages()
+    print(f"{len(pages)} skin pages")
+
+    print(f"{'parser':12} {'full tree':>10} {'strained':>10} {'record':>10}   (ms/page)")
+    for name in PARSERS:
+        if not parser_available(name):
+            continue
+        scraper = RainmeterScraper(delay=0, cache_dir=None, checkpoint_path=None, parser=name)
+        full = time_per_page(lambda url, body: make_soup(body, name), pages, args.repeat)
+        strained = time_per_page(lambda url, body: make_soup(body, name, SKIN_PAGE_STRAINER), pages, args.repeat)
+        record = time_per_page(scraper.parse_skin_details, pages, args.repeat)
+        print(f"{name:12} {full:10.3f} {strained:10.3f} {record:10.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,312 @@
+"""
+Synthetic visualskins-shaped site for benchmarks and tests
+
+FixtureSite generates a site with the markup the scraper reads: paginated
+category listings under /tag/<category>/, a newest-first main listing,
+skin detail pages under /skin/<slug>, and robots.txt pointing at gzipped
+sitemaps with lastmod dates. Pages are rendered on request from the skin
+number, so a 100k-skin site costs no memory. Responses carry ETags and
+answer conditional requests with 304. Latency and error injection
+(transient 5xx answers) are deterministic for a given seed.
+
+FixtureServer serves a FixtureSite over HTTP/1.1 with keep-alive from a
+background thread.
+
+Usage: python -m benchmarks.fixture_site [--skins N] [--port P] [--latency S] [--error-rate R]
+"""
+
+import argparse
+import gzip
+import hashlib
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Category slugs the scraper walks as listing roots (see discover_comprehensive_urls)
+CATEGORIES = (
+    'themes', 'weather', 'clock', 'visualizer', 'launcher', 'system-monitor', 'cpu', 'battery',
+    'network', 'hdd', 'ram', 'wifi', 'time-and-date', 'music', 'calendar', 'notes', 'effects',
+    'wallpaper', 'volume', 'recycle-bin', 'search', 'countdown', 'currency', 'e-mail',
+    'minimalism', 'anime', 'steampunk', 'fallout',
+)
+SITEMAP_CHUNK = 50000  # URLs per sitemap file, the sitemaps.org limit
+WORDS = ('clean', 'minimal', 'dark', 'neon', 'glass', 'retro', 'modern', 'circle', 'bar', 'panel',
+         'widget', 'suite', 'flat', 'gradient', 'animated', 'compact', 'vertical', 'desktop')
+NAV_LINKS = ''.join(f'<li><a href="/tag/{slug}/">{slug.replace("-", " ").title()}</a></li>'
+                    for slug in CATEGORIES)
+
+SKIN_PATH_RE = re.compile(r'^/skin/skin-(\d+)$')
+LISTING_PATH_RE = re.compile(r'^/(?:tag/([\w-]+)/)?(?:page/(\d+)/)?$')
+
+
+class FixtureSite:
+    """Deterministic synthetic site: `skins` skin pages spread over `categories` categories"""
+
+    def __init__(self, skins=1000, categories=5, per_page=12, pages_per_category=None, sitemaps=True,
+                 latency=0.0, jitter=0.0, error_rate=0.0, error_status=503, seed=0):
+        if not 1 <= categories <= len(CATEGORIES):
+            raise ValueError(f"categories must be between 1 and {len(CATEGORIES)}")
+        self.skins = skins
+        self.categories = CATEGORIES[:categories]
+        self.per_page = per_page
+        if pages_per_category:
+            # Pagination depth given: spread each category's skins over that many pages
+            self.per_page = max(1, -(-skins // (categories * pages_per_category)))
+        self.sitemaps = sitemaps
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.seed = seed
+        self.host = 'http://127.0.0.1'  # Absolute URLs in robots.txt and sitemaps; set by the server
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+
+    # Content
+
+    def category_of(self, number):
+        return self.categories[number % len(self.categories)]
+
+    def skin_page(self, number):
+        rng = random.Random(self.seed * 1000003 + number)
+        category = self.category_of(number)
+        name = ' '.join(rng.choice(WORDS).title() for _ in range(2)) + f' {number}'
+        developer = f'dev{rng.randrange(max(1, self.skins // 20))}'
+        tags = [category] + rng.sample(CATEGORIES, 3)
+        description = ' '.join(rng.choice(WORDS) for _ in range(40))
+        version = f'{rng.randrange(1, 5)}_{rng.randrange(10)}'
+        size = f'{rng.randrange(1, 40)}.{rng.randrange(10)} MB'
+        related = ''.join(f'<li><a href="/skin/skin-{(number + offset) % self.skins}">Related {offset}</a></li>'
+                          for offset in range(1, 9))
+        return f"""<!DOCTYPE html><html><head><title>{name} Rainmeter Theme</title>
+<meta name="description" content="{description[:150]}"></head><body>
+<header><nav><ul class="uk-navbar-nav">{NAV_LINKS}</ul></nav></header>
+<ul class="uk-breadcrumb"><li><a href="/">Rainmeter Skins</a></li><li><a href="/tag/{category}/">{category.replace('-', ' ').title()}</a></li></ul>
+<h1 class="title">{name} Rainmeter Theme</h1>
+<div class="uk-slider-items"><img src="/media/p/{number}/preview.jpg" alt="{name}"></div>
+<div class="desc"><p>{description}</p></div>
+<a class="uk-button uk-button-primary" href="/media/p/{number}/skin{number}_{version}.rmskin">Download ({size})</a>
+<div class="ratetxt">{rng.randrange(1, 5)}.{rng.randrange(10)} by {rng.randrange(1, 500)} votes</div>
+<dl><dt>Developer</dt><dd><a href="/user/{developer}/">{developer}</a></dd>
+<dt>Date added</dt><dd>June {number % 28 + 1}, 2021</dd>
+<dt>Filename</dt><dd>skin{number}_{version}.rmskin</dd><dt>File size</dt><dd>{size}</dd></dl>
+<div class="tmenu">{''.join(f'<a href="/tag/{tag}/">{tag}</a>' for tag in tags)}</div>
+<aside><h3>Related skins</h3><ul>{related}</ul></aside>
+<footer><a href="/about/">About</a><a href="/privacy/">Privacy</a><a href="/contact/">Contact</a></footer>
+</body></html>"""
+
+    def listing_skins(self, category):
+        """Skin numbers of a listing, newest first"""
+        if category is None:
+            return range(self.skins - 1, -1, -1)
+        position = self.categories.index(category)
+        return range(self.skins - 1 - (self.skins - 1 - position) % len(self.categories), -1, -len(self.categories))
+
+    def listing_page(self, category, page):
+        skins = self.listing_skins(category)
+        pages = max(1, -(-len(skins) // self.per_page))
+        if page > pages:
+            return None
+        base = f'/tag/{category}/' if category else '/'
+        items = ''.join(f'<div class="item"><h2><a href="/skin/skin-{number}">Skin {number}</a></h2></div>'
+                        for number in skins[(page - 1) * self.per_page:page * self.per_page])
+        # Page number window plus the last page, like the real pagination
+        numbers = sorted({1, pages, *range(max(1, page - 2), min(pages, page + 2) + 1)})
+        pagination = ''.join(f'<a class="page-numbers" href="{base}page/{number}/">{number}</a>' for number in numbers)
+        return f"""<!DOCTYPE html><html><head><title>Rainmeter Skins</title></head><body>
+<header><nav><ul class="uk-navbar-nav">{NAV_LINKS}</ul></nav></header>
+<main>{items}</main><div class="pagination">{pagination}</div>
+<footer><a href="/about/">About</a><a href="/privacy/">Privacy</a></footer></body></html>"""
+
+    def robots(self):
+        return f'User-agent: *\nDisallow: /wp-admin/\n\nSitemap: {self.host}/sitemap_index.xml\n'
+
+    def sitemap_index(self):
+        chunks = -(-self.skins // SITEMAP_CHUNK)
+        entries = ''.join(f'<sitemap><loc>{self.host}/sitemap-skins-{chunk + 1}.xml.gz</loc></sitemap>'
+                          for chunk in range(chunks))
+        entries += f'<sitemap><loc>{self.host}/sitemap-tags.xml</loc></sitemap>'
+        return ('<?xml version="1.0" encoding="UTF-8"?>'
+                f'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</sitemapindex>')
+
+    def skin_sitemap(self, chunk):
+        first = (chunk - 1) * SITEMAP_CHUNK
+        if not 0 <= first < self.skins:
+            return None
+        entries = ''.join(
+            f'<url><loc>{self.host}/skin/skin-{number}</loc>'
+            f'<lastmod>2024-01-{number % 28 + 1:02d}T10:00:00+00:00</lastmod></url>'
+            for number in range(first, min(self.skins, first + SITEMAP_CHUNK)))
+        xml = f'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>'
+        return gzip.compress(xml.encode(), mtime=0)
+
+    def tag_sitemap(self):
+        entries = ''.join(f'<url><loc>{self.host}/tag/{category}/</loc></url>' for category in self.categories)
+        return f'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>'
+
+    def render(self, path):
+        """Body of the page at `path` (str or bytes), or None for a 404"""
+        match = SKIN_PATH_RE.match(path)
+        if match:
+            number = int(match.group(1))
+            return self.skin_page(number) if number < self.skins else None
+        match = LISTING_PATH_RE.match(path)
+        if match:
+            category = match.group(1)
+            if category is not None and category not in self.categories:
+                return None
+            return self.listing_page(category, int(match.group(2) or 1))
+        if not self.sitemaps:
+            return None
+        if path == '/robots.txt':
+            return self.robots()
+        if path == '/sitemap_index.xml':
+            return self.sitemap_index()
+        if path == '/sitemap-tags.xml':
+            return self.tag_sitemap()
+        match = re.match(r'^/sitemap-skins-(\d+)\.xml\.gz$', path)
+        if match:
+            return self.skin_sitemap(int(match.group(1)))
+        return None
+
+    # Injection
+
+    def delay(self):
+        """Seconds to hold the next response"""
+        if not self.latency and not self.jitter:
+            return 0.0
+        with self._lock:
+            return max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+
+    def injected_error(self):
+        """Status to answer the next request with instead of the page, or None"""
+        with self._lock:
+            self.requests += 1
+            if self.error_rate and self._random.random() < self.error_rate:
+                return self.error_status
+        return None
+
+
+class FixtureRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like the real site
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        site = self.server.site
+        pause = site.delay()
+        if pause:
+            time.sleep(pause)
+
+        status = site.injected_error()
+        if status is not None:
+            self.send_body(status, b'Temporarily unavailable', {'Retry-After': '0'})
+            return
+
+        body = site.render(self.path.split('?')[0])
+        if body is None:
+            self.send_body(404, b'Not found')
+            return
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_body(304, b'', {'ETag': etag})
+            return
+        self.send_body(200, body, {'ETag': etag, 'Content-Type': 'text/html; charset=utf-8'})
+
+    def send_body(self, status, body, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+
+class FixtureHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # The default backlog of 5 drops connects from a 100-wide crawl
+
+    def handle_error(self, request, client_address):
+        # A client hanging up mid-response (e.g. a cancelled crawl) is not a server error
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class FixtureServer:
+    """Serve a FixtureSite on 127.0.0.1 from a background thread"""
+
+    def __init__(self, site, host='127.0.0.1', port=0):
+        self.site = site
+        self.httpd = FixtureHTTPServer((host, port), FixtureRequestHandler)
+        self.httpd.site = site
+        site.host = self.base_url
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def add_site_arguments(parser):
+    """Command-line options shared by the server and the benchmark runner"""
+    parser.add_argument('--skins', type=int, default=1000, help='Skin pages on the site (default: 1000)')
+    parser.add_argument('--categories', type=int, default=5, help=f'Categories, 1-{len(CATEGORIES)} (default: 5)')
+    parser.add_argument('--per-page', type=int, default=12, help='Skins per listing page (default: 12)')
+    parser.add_argument('--pages-per-category', type=int, default=None,
+                        help='Pagination depth of each category; overrides --per-page')
+    parser.add_argument('--no-sitemaps', action='store_true', help='Serve no robots.txt or sitemaps')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Random +/- seconds around --latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests answered with a 5xx')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for content, latency and errors')
+
+
+def site_from_args(args):
+    return FixtureSite(skins=args.skins, categories=args.categories, per_page=args.per_page,
+                       pages_per_category=args.pages_per_category, sitemaps=not args.no_sitemaps,
+                       latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, seed=args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a synthetic visualskins-shaped site')
+    add_site_arguments(parser)
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on, 0 for any (default: 8765)')
+    args = parser.parse_args()
+
+    server = FixtureServer(site_from_args(args), port=args.port)
+    print(f"Serving {args.skins} skins at {server.base_url}/", flush=True)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
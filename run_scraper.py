@@ -7,7 +7,11 @@ Usage: python run_scraper.py [options]
 import argparse
 import sys
 import os
-from scraper.rainmeter_scraper import RainmeterScraper
+from scraper.rainmeter_scraper import DEFAULT_BASE_URL, RainmeterScraper
+from scraper.html_parser import PARSERS, DEFAULT_PARSER
+from scraper.parse_pool import DEFAULT_PARSE_WORKERS
+from scraper.tracing import Tracer, TRACE_FORMATS
+from scraper.profiling import StageProfiler
 
 def main():
     parser = argparse.ArgumentParser(
@@ -19,6 +23,13 @@ Examples:
   python run_scraper.py --max-pages 50     # Limit to 50 pages
   python run_scraper.py --delay 2          # 2 second delay between requests
   python run_scraper.py --output my_skins  # Custom output filename
+  python run_scraper.py --engine async     # Crawl on a single asyncio event loop
+  python run_scraper.py --incremental      # Refresh only new and stale skins
+  python run_scraper.py --resume           # Continue an interrupted run
+  python run_scraper.py --trace trace.json # Record spans for chrome://tracing or Perfetto
+  python run_scraper.py --profile profile  # cProfile per stage plus a trace in profile/
+  python run_scraper.py --record data/crawl.warc.gz   # Archive every response while crawling
+  python run_scraper.py --replay data/crawl.warc.gz   # Rebuild the dataset from the archive, offline
         """
     )
     
@@ -33,7 +44,14 @@ Examples:
         '--delay', 
         type=float, 
         default=1.0,
-        help='Delay between requests in seconds (default: 1.0)'
+        help='Politeness budget: seconds between requests to the same host (default: 1.0)'
+    )
+    
+    parser.add_argument(
+        '--burst', 
+        type=int, 
+        default=1,
+        help='Requests allowed back-to-back after an idle period (default: 1)'
     )
     
     parser.add_argument(
@@ -47,14 +65,139 @@ Examples:
         '--format', 
         choices=['csv', 'json', 'both'], 
         default='both',
-        help='Output format (default: both)'
+        help='Export format written next to the data/<output>.db dataset store (default: both)'
     )
     
     parser.add_argument(
         '--base-url', 
         type=str, 
-        default='https://visualskins.com',
-        help='Base URL to scrape (default: https://visualskins.com)'
+        default=None,
+        help='Base URL to scrape (default: https://visualskins.com, or the site a --replay archive was recorded from)'
+    )
+    
+    parser.add_argument(
+        '--max-retries', 
+        type=int, 
+        default=3,
+        help='Attempts per page for transient errors; 404/410 are never retried (default: 3)'
+    )
+    
+    parser.add_argument(
+        '--max-workers', 
+        type=int, 
+        default=8,
+        help='Download threads for the threads engine (default: 8)'
+    )
+    
+    parser.add_argument(
+        '--parse-workers', 
+        type=int, 
+        default=DEFAULT_PARSE_WORKERS,
+        help=f'Processes that parse downloaded pages; 0 parses in the download workers (default: {DEFAULT_PARSE_WORKERS}, one per core)'
+    )
+    
+    parser.add_argument(
+        '--engine', 
+        choices=['threads', 'async'], 
+        default='threads',
+        help='Crawl engine: worker threads or a single asyncio event loop (default: threads)'
+    )
+    
+    parser.add_argument(
+        '--concurrency', 
+        type=int, 
+        default=100,
+        help='Maximum in-flight requests for the async engine (default: 100)'
+    )
+    
+    parser.add_argument(
+        '--parser', 
+        choices=PARSERS, 
+        default=DEFAULT_PARSER,
+        help='HTML parser backend; html.parser is used when lxml is missing (default: lxml)'
+    )
+    
+    parser.add_argument(
+        '--cache-dir', 
+        type=str, 
+        default='data/http_cache',
+        help='Directory for the conditional-request page cache (default: data/http_cache)'
+    )
+    
+    parser.add_argument(
+        '--no-cache', 
+        action='store_true',
+        help='Download every page in full instead of revalidating cached copies'
+    )
+    
+    parser.add_argument(
+        '--no-sitemaps', 
+        action='store_true',
+        help='Skip robots.txt/sitemap discovery and crawl every listing page'
+    )
+    
+    parser.add_argument(
+        '--incremental', 
+        action='store_true',
+        help='Only fetch skins missing from data/<output>.db or older than --max-age-days, then merge'
+    )
+    
+    parser.add_argument(
+        '--max-age-days', 
+        type=float, 
+        default=7,
+        help='Age after which an existing skin is fetched again in incremental mode (default: 7)'
+    )
+    
+    parser.add_argument(
+        '--resume', 
+        action='store_true',
+        help='Continue an interrupted run from its checkpoint journal'
+    )
+    
+    parser.add_argument(
+        '--checkpoint', 
+        type=str, 
+        default='data/crawl_journal.jsonl',
+        help='Checkpoint journal path (default: data/crawl_journal.jsonl)'
+    )
+    
+    parser.add_argument(
+        '--trace', 
+        type=str, 
+        default=None,
+        help='Record timed spans (fetch attempts, retries, parses, ...) and write them to this file'
+    )
+    
+    parser.add_argument(
+        '--trace-format', 
+        choices=TRACE_FORMATS, 
+        default='chrome',
+        help='Trace file format: Chrome trace events or OTLP JSON (default: chrome)'
+    )
+    
+    parser.add_argument(
+        '--profile', 
+        type=str, 
+        default=None,
+        metavar='DIR',
+        help='Write cProfile output per stage (discovery, scrape, main) and a trace.json to DIR'
+    )
+    
+    parser.add_argument(
+        '--record', 
+        type=str, 
+        default=None,
+        metavar='ARCHIVE',
+        help='Append every HTTP response (URL, status, headers, body) to this WARC-style .warc.gz archive'
+    )
+    
+    parser.add_argument(
+        '--replay', 
+        type=str, 
+        default=None,
+        metavar='ARCHIVE',
+        help='Re-extract skins from an archive written with --record: no network, no delay, no checkpoint'
     )
     
     parser.add_argument(
@@ -70,13 +213,19 @@ Examples:
     )
 
     args = parser.parse_args()
+    if args.record and args.replay:
+        parser.error("--record and --replay cannot be combined")
     
     print("=" * 60)
     print("🕷️  Rainmeter Skins Scraper - Professional Edition")
     print("=" * 60)
-    print(f"Target: {args.base_url}")
+    print(f"Target: {args.base_url or ('the site recorded in the archive' if args.replay else DEFAULT_BASE_URL)}")
     print(f"Max pages: {'All' if args.max_pages is None else args.max_pages}")
-    print(f"Request delay: {args.delay}s")
+    print(f"Request delay: {args.delay}s (burst {args.burst})")
+    print(f"Engine: {args.engine} (parser: {args.parser}, {args.parse_workers} parser processes)")
+    print(f"Mode: {'incremental (max age %g days)' % args.max_age_days if args.incremental else 'full crawl'}")
+    if args.record or args.replay:
+        print(f"Archive: {'recording to' if args.record else 'replaying'} {args.record or args.replay}")
     print(f"Output format: {args.format}")
     print(f"Output prefix: {args.output}")
     print("=" * 60)
@@ -84,13 +233,47 @@ Examples:
     # Create data directory
     os.makedirs('data', exist_ok=True)
     
+    tracer = Tracer(enabled=bool(args.trace or args.profile))
+    profiler = StageProfiler(enabled=bool(args.profile))
+    
     try:
         # Initialize scraper
-        scraper = RainmeterScraper(base_url=args.base_url, delay=args.delay)
+        scraper = RainmeterScraper(
+            base_url=args.base_url, 
+            delay=args.delay, 
+            burst=args.burst, 
+            max_workers=args.max_workers, 
+            parse_workers=args.parse_workers, 
+            use_sitemaps=not args.no_sitemaps, 
+            engine=args.engine, 
+            concurrency=args.concurrency, 
+            parser=args.parser, 
+            cache_dir=None if args.no_cache or args.replay else args.cache_dir, 
+            checkpoint_path=None if args.replay else args.checkpoint, 
+            max_retries=args.max_retries, 
+            tracer=tracer, 
+            profiler=profiler, 
+            archive_path=args.record, 
+            replay_path=args.replay
+        )
         
         # Start scraping
         print("🚀 Starting scraping process...")
-        data = scraper.scrape_all_skins(max_pages=args.max_pages)
+        data = scraper.scrape_all_skins(
+            max_pages=args.max_pages, 
+            incremental=args.incremental, 
+            max_age_days=args.max_age_days, 
+            dataset_prefix=f"data/{args.output}", 
+            resume=args.resume and not args.replay
+        )
+        
+        # A cancelled or failed crawl holds a partial, unmerged dataset: saving it would replace the full one
+        if scraper.interrupted:
+            print(f"\n⏹️  Scraping was interrupted after {len(scraper.scraped_data)} skins. Nothing was saved.")
+            print(f"Records scraped so far are kept in data/{args.output}.ndjson")
+            if not args.replay:
+                print(f"Progress was checkpointed to {args.checkpoint}. Rerun with --resume to continue.")
+            sys.exit(1)
         
         if not data:
             print("❌ No data was scraped. Please check the website URL and try again.")
@@ -108,6 +291,10 @@ Examples:
         # Save data
         print("💾 Saving data...")
         
+        db_filename = f"data/{args.output}.db"
+        scraper.save_to_database(db_filename)
+        print(f"✅ Dataset store saved: {db_filename}")
+        
         if args.format in ['csv', 'both']:
             csv_filename = f"data/{args.output}.csv"
             scraper.save_to_csv(csv_filename)
@@ -123,6 +310,13 @@ Examples:
         print("\n📊 Scraping Statistics:")
         print(f"   Total skins scraped: {stats['total_scraped']}")
         print(f"   Failed URLs: {stats['failed_urls']}")
+        progress = scraper.get_progress_stats()
+        print(f"   Retries: {progress['retry_count']} "
+              f"(permanent failures: {progress['permanent_failures']}, "
+              f"transient: {progress['transient_failures']}, throttled: {progress['throttled_failures']})")
+        print(f"   Pages served from cache: {progress.get('cache_hits', 0)}")
+        if args.incremental:
+            print(f"   Fresh skins skipped: {progress.get('skipped_count', 0)}")
         print(f"   Unique developers: {stats['unique_developers']}")
         print(f"   Skins with downloads: {stats['with_downloads']}")
         print(f"   Skins with thumbnails: {stats['with_thumbnails']}")
@@ -131,8 +325,8 @@ Examples:
             print(f"\n⚠️  {stats['failed_urls']} URLs failed to load")
             if args.verbose:
                 print("Failed URLs:")
-                for url in scraper.failed_urls[:10]:  # Show first 10
-                    print(f"   - {url}")
+                for failure in scraper.failed_urls[:10]:  # Show first 10
+                    print(f"   - {failure['url']} ({failure['failure_class']}, {failure['status'] or failure['error']})")
                 if len(scraper.failed_urls) > 10:
                     print(f"   ... and {len(scraper.failed_urls) - 10} more")
         
@@ -140,7 +334,7 @@ Examples:
         
     except KeyboardInterrupt:
         print("\n\n⏹️  Scraping stopped by user")
-        print("Partial data may have been saved.")
+        print(f"Progress was checkpointed to {args.checkpoint}. Rerun with --resume to continue.")
         sys.exit(0)
         
     except Exception as e:
@@ -149,6 +343,21 @@ Examples:
             import traceback
             traceback.print_exc()
         sys.exit(1)
+        
+    finally:
+        write_diagnostics(args, tracer, profiler)
+
+def write_diagnostics(args, tracer, profiler):
+    """Write the trace and per-stage profiles requested on the command line"""
+    if args.trace:
+        tracer.export(args.trace, args.trace_format)
+        print(f"🔎 Trace with {len(tracer.spans)} spans saved: {args.trace}")
+    if args.profile:
+        tracer.export(os.path.join(args.profile, 'trace.json'))
+        for path in profiler.dump(args.profile):
+            print(f"🔎 Profile saved: {path}")
+        for stage, count in sorted(profiler.skipped.items()):
+            print(f"⚠️  {count} {stage} block(s) not profiled: another profiler was already active")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,268 @@
+"""
+Asyncio crawl engine for the Rainmeter Skins Scraper
+
+Runs discovery and skin scraping for a RainmeterScraper on a single event
+loop with aiohttp, so hundreds of requests can be in flight without a
+thread per request. Parsing (through the scraper's parse pool), bookkeeping
+and the processing_stats contract are shared with the threaded engine
+through the scraper instance; bookkeeping that writes the journal or the
+record file runs in the default executor, off the event loop.
+"""
+
+import asyncio
+import random
+import time
+
+from .metrics import AsyncTimedQueue
+from .retry_policy import NOT_FOUND
+from .sitemap import SitemapReader
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+
+class AsyncCrawlEngine:
+    """Drive a RainmeterScraper crawl with asyncio instead of worker threads"""
+
+    def __init__(self, scraper, concurrency=100, timeout=15):
+        if aiohttp is None:
+            raise ImportError("The async engine requires aiohttp. Install it with: pip install aiohttp")
+
+        self.scraper = scraper
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.logger = scraper.logger
+
+    def run(self, max_pages=None, pending=()):
+        """Run a full crawl to completion and return the scraped records"""
+        asyncio.run(self.crawl(max_pages, pending))
+        return self.scraper.scraped_data
+
+    async def crawl(self, max_pages=None, pending=()):
+        """Run discovery and scraping concurrently on the current event loop
+
+        `pending` holds skin URLs restored from a checkpoint that still need scraping.
+        """
+        metrics = self.scraper.metrics
+        self.loop = asyncio.get_running_loop()
+        self.queue = AsyncTimedQueue(on_wait=lambda seconds: metrics.observe('queue_wait', seconds))
+        for skin_url in pending:
+            self.queue.put_nowait(skin_url)
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        self.discovery_workers = 1  # Until the listing walks start
+        self.scraper.register_pool_metrics(self.queue.qsize, self.concurrency, lambda: self.discovery_workers)
+
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        headers = dict(self.scraper.session.headers)
+
+        # scraper.cancel() may be called from any thread; it cancels the crawl's tasks on this loop
+        cancelled = asyncio.Event()
+        unregister = self.scraper.cancel_token.on_cancel(lambda: self.loop.call_soon_threadsafe(cancelled.set))
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers,
+                                         trace_configs=[self.connect_trace()]) as session:
+            workers = [asyncio.create_task(self.scraping_worker(session))
+                       for _ in range(self.concurrency)]
+            work = asyncio.create_task(self.discover_and_drain(session, max_pages))
+            stop = asyncio.create_task(cancelled.wait())
+            try:
+                await asyncio.wait([work, stop], return_when=asyncio.FIRST_COMPLETED)
+                if work.done():
+                    work.result()
+                else:
+                    self.logger.info("Crawl cancelled. Aborting in-flight requests")
+                    work.cancel()
+                    await asyncio.gather(work, return_exceptions=True)
+            finally:
+                unregister()
+                stop.cancel()
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(stop, *workers, return_exceptions=True)
+
+    async def discover_and_drain(self, session, max_pages=None):
+        """Run discovery, then wait until every queued skin URL has been scraped"""
+        await self.discovery_worker(session, self.scraper.discover_categories(), max_pages)
+        await self.queue.join()
+
+    def queue_from_thread(self, skin_url):
+        """Queue a skin URL from a worker thread; asyncio queues may only be touched on the loop"""
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, skin_url)
+
+    def connect_trace(self):
+        """Trace config reporting the time spent opening each new connection (DNS, TCP and TLS)"""
+        metrics = self.scraper.metrics
+
+        async def on_start(session, context, params):
+            context.connect_started = time.perf_counter()
+
+        async def on_end(session, context, params):
+            seconds = time.perf_counter() - context.connect_started
+            metrics.observe('connect', seconds)
+            if context.trace_request_ctx is not None:
+                context.trace_request_ctx['connect'] = seconds
+
+        trace = aiohttp.TraceConfig()
+        trace.on_connection_create_start.append(on_start)
+        trace.on_connection_create_end.append(on_end)
+        return trace
+
+    async def fetch(self, session, url, retries=None, missing_ok=False):
+        """Fetch a page body with the same retry policy as RainmeterScraper.get_page"""
+        scraper = self.scraper
+        if scraper.replay:
+            response = scraper.replayed_page(url, missing_ok)
+            return response.content if response else response
+
+        retries = retries or scraper.retry_policy.max_attempts
+
+        for attempt in range(retries):
+            # Hold off while the host's circuit breaker is open
+            pause = scraper.circuit_breakers.for_url(url).wait_time()
+            if pause > 0:
+                with scraper.tracer.span('circuit_breaker_pause', url=url, seconds=round(pause, 3)):
+                    await asyncio.sleep(pause)
+
+            # Wait for one of the engine's request slots; that wait is queueing, not fetching
+            with scraper.tracer.span('queue_wait', url=url), scraper.metrics.time_stage('queue_wait'):
+                await self.semaphore.acquire()
+            try:
+                with scraper.tracer.span('fetch', url=url, attempt=attempt + 1):
+                    # Wait for a slot in the shared per-host budget
+                    with scraper.tracer.span('rate_limit'), scraper.metrics.time_stage('rate_limit'):
+                        await scraper.rate_limiter.acquire_async(url)
+
+                    try:
+                        # Revalidate cached pages instead of downloading them again (cache file
+                        # I/O and gzip run in the default executor, off the event loop)
+                        validators = (await asyncio.to_thread(scraper.http_cache.conditional_headers, url)
+                                      if scraper.http_cache and not scraper.archive else {})
+                        headers = {'User-Agent': random.choice(scraper.user_agents), **validators}
+                        timing = {}
+                        started = time.perf_counter()
+                        async with session.get(url, headers=headers, trace_request_ctx=timing) as response:
+                            first_byte = time.perf_counter()
+                            content = await response.read()
+                            scraper.metrics.record_response(response.status, len(content),
+                                                            first_byte - started - timing.get('connect', 0.0),
+                                                            time.perf_counter() - first_byte)
+                            scraper.tracer.annotate(status=response.status, bytes=len(content))
+                            if scraper.archive:
+                                scraper.archive.record(url, response.status, response.headers, content)
+                            if response.status == 304 and validators:
+                                cached = await asyncio.to_thread(scraper.cached_response, url)
+                                if cached:
+                                    scraper.record_fetch_success(url)
+                                    return cached.content
+                                raise aiohttp.ClientError(f"304 for {url} but the cached body is missing")
+
+                            response.raise_for_status()
+                            scraper.record_fetch_success(url)
+                            if scraper.http_cache:
+                                await asyncio.to_thread(scraper.http_cache.store, url, content, response.headers)
+                            return content
+                    except aiohttp.ClientResponseError as e:
+                        wait = scraper.handle_fetch_error(url, attempt, retries, e, status=e.status,
+                                                          headers=e.headers, missing_ok=missing_ok)
+                    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                        scraper.metrics.record_fetch_error(e)
+                        wait = scraper.handle_fetch_error(url, attempt, retries, e, missing_ok=missing_ok)
+            finally:
+                self.semaphore.release()
+
+            if wait is None or wait is NOT_FOUND:
+                return wait
+            with scraper.tracer.span('retry_sleep', url=url, attempt=attempt + 1, seconds=round(wait, 3)):
+                await asyncio.sleep(wait)
+        return None
+
+    async def walk_listing(self, session, walk, max_urls=None):
+        """Fetch a listing's pages in order, stopping at its last page, an empty page or a 404"""
+        scraper = self.scraper
+
+        while not walk.done and not scraper.discovery_target_reached(max_urls):
+            page_url = walk.next_url()
+            listing = None
+            failed = False
+            try:
+                with scraper.tracer.span('discovery_page', url=page_url), scraper.metrics.busy('discovery'):
+                    content = await self.fetch(session, page_url, missing_ok=True)
+                    failed = content is None
+                    if content:
+                        listing = scraper.claim_listing_links(
+                            page_url, await scraper.parse_pool.parse_listing_page_async(page_url, content))
+                        scraper.tracer.annotate(skin_links=len(listing.skin_links))
+            except Exception as e:
+                self.logger.error(f"Error extracting links from {page_url}: {e}")
+                failed = True
+
+            # Journaling does file I/O and fsync, so it runs in the default executor like the cache calls
+            await asyncio.to_thread(scraper.handle_listing_page, walk, listing, self.queue_from_thread, failed)
+
+    async def discover_from_sitemaps(self, session, max_urls=None):
+        """Queue the skin URLs listed in the site's sitemaps; returns how many were listed"""
+        scraper = self.scraper
+        reader = SitemapReader(scraper.base_url)
+        robots = await self.fetch(session, reader.robots_url, missing_ok=True)
+        reader.read_robots(robots.decode('utf-8', errors='replace') if robots else '')
+        failed = robots is None
+
+        while not scraper.discovery_target_reached(max_urls):
+            sitemap_url = reader.next_sitemap()
+            if sitemap_url is None:
+                scraper.mark_sitemaps_read(failed)
+                break
+            try:
+                with scraper.tracer.span('sitemap', url=sitemap_url):
+                    content = await self.fetch(session, sitemap_url, missing_ok=True)
+                    failed = failed or content is None
+                    if content:
+                        await asyncio.to_thread(scraper.handle_sitemap, reader, sitemap_url, content,
+                                                self.queue_from_thread, max_urls)
+            except Exception as e:
+                self.logger.error(f"Error reading sitemap {sitemap_url}: {e}")
+                failed = True
+
+        self.logger.info(f"Sitemaps listed {reader.skin_urls} skin URLs in {len(reader.visited)} sitemaps")
+        return reader.skin_urls
+
+    async def discovery_worker(self, session, category_urls, max_urls=None):
+        """Read the sitemaps, then walk the listings concurrently, feeding skin URLs to the workers"""
+        scraper = self.scraper
+        if scraper.resume_state.discovery_complete:
+            scraper.mark_discovery_complete()
+            return
+
+        scraper.discovery_progress = scraper.discovery_cursor()
+        if scraper.sitemaps_pending():
+            sitemap_urls = await self.discover_from_sitemaps(session, max_urls)
+        else:
+            sitemap_urls = scraper.discovery_progress['sitemap_urls']
+        walks = scraper.start_listing_walks(category_urls, gaps_only=sitemap_urls > 0)
+        self.discovery_workers = max(1, len(walks))
+        await asyncio.gather(*(self.walk_listing(session, walk, max_urls) for walk in walks))
+
+        scraper.mark_discovery_complete(walks)
+
+        progress = scraper.discovery_progress
+        self.logger.info(f"Asyncio discovery complete. Found {progress['total_discovered']} unique skin URLs "
+                         f"({progress['sitemap_urls']} from sitemaps) in {progress['pages_fetched']} pages")
+
+    async def scraping_worker(self, session):
+        """Consume discovered skin URLs until the crawl is cancelled"""
+        while True:
+            skin_url = await self.queue.get()
+            try:
+                with self.scraper.metrics.busy('scrape'):
+                    content = await self.fetch(session, skin_url)
+                    if content:
+                        skin_data = await self.scraper.parse_pool.parse_skin_details_async(skin_url, content)
+                        if skin_data:
+                            await asyncio.to_thread(self.scraper.record_skin, skin_data)
+            except Exception as e:
+                self.logger.error(f"Error in scraping worker: {e}")
+            finally:
+                self.queue.task_done()
@@ -0,0 +1,56 @@
+"""
+Cooperative cancellation for the Rainmeter Skins Scraper
+
+A CancelToken is shared by everything one crawl runs. Discovery and
+scraping workers check it between pages, and every wait (retry back-off,
+circuit breaker pauses, rate-limit slots, the monitor loop) sleeps on it,
+so a cancelled crawl wakes up at once instead of after the full delay.
+Requests already on the wire are allowed to finish, which bounds how long
+stopping takes by the request timeout.
+"""
+
+import threading
+
+
+class CancelToken:
+    """One-way stop flag; waits on it return early once it is set"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self.reason = None
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self, reason='Cancelled'):
+        """Set the token and run the registered callbacks; returns False if it was already set"""
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+        return True
+
+    def wait(self, seconds=None):
+        """Sleep up to `seconds`, waking early on cancellation; returns True if cancelled"""
+        return self._event.wait(seconds)
+
+    def on_cancel(self, callback):
+        """Run `callback` on cancellation (at once if already cancelled); returns a function that unregisters it"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._discard(callback)
+        callback()
+        return lambda: None
+
+    def _discard(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
@@ -0,0 +1,152 @@
+"""
+Crash-safe crawl checkpoints for the Rainmeter Skins Scraper
+
+Progress is appended to a newline-delimited JSON journal: URLs added to
+the scraping frontier, skin URLs that failed permanently or were skipped
+by an incremental crawl, and the discovery cursor. Finished skins are the
+records in the run's record file (see record_sink), so a skin is never
+marked done without its record. Events are buffered and written with
+fsync in small batches, so a crash loses at most the last few seconds of
+work, and replaying the journal restores the exact state needed to resume.
+"""
+
+import json
+import os
+import threading
+import time
+
+
+def drop_torn_line(path):
+    """Cut a partially written final line, so appended lines start on a line of their own"""
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb+') as f:
+        end = position = f.seek(0, os.SEEK_END)
+        while position > 0:
+            start = max(0, position - 4096)
+            f.seek(start)
+            chunk = f.read(position - start)
+            if position == end and chunk.endswith(b'\n'):
+                return
+            newline = chunk.rfind(b'\n')
+            if newline != -1:
+                f.truncate(start + newline + 1)
+                return
+            position = start
+        f.truncate(0)
+
+
+class CrawlState:
+    """Crawl progress reconstructed from a journal"""
+
+    def __init__(self):
+        self.frontier = []          # Skin URLs queued for scraping, in discovery order
+        self.done = set()           # Skin URLs whose record is in the record file
+        self.failed = set()         # Skin URLs that failed permanently (e.g. 404/410)
+        self.skipped = set()        # Skin URLs still fresh in the existing dataset
+        self.cursor = None          # Last discovery cursor written
+        self.discovery_complete = False
+        self.complete = False       # The run finished normally
+
+    @property
+    def pending(self):
+        """Frontier URLs that still have to be scraped"""
+        return [url for url in self.frontier if url not in self.done and url not in self.failed]
+
+    @property
+    def seen_urls(self):
+        return set(self.frontier) | self.done | self.failed | self.skipped
+
+
+class CrawlJournal:
+    """Append-only journal of crawl progress with batched fsync"""
+
+    def __init__(self, path=os.path.join('data', 'crawl_journal.jsonl'), flush_every=100, flush_interval=5.0):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._file = None
+
+    def open(self, resume=False):
+        """Open the journal, truncating it unless an interrupted run is being resumed"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if resume:
+            drop_torn_line(self.path)
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+        return self
+
+    def load(self):
+        """Replay the journal into a CrawlState; a torn final line is ignored"""
+        state = CrawlState()
+        if not os.path.exists(self.path):
+            return state
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue  # Partially written line from a crash
+
+                kind = event.get('type')
+                if kind == 'frontier':
+                    state.frontier.append(event['url'])
+                elif kind == 'failed':
+                    state.failed.add(event['url'])
+                elif kind == 'skipped':
+                    state.skipped.add(event['url'])
+                elif kind == 'cursor':
+                    state.cursor = event['value']
+                elif kind == 'discovery_complete':
+                    state.discovery_complete = True
+                elif kind == 'complete':
+                    state.complete = True
+        return state
+
+    def append(self, kind, **fields):
+        """Buffer an event and write the buffer out once it is due"""
+        event = {'type': kind, **fields}
+        with self._lock:
+            self._buffer.append(json.dumps(event, ensure_ascii=False))
+            due = (len(self._buffer) >= self.flush_every or
+                   time.monotonic() - self._last_flush >= self.flush_interval)
+        if due:
+            self.flush()
+
+    def frontier(self, url):
+        self.append('frontier', url=url)
+
+    def failed(self, url):
+        self.append('failed', url=url)
+
+    def skipped(self, url):
+        self.append('skipped', url=url)
+
+    def cursor(self, value):
+        """Journal the discovery position and checkpoint everything before it"""
+        self.append('cursor', value=value)
+        self.flush()
+
+    def flush(self):
+        """Write buffered events and fsync them to disk"""
+        with self._lock:
+            if self._file is None:
+                return
+            if self._buffer:
+                self._file.write('\n'.join(self._buffer) + '\n')
+                self._buffer = []
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            self._last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
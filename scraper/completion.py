@@ -0,0 +1,67 @@
+"""
+Crawl completion signalling for the Rainmeter Skins Scraper
+
+A CountdownLatch counts the skin URLs that were queued but not yet
+handled. Discovery adds one for every URL it queues and closes the latch
+when it has nothing more to queue; the scraping workers count each URL
+down once they are done with it. The latch opens the moment it is closed
+and the count reaches zero, so the crawl can shut its workers down right
+after the last page instead of waiting for idle timeouts.
+"""
+
+import threading
+
+
+class CountdownLatch:
+    """Count of outstanding work that opens once it is closed and drained (or aborted)"""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._count = 0
+        self._closed = False
+        self._aborted = False
+
+    @property
+    def count(self):
+        with self._condition:
+            return self._count
+
+    @property
+    def is_open(self):
+        with self._condition:
+            return self._opened()
+
+    def _opened(self):
+        return self._aborted or (self._closed and self._count == 0)
+
+    def add(self, n=1):
+        """Register `n` new units of work; call before handing them to a worker"""
+        with self._condition:
+            self._count += n
+
+    def done(self, n=1):
+        """Mark `n` units of work finished"""
+        with self._condition:
+            self._count -= n
+            if self._count < 0:
+                raise ValueError("CountdownLatch.done() called more times than add()")
+            if self._closed and self._count == 0:
+                self._condition.notify_all()
+
+    def close(self):
+        """No more work will be added; the latch opens once the count drains to zero"""
+        with self._condition:
+            self._closed = True
+            if self._count == 0:
+                self._condition.notify_all()
+
+    def abort(self):
+        """Open the latch now, e.g. when the crawl is cancelled"""
+        with self._condition:
+            self._aborted = True
+            self._condition.notify_all()
+
+    def wait(self, timeout=None):
+        """Block until the latch opens or `timeout` passes; returns whether it is open"""
+        with self._condition:
+            return self._condition.wait_for(self._opened, timeout)
@@ -0,0 +1,105 @@
+"""
+Process-wide dataset cache for the web interface
+
+The dashboard polls /api/get_data every few seconds and every viewer page
+queries the dataset again. DatasetCache loads the dataset store once into
+an immutable snapshot (a records view and a columnar view) and serves all
+read endpoints from it, with a full-text SearchIndex for /api/search. The
+snapshot is swapped atomically when the store file's mtime/size changes
+or the scraper reports a save; the index then only re-indexes the records
+that changed.
+"""
+
+import os
+import threading
+
+from .dataset_store import SKIN_FIELDS
+from .search_index import SearchIndex
+
+
+class DatasetSnapshot:
+    """One loaded version of the dataset; never modified after construction"""
+
+    def __init__(self, records, summary, stats, search_index=None, version=None):
+        self.records = records  # Records view, in dataset order
+        self.version = version  # Load number; a shared search index never goes back to an older one
+        self.columns = {field: [record[field] for record in records] for field in SKIN_FIELDS}
+        self.by_url = {record['url']: record for record in records}
+        self.summary = summary
+        self.stats = stats
+        # Full-text index shared with later snapshots and brought up to date incrementally
+        self.search_index = search_index if search_index is not None else SearchIndex()
+        self._index_synced = False
+        self._index_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.records)
+
+    def sync_index(self):
+        """Index the records added or changed since the previous snapshot"""
+        with self._index_lock:
+            if not self._index_synced:
+                self.search_index.update(self.records, self.version)
+                self._index_synced = True
+
+    def search(self, query='', category='', limit=20, offset=0):
+        """Ranked full-text search with an optional exact category filter; returns (rows, total)
+
+        Without query text the category's skins are listed in dataset order.
+        """
+        if not query.strip():
+            matches = [index for index, item_category in enumerate(self.columns['category'])
+                       if not category or item_category == category]
+            return [self.records[index] for index in matches[offset:offset + limit]], len(matches)
+
+        self.sync_index()
+        urls, total = self.search_index.search(query, category, limit, offset)
+        return [self.by_url[url] for url in urls if url in self.by_url], total
+
+
+class DatasetCache:
+    """Shared snapshot of a DatasetStore, reloaded when the store changes"""
+
+    def __init__(self, store):
+        self.store = store
+        self._snapshot = None
+        self._signature = None
+        self._lock = threading.Lock()
+        self.search_index = SearchIndex()
+        self.loads = 0
+
+    def signature(self):
+        """mtime/size of the database and its write-ahead log (None for a missing file)"""
+        signature = []
+        for path in (self.store.path, f"{self.store.path}-wal"):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                signature.append(None)
+            else:
+                signature.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def invalidate(self):
+        """Force a reload on the next read, e.g. after the scraper saved the dataset"""
+        with self._lock:
+            self._signature = None
+
+    def snapshot(self):
+        """Current snapshot, loading the store again if it changed since the last load"""
+        signature = self.signature()
+        snapshot = self._snapshot
+        if snapshot is not None and signature == self._signature:
+            return snapshot
+
+        with self._lock:
+            signature = self.signature()  # Taken before loading so a concurrent save is not missed
+            if self._snapshot is None or signature != self._signature:
+                records, stats = self.store.snapshot()
+                self.loads += 1
+                snapshot = DatasetSnapshot(records, stats['summary'], stats['stats'], self.search_index,
+                                           version=self.loads)
+                self._snapshot, self._signature = snapshot, signature
+                # Warm the search index without holding up the request that triggered the load
+                threading.Thread(target=snapshot.sync_index, daemon=True).start()
+            return self._snapshot
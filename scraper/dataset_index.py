@@ -0,0 +1,104 @@
+"""
+Index of a previously saved skins dataset for incremental crawls
+
+Loads the data/rainmeter_skins.db dataset store (or the JSON/CSV export of
+an older run when there is no store) into a URL -> record map so a crawl can skip skins that were scraped recently
+and merge freshly scraped records back into the full dataset.
+"""
+
+import csv
+import json
+import os
+from datetime import datetime, timedelta
+
+from .dataset_store import DatasetStore
+
+
+class DatasetIndex:
+    """URL-keyed view of an existing dataset with staleness checks"""
+
+    def __init__(self, records=None, max_age=timedelta(days=7)):
+        self.max_age = max_age
+        self.records = {}
+        for record in records or []:
+            if record.get('url'):
+                self.records[record['url']] = record
+
+    @classmethod
+    def load(cls, path_prefix=os.path.join('data', 'rainmeter_skins'), max_age=timedelta(days=7)):
+        """Load `<prefix>.db`, falling back to the `<prefix>.json` and `<prefix>.csv` exports"""
+        store = DatasetStore(f"{path_prefix}.db")
+        json_path = f"{path_prefix}.json"
+        csv_path = f"{path_prefix}.csv"
+        records = []
+
+        if store.exists():
+            records = store.records()
+        elif os.path.exists(json_path):
+            with open(json_path, 'r', encoding='utf-8') as f:
+                records = json.load(f)
+        elif os.path.exists(csv_path):
+            with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+                records = list(csv.DictReader(f))
+
+        return cls(records, max_age=max_age)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, url):
+        return url in self.records
+
+    def is_fresh(self, url, now=None, lastmod=None):
+        """True when the URL need not be fetched again
+
+        With a sitemap `lastmod` the record is fresh if it was scraped after the
+        page last changed; otherwise it is fresh if scraped within max_age.
+        """
+        record = self.records.get(url)
+        if not record or not record.get('content_hash'):
+            return False
+
+        try:
+            scraped_at = datetime.fromisoformat(record.get('scraped_at', ''))
+        except (TypeError, ValueError):
+            return False
+
+        if lastmod is not None:
+            return scraped_at >= lastmod
+        return (now or datetime.now()) - scraped_at < self.max_age
+
+    def merge_newest(self, records):
+        """Fold records into the index, keeping the most recently scraped copy of each URL"""
+        for record in records:
+            url = record.get('url')
+            previous = self.records.get(url)
+            if url and (previous is None or record.get('scraped_at', '') >= previous.get('scraped_at', '')):
+                self.records[url] = record
+        return self
+
+    def merge(self, new_records, summary):
+        """Stream freshly scraped records followed by the existing ones they do not replace
+
+        Counts added, refreshed and changed skins into `summary` as the records
+        pass through, so the new records never have to be held in memory.
+        """
+        for key in ('added', 'refreshed', 'changed'):
+            summary.setdefault(key, 0)
+        replaced = set()
+
+        for record in new_records:
+            url = record.get('url')
+            previous = self.records.get(url)
+            if previous is None:
+                summary['added'] += 1
+            else:
+                summary['refreshed'] += 1
+                if previous.get('content_hash') != record.get('content_hash'):
+                    summary['changed'] += 1
+            replaced.add(url)
+            yield record
+
+        for url, record in self.records.items():
+            if url not in replaced:
+                yield record
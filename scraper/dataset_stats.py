@@ -0,0 +1,83 @@
+"""
+Running dataset statistics for the Rainmeter Skins Scraper
+
+DatasetStats is updated one record at a time as records are written, so
+the totals shown by the web interface are computed once when the data is
+saved (and kept current while a crawl streams records in) instead of
+being recomputed over every record for each request.
+"""
+
+import re
+from collections import Counter
+
+RATING_RE = re.compile(r'(\d+\.?\d*)')
+TOP_VALUES = 10
+
+
+def rating_value(rating):
+    """First number of a rating such as `4.5 by 12 votes`, or None"""
+    match = RATING_RE.search(str(rating or ''))
+    return float(match.group(1)) if match else None
+
+
+def top_values(counts, limit=TOP_VALUES):
+    """Most frequent values, most common first (ties in value order)"""
+    return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit])
+
+
+class DatasetStats:
+    """Totals, developer/category counts and average rating over skin records"""
+
+    def __init__(self):
+        self.total = 0
+        self.with_downloads = 0
+        self.with_thumbnails = 0
+        self.developers = Counter()
+        self.categories = Counter()
+        self.rating_total = 0.0
+        self.rating_count = 0
+
+    @classmethod
+    def from_records(cls, records):
+        stats = cls()
+        for record in records:
+            stats.add(record)
+        return stats
+
+    def add(self, record):
+        self.total += 1
+        self.with_downloads += bool(str(record.get('download_url') or '').strip())
+        self.with_thumbnails += bool(str(record.get('thumbnail_url') or '').strip())
+        developer = str(record.get('developer') or '')
+        if developer.strip():
+            self.developers[developer] += 1
+        category = str(record.get('category') or '')
+        if category.strip():
+            self.categories[category] += 1
+        rating = rating_value(record.get('rating'))
+        if rating is not None:
+            self.rating_total += rating
+            self.rating_count += 1
+
+    def summary(self):
+        """Totals shown by the dashboard and viewer (/api/get_data)"""
+        return {
+            'total_skins': self.total,
+            'unique_developers': len(self.developers),
+            'with_downloads': self.with_downloads,
+            'with_thumbnails': self.with_thumbnails,
+            'categories': sorted(self.categories)
+        }
+
+    def details(self):
+        """Average rating and top developers/categories (/api/stats)"""
+        return {
+            'total_skins': self.total,
+            'unique_developers': len(self.developers),
+            'avg_rating': self.rating_total / self.rating_count if self.rating_count else None,
+            'top_developers': top_values(self.developers),
+            'top_categories': top_values(self.categories)
+        }
+
+    def to_dict(self):
+        return {'summary': self.summary(), 'stats': self.details()}
@@ -0,0 +1,122 @@
+"""
+SQLite dataset store for the Rainmeter Skins Scraper
+
+The scraped dataset lives in data/rainmeter_skins.db, one row per skin with
+indexes on the columns the web app filters and groups by. The scraper
+writes it on save and the web app loads it through DatasetCache, so a
+request no longer re-reads the whole CSV; CSV and JSON are export formats
+only. Summary
+statistics are computed while the rows are written and stored with them
+in the same transaction, so they always describe the saved data version.
+"""
+
+import json
+import os
+import sqlite3
+from contextlib import closing
+
+from .dataset_stats import DatasetStats, rating_value
+
+SKIN_FIELDS = (
+    'url', 'name', 'description', 'thumbnail_url', 'download_url', 'tags', 'rating',
+    'developer', 'category', 'downloads', 'file_size', 'last_updated', 'version',
+    'scraped_at', 'content_hash'
+)
+
+COLUMNS = ',\n    '.join(f"{field} TEXT NOT NULL DEFAULT ''" for field in SKIN_FIELDS)
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS skins (
+    {COLUMNS},
+    rating_value REAL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS skins_url ON skins (url);
+CREATE INDEX IF NOT EXISTS skins_category ON skins (category);
+CREATE INDEX IF NOT EXISTS skins_developer ON skins (developer);
+CREATE TABLE IF NOT EXISTS dataset_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class DatasetStore:
+    """Indexed SQLite table of skin records"""
+
+    def __init__(self, path=os.path.join('data', 'rainmeter_skins.db')):
+        self.path = path
+        self._schema_ready = False
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def _connect(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        if not self._schema_ready:
+            conn.execute('PRAGMA journal_mode=WAL')  # Readers keep working while a save runs
+            conn.executescript(SCHEMA)
+            self._schema_ready = True
+        return conn
+
+    def replace(self, records):
+        """Replace the dataset and its statistics with `records` in one transaction; returns the row count"""
+        columns = SKIN_FIELDS + ('rating_value',)
+        sql = (f"INSERT OR REPLACE INTO skins ({', '.join(columns)}) "
+               f"VALUES ({', '.join('?' * len(columns))})")
+        stats = DatasetStats()
+
+        def rows():
+            urls = set()
+            for record in records:
+                url = record.get('url')
+                if not url or url in urls:
+                    continue
+                urls.add(url)
+                stats.add(record)
+                yield (tuple(str(record.get(field) or '') for field in SKIN_FIELDS) +
+                       (rating_value(record.get('rating')),))
+
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute('DELETE FROM skins')
+                conn.executemany(sql, rows())
+                self._write_stats(conn, stats)
+            return stats.total
+
+    def _write_stats(self, conn, stats):
+        version = self._read_meta(conn, 'version') or 0
+        conn.executemany('INSERT OR REPLACE INTO dataset_meta (key, value) VALUES (?, ?)', [
+            ('stats', json.dumps(stats.to_dict())),
+            ('version', json.dumps(version + 1))
+        ])
+
+    def _read_meta(self, conn, key):
+        row = conn.execute('SELECT value FROM dataset_meta WHERE key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _select(self, conn=None):
+        sql = f"SELECT {', '.join(SKIN_FIELDS)} FROM skins ORDER BY rowid"
+        if conn is not None:
+            return [dict(row) for row in conn.execute(sql)]
+        with closing(self._connect()) as conn:
+            return [dict(row) for row in conn.execute(sql)]
+
+    def records(self):
+        """All records in dataset order"""
+        return self._select()
+
+    def snapshot(self):
+        """All records and their saved statistics, read in one transaction so both describe the same save"""
+        with closing(self._connect()) as conn:
+            conn.execute('BEGIN')
+            try:
+                records = self._select(conn=conn)
+                stats = self._read_meta(conn, 'stats')
+            finally:
+                conn.rollback()
+        if stats is None:
+            stats = DatasetStats.from_records(records).to_dict()
+        return records, stats
@@ -0,0 +1,36 @@
+"""
+HTML parser backends for the Rainmeter Skins Scraper
+
+BeautifulSoup can build its tree with several parsers. lxml is a C parser
+and several times faster than Python's built-in html.parser, which matters
+because parsing is the CPU-bound part of a crawl. html.parser stays
+available as a fallback for environments without lxml.
+"""
+
+import logging
+
+from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
+
+PARSERS = ('lxml', 'html.parser')
+DEFAULT_PARSER = 'lxml'
+
+
+def parser_available(name):
+    """True if BeautifulSoup has a tree builder for the parser"""
+    return builder_registry.lookup(name) is not None
+
+
+def resolve_parser(name=DEFAULT_PARSER):
+    """Return the parser to use for `name`, falling back to html.parser when it is missing"""
+    if name not in PARSERS:
+        raise ValueError(f"Unknown parser '{name}', expected one of {PARSERS}")
+    if not parser_available(name):
+        logging.getLogger(__name__).warning(f"Parser '{name}' is not installed, using html.parser")
+        return 'html.parser'
+    return name
+
+
+def make_soup(content, parser=DEFAULT_PARSER, parse_only=None):
+    """Parse a page body (bytes or str), optionally keeping only what `parse_only` matches"""
+    return BeautifulSoup(content, parser, parse_only=parse_only)
@@ -0,0 +1,109 @@
+"""
+Persistent HTTP response cache for the Rainmeter Skins Scraper
+
+Stores page bodies together with their ETag/Last-Modified validators on
+disk so the next run can revalidate with conditional requests and reuse
+the cached body when the server answers 304 Not Modified.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+
+class CachedResponse:
+    """Minimal stand-in for requests.Response built from a cached body"""
+
+    from_cache = True
+
+    def __init__(self, url, content, headers=None, status_code=200):
+        self.url = url
+        self.content = content
+        self.headers = headers or {}
+        self.status_code = status_code
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+
+class HttpCache:
+    """On-disk cache of response bodies keyed by URL"""
+
+    def __init__(self, directory=os.path.join('data', 'http_cache')):
+        self.directory = directory
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        subdir = os.path.join(self.directory, key[:2])
+        return os.path.join(subdir, f"{key}.json"), os.path.join(subdir, f"{key}.body.gz")
+
+    def lookup(self, url):
+        """Return the stored metadata for a URL, or None when it is not cached"""
+        meta_path, body_path = self._paths(url)
+        if not os.path.exists(meta_path) or not os.path.exists(body_path):
+            return None
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def conditional_headers(self, url):
+        """Build If-None-Match/If-Modified-Since headers for a cached URL"""
+        entry = self.lookup(url)
+        if not entry:
+            return {}
+
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def load(self, url):
+        """Return a CachedResponse for a URL, or None when the body is missing"""
+        entry = self.lookup(url)
+        if not entry:
+            return None
+
+        _, body_path = self._paths(url)
+        try:
+            with gzip.open(body_path, 'rb') as f:
+                content = f.read()
+        except OSError:
+            return None
+        return CachedResponse(url, content, entry.get('headers'))
+
+    def store(self, url, content, headers):
+        """Cache a 200 response body if the server sent validators for it"""
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return False
+
+        meta_path, body_path = self._paths(url)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+
+        entry = {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'headers': {'Content-Type': headers.get('Content-Type', '')},
+            'stored_at': datetime.now().isoformat()
+        }
+
+        # Write to temporary files first so readers never see a partial entry
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(body_path + suffix, 'wb') as f:
+            f.write(content)
+        with open(meta_path + suffix, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(body_path + suffix, body_path)
+        os.replace(meta_path + suffix, meta_path)
+        return True
@@ -0,0 +1,262 @@
+"""
+Scrape job manager for the web interface
+
+Every scrape request becomes a ScrapeJob with its own id, status, stats
+and output directory (data/jobs/<id>/). A full crawl, an incremental
+refresh and a targeted category crawl can then be scheduled together
+without overwriting each other's progress or files. Jobs wait in a
+bounded FIFO queue, and at most `max_running` of them run at once. The
+manager only schedules; a job's work is done by the `runner(job)`
+callable it is created with.
+"""
+
+import os
+import threading
+import uuid
+from collections import deque
+from datetime import datetime
+
+from .progress_events import ProgressBroadcaster
+
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+JOB_STATES = (QUEUED, RUNNING, COMPLETED, FAILED, CANCELLED)
+
+MAX_FINISHED_JOBS = 50  # Finished jobs kept for /api/jobs; older ones are forgotten
+
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the queue is at capacity"""
+
+
+def initial_status():
+    return {
+        'is_running': False,
+        'progress': 0,
+        'current_task': 'Ready to start',
+        'total_found': 0,
+        'scraped_count': 0,
+        'discovered_count': 0,
+        'discovery_complete': False,
+        'errors': [],
+        'start_time': None,
+        'estimated_time': None,
+        'scraping_rate': 0,  # skins per minute
+        'discovery_rate': 0  # URLs per minute
+    }
+
+
+class ScrapeJob:
+    """One scheduled scrape: its parameters, state, live status and output paths"""
+
+    def __init__(self, job_id, params, output_dir, on_change=None):
+        self.id = job_id
+        self.params = params
+        self.output_dir = output_dir
+        self.state = QUEUED
+        self.created_at = datetime.now().isoformat()
+        self.started_at = None
+        self.finished_at = None
+        self.status = dict(initial_status(), current_task='Queued')
+        self.stats = {}
+        self.scraper = None  # Set by the runner while the job runs; cancel() stops it
+        self.cancel_requested = False
+        self.thread = None
+        self.on_change = on_change
+        # Pushes this job's progress to /api/jobs/<id>/events subscribers
+        self.events = ProgressBroadcaster(self.progress)
+
+    @property
+    def dataset_prefix(self):
+        return os.path.join(self.output_dir, 'rainmeter_skins')
+
+    @property
+    def outputs(self):
+        return {
+            'records': f'{self.dataset_prefix}.ndjson',
+            'checkpoint': os.path.join(self.output_dir, 'crawl_journal.jsonl')
+        }
+
+    @property
+    def is_active(self):
+        return self.state in (QUEUED, RUNNING)
+
+    def notify(self):
+        """Wake up this job's event stream and the manager's listener"""
+        self.events.notify()
+        if self.on_change:
+            self.on_change()
+
+    def update(self, **changes):
+        """Change the job status and notify listeners"""
+        self.status.update(changes)
+        self.notify()
+
+    def progress(self):
+        """Job status merged with the running scraper's counters, rates and queue depth"""
+        status = dict(self.status)
+        if self.scraper and status['is_running']:
+            try:
+                live_stats = self.scraper.get_progress_stats()
+            except Exception:
+                live_stats = {}  # Continue with the last known status if the scraper is mid-setup
+            for key in ('discovered_count', 'scraped_count', 'discovery_complete', 'failed_count'):
+                if key in live_stats:
+                    status[key] = live_stats[key]
+
+        discovered = status.get('discovered_count', 0)
+        scraped = status.get('scraped_count', 0)
+        failed = status.get('failed_count', 0)
+        status['failed_count'] = failed
+        status['queue_depth'] = max(0, discovered - scraped - failed)
+        if status['is_running'] and status['start_time']:
+            elapsed = (datetime.now() - datetime.fromisoformat(status['start_time'])).total_seconds() / 60
+            if elapsed > 0:
+                status['discovery_rate'] = round(discovered / elapsed, 1)
+                status['scraping_rate'] = round(scraped / elapsed, 1)
+            if status['scraping_rate'] and status['discovery_complete']:
+                status['estimated_time'] = f"{status['queue_depth'] / status['scraping_rate']:.1f} min"
+        status['errors'] = list(status['errors'])
+        status['job_id'] = self.id
+        status['state'] = self.state
+        return status
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'state': self.state,
+            'params': self.params,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'cancel_requested': self.cancel_requested,
+            'outputs': self.outputs,
+            'stats': self.stats,
+            'status': self.progress()
+        }
+
+
+class JobManager:
+    """Bounded queue of scrape jobs, run at most `max_running` at a time"""
+
+    def __init__(self, runner, max_running=1, max_queued=10, output_root=os.path.join('data', 'jobs'),
+                 on_change=None):
+        self.runner = runner
+        self.max_running = max(1, max_running)
+        self.max_queued = max_queued
+        self.output_root = output_root
+        self.on_change = on_change  # Called without arguments whenever any job changes
+        self._jobs = {}  # id -> ScrapeJob, in submission order
+        self._queue = deque()
+        self._running = 0
+        self._lock = threading.Lock()
+
+    def submit(self, params, output_dir=None):
+        """Queue a job and start it if a slot is free; raises JobQueueFull when the queue is at capacity
+
+        `output_dir` reuses an earlier job's directory, e.g. to resume it; by default
+        each job writes to `<output_root>/<job id>/`.
+        """
+        with self._lock:
+            if len(self._queue) >= self.max_queued:
+                raise JobQueueFull(f"The job queue is full ({self.max_queued} jobs waiting)")
+            job_id = uuid.uuid4().hex[:12]
+            job = ScrapeJob(job_id, params, output_dir or os.path.join(self.output_root, job_id), self.notify)
+            self._jobs[job_id] = job
+            self._queue.append(job)
+            self._forget_finished()
+        job.notify()
+        self._dispatch()
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self):
+        """All known jobs, newest first"""
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def active_jobs(self):
+        return [job for job in self.jobs() if job.is_active]
+
+    def current(self):
+        """The job single-job views report on: the newest running job, else the newest one that ran"""
+        jobs = self.jobs()
+        running = [job for job in jobs if job.state == RUNNING]
+        started = [job for job in jobs if job.started_at]
+        return (running or started or [None])[0]
+
+    def cancel(self, job_id):
+        """Cancel a queued job, or ask a running one to stop; returns the job (None if unknown)"""
+        job = self.get(job_id)
+        if job is None:
+            return None
+        with self._lock:
+            if job.state == QUEUED:
+                self._queue.remove(job)
+                job.state = CANCELLED
+                job.finished_at = datetime.now().isoformat()
+                job.status['current_task'] = 'Cancelled before it started'
+            elif job.state == RUNNING:
+                job.cancel_requested = True
+                job.status['current_task'] = 'Stopping...'
+            else:
+                return job
+        # A runner that has not attached its scraper yet checks cancel_requested after attaching it
+        if job.cancel_requested and job.scraper:
+            job.scraper.cancel('Stopped by user')
+        job.notify()
+        return job
+
+    def notify(self):
+        if self.on_change:
+            self.on_change()
+
+    def _dispatch(self):
+        """Start queued jobs while there are free slots"""
+        started = []
+        with self._lock:
+            while self._queue and self._running < self.max_running:
+                job = self._queue.popleft()
+                job.state = RUNNING
+                job.started_at = datetime.now().isoformat()
+                job.status.update(is_running=True, current_task='Initializing parallel scraper...',
+                                  start_time=job.started_at)
+                self._running += 1
+                started.append(job)
+
+        for job in started:
+            job.thread = threading.Thread(target=self._run, args=(job,), name=f'job-{job.id}', daemon=True)
+            job.thread.start()
+            job.notify()
+
+    def _run(self, job):
+        state = COMPLETED
+        try:
+            self.runner(job)
+            if job.cancel_requested:
+                state = CANCELLED
+        except Exception as e:
+            state = FAILED
+            job.status['errors'].append(str(e))
+            job.status['current_task'] = f'Error: {str(e)}'
+        finally:
+            # Keep the final counters and rates once the live scraper stats are no longer read
+            final = {**job.progress(), 'is_running': False}
+            with self._lock:
+                job.status.update(final)
+                job.state = state
+                job.finished_at = datetime.now().isoformat()
+                self._running -= 1
+            job.notify()
+            self._dispatch()
+
+    def _forget_finished(self):
+        finished = [job_id for job_id, job in self._jobs.items() if not job.is_active]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
@@ -0,0 +1,133 @@
+"""
+Single-pass skin link extraction for listing pages
+
+Listing pages used to be scanned with ~40 overlapping CSS selectors, each
+one a full walk of the document followed by the same URL filter. The
+extractor below visits every element with an href once, applies
+precompiled URL and exclusion matchers first and only then checks whether
+the element would have matched one of the old selectors, so it returns
+exactly the same links for a fraction of the work.
+"""
+
+import re
+from urllib.parse import urljoin, urlparse
+
+# URL filters (applied to the lower-cased URL where the old code did)
+SKIN_PATH_RE = re.compile(r'/(?:skin|theme|widget|rainmeter)/')
+EXCLUDE_RE = re.compile(r'javascript:|mailto:|tel:|contact|about|privacy|terms|how-to|tutorial|guide')
+COLLECTION_EXCLUDE_RE = re.compile(r'javascript:|mailto:|tel:|contact|about|privacy|wp-|admin')
+COLLECTION_PAGE_RE = re.compile(r'best-rainmeter|collection|rainmeter-|tag/')
+LINK_TEXT_RE = re.compile(r'skin|theme|widget|rainmeter|clock|visualizer|weather|system|monitor')
+TITLE_RE = re.compile(r'[Ss]kin|[Rr]ainmeter')
+
+# Classes that select any element carrying them (.more-link, .read-more, ...)
+LINK_CLASSES = frozenset(['more-link', 'read-more', 'continue-reading'])
+
+# Ancestors that select every link below them (.entry-title a, main a, #content a, ...)
+CONTAINER_CLASSES = frozenset([
+    'entry-title', 'post-title', 'skin-title',
+    'grid-item', 'list-item', 'skin-item', 'item',
+    'thumbnail', 'image', 'featured-image',
+    'card', 'widget', 'skin-card',
+    'entry', 'post', 'search-result', 'result',
+    'navigation', 'pagination', 'page-numbers',
+])
+CONTAINER_TAGS = frozenset(['main'])
+CONTAINER_IDS = frozenset(['content'])
+
+
+class ExtractedLinks:
+    """Skin links found on one listing page"""
+
+    def __init__(self, links, candidates):
+        self.links = links            # Skin URLs in document order, without duplicates
+        self.candidates = candidates  # URLs that passed the strict skin URL filter
+
+
+class LinkExtractor:
+    """Find skin links on a listing page in a single pass over its links"""
+
+    def __init__(self, base_url="https://visualskins.com"):
+        self.base_url = base_url
+        self.site_host = urlparse(base_url).hostname or 'visualskins.com'
+
+    def is_skin_url(self, full_url):
+        """Strict filter for links picked up by the listing selectors"""
+        return (SKIN_PATH_RE.search(full_url) is not None and
+                self.site_host in full_url and
+                EXCLUDE_RE.search(full_url.lower()) is None)
+
+    def is_site_url(self, full_url):
+        """Permissive filter used on collection and tag pages"""
+        return (self.site_host in full_url and
+                COLLECTION_EXCLUDE_RE.search(full_url.lower()) is None)
+
+    def extract(self, soup, page_url):
+        """Return the skin links on a parsed listing page"""
+        collection_page = COLLECTION_PAGE_RE.search(page_url.lower()) is not None
+        containers = {}  # id(element) -> whether links below it are selected
+        resolved = {}    # href -> absolute URL
+        links = {}
+        candidates = set()
+
+        for element in soup.find_all(href=True):
+            href = element['href']
+            if not href:
+                continue
+
+            full_url = resolved.get(href)
+            if full_url is None:
+                full_url = resolved[href] = urljoin(self.base_url, href)
+
+            if self.is_skin_url(full_url) and self.is_selected(element, containers):
+                candidates.add(full_url)
+                links[full_url] = None
+            elif (collection_page and element.name == 'a' and full_url not in links and
+                    self.is_site_url(full_url) and
+                    LINK_TEXT_RE.search(element.get_text().lower()) is not None):
+                links[full_url] = None
+
+        return ExtractedLinks(list(links), candidates)
+
+    def is_selected(self, element, containers):
+        """True if one of the original listing selectors matches the element"""
+        if self._has_class(element, LINK_CLASSES):
+            return True
+        if element.name != 'a':
+            return False
+        if '/skin/' in element['href'] or TITLE_RE.search(element.get('title', '')):
+            return True
+
+        # Walk up until a cached answer or the document root, then cache the path
+        path = []
+        selected = False
+        parent = element.parent
+        while parent is not None and parent.name != '[document]':
+            cached = containers.get(id(parent))
+            if cached is not None:
+                selected = cached
+                break
+            path.append(parent)
+            if self._is_container(parent):
+                selected = True
+                break
+            parent = parent.parent
+
+        # Ancestors below a selecting container are selecting as well
+        for ancestor in path:
+            containers[id(ancestor)] = selected
+        return selected
+
+    def _is_container(self, element):
+        return (element.name in CONTAINER_TAGS or
+                element.get('id') in CONTAINER_IDS or
+                self._has_class(element, CONTAINER_CLASSES))
+
+    @staticmethod
+    def _has_class(element, classes):
+        value = element.get('class')
+        if not value:
+            return False
+        if isinstance(value, str):
+            value = value.split()
+        return not classes.isdisjoint(value)
@@ -0,0 +1,99 @@
+"""
+Lazy pagination discovery for listing pages
+
+Instead of generating page/1..50 for every category up front, each listing
+root is walked page by page. The last page is read from the pagination
+links on the first page when the site exposes them; otherwise the walk
+continues until the first empty page or 404.
+"""
+
+import re
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+PAGE_PATH_RE = re.compile(r'/page/(\d+)/?$')
+
+
+def listing_page_url(root_url, page):
+    """Build the URL of page `page` of a listing root (`/tag/x/page/2/`, `/page/2/?s=x`)"""
+    if page <= 1:
+        return root_url
+    parts = urlsplit(root_url)
+    path = parts.path if parts.path.endswith('/') else parts.path + '/'
+    return urlunsplit((parts.scheme, parts.netloc, f"{path}page/{page}/", parts.query, ''))
+
+
+def listing_root(url):
+    """Strip a trailing page/N/ segment, returning (root_url, page_number)"""
+    parts = urlsplit(url)
+    match = PAGE_PATH_RE.search(parts.path)
+    if not match:
+        return urlunsplit((parts.scheme, parts.netloc, parts.path, parts.query, '')), 1
+    path = parts.path[:match.start()] + '/'
+    return urlunsplit((parts.scheme, parts.netloc, path, parts.query, '')), int(match.group(1))
+
+
+def find_page_links(soup, page_url):
+    """Map page number -> URL for pagination links that belong to the same listing"""
+    root, _ = listing_root(page_url)
+    pages = {}
+    for link in soup.select('.pagination a[href], .page-numbers[href], .navigation a[href], .nav-links a[href]'):
+        full_url = urljoin(page_url, link['href'])
+        link_root, number = listing_root(full_url)
+        if link_root == root:
+            pages[number] = full_url
+    return pages
+
+
+class ListingPage:
+    """Result of parsing one listing page"""
+
+    def __init__(self, skin_links, candidate_count, page_links=None):
+        self.skin_links = skin_links            # Skin URLs not seen before
+        self.candidate_count = candidate_count  # Skin URLs on the page, including already seen ones
+        self.page_links = page_links or {}      # Pagination: page number -> URL
+
+
+class ListingWalk:
+    """Walk one listing root in page order until its last real page"""
+
+    def __init__(self, root_url, next_page=1, until_known=False):
+        self.root_url = root_url
+        self.page = next_page
+        self.until_known = until_known  # Stop at the first page without new skin links
+        self.last_page = None
+        self.page_links = {}
+        self.done = False
+        self.failed = False  # Stopped on a page that could not be fetched; a resumed run retries it
+
+    @property
+    def finished(self):
+        """True once the walk reached the end of the listing (not just stopped on a failed page)"""
+        return self.done and not self.failed
+
+    def next_url(self):
+        return self.page_links.get(self.page) or listing_page_url(self.root_url, self.page)
+
+    def advance(self, listing, failed=False):
+        """Record the outcome of fetching the current page and move to the next one
+
+        `listing` is None when the page does not exist (404, 410), which ends the
+        listing. With `failed` the page could not be fetched after retries: the
+        walk stops on that page without finishing the listing.
+        """
+        if failed:
+            self.done = self.failed = True
+            return
+        if listing is None or listing.candidate_count == 0:
+            self.done = True
+            return
+        if self.until_known and not listing.skin_links:
+            self.done = True
+            return
+
+        if listing.page_links:
+            self.page_links.update(listing.page_links)
+            self.last_page = max(self.page_links)
+
+        self.page += 1
+        if self.last_page is not None and self.page > self.last_page:
+            self.done = True
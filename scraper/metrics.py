@@ -0,0 +1,324 @@
+"""
+Crawl metrics for the Rainmeter Skins Scraper
+
+Counters, gauges and histograms rendered in the Prometheus text exposition
+format, without depending on prometheus_client. CrawlMetrics holds the
+crawl's metric families: per-stage latency (connect, time to first byte,
+download, parse, queue wait and the politeness wait for a rate limiter
+slot), response sizes, status codes, queue depths and worker utilization,
+so a slow crawl can be pinned on the network, on parsing or on politeness.
+"""
+
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from queue import Queue
+
+from requests.adapters import HTTPAdapter
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for value in labels.values())
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + '}'
+
+
+class Metric:
+    """A metric family: one value per combination of label values"""
+
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self):
+        """(name suffix, labels, value) tuples for the exposition"""
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in sorted(values):
+            yield '', dict(zip(self.labelnames, key)), value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        for suffix, labels, value in self.samples():
+            lines.append(f'{self.name}{suffix}{format_labels(labels)} {format_value(value)}')
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class FunctionSum:
+    """Sum of the functions registered for one gauge value, e.g. one per running crawl"""
+
+    def __init__(self):
+        self.functions = []
+
+    def __call__(self):
+        return sum(function() for function in list(self.functions))
+
+
+class Gauge(Metric):
+    """Gauge set directly or read from a function when the metrics are collected"""
+
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def get(self, **labels):
+        with self._lock:
+            value = self._values.get(self._key(labels), 0)
+        return value() if callable(value) else value
+
+    def set_function(self, function, **labels):
+        self.set(function, **labels)
+
+    def add_function(self, function, **labels):
+        """Add `function`'s value to the gauge; returns a callable that takes it out again"""
+        key = self._key(labels)
+        with self._lock:
+            total = self._values.get(key)
+            if not isinstance(total, FunctionSum):
+                total = self._values[key] = FunctionSum()
+            total.functions.append(function)
+
+        def remove():
+            with self._lock:
+                if function in total.functions:
+                    total.functions.remove(function)
+        return remove
+
+    def samples(self):
+        for suffix, labels, value in super().samples():
+            yield suffix, labels, value() if callable(value) else value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DURATION_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            counts = state[0]
+            for position, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[position] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def samples(self):
+        with self._lock:
+            values = [(key, ([*state[0]], state[1], state[2])) for key, state in self._values.items()]
+        for key, (counts, total, count) in sorted(values):
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield '_bucket', {**labels, 'le': format_value(bound)}, cumulative
+            yield '_sum', labels, total
+            yield '_count', labels, count
+
+
+class CrawlMetrics:
+    """The crawl's metric families, shared by the fetch, parse and discovery workers"""
+
+    def __init__(self):
+        self.stage_duration = Histogram(
+            'scraper_stage_duration_seconds', 'Time spent per crawl stage.', ('stage',))
+        self.response_size = Histogram(
+            'scraper_response_size_bytes', 'Size of downloaded response bodies.', buckets=SIZE_BUCKETS)
+        self.responses = Counter(
+            'scraper_http_responses_total', 'HTTP responses by status code.', ('status',))
+        self.fetch_errors = Counter(
+            'scraper_fetch_errors_total', 'Requests that failed without a response.', ('error',))
+        self.queue_depth = Gauge(
+            'scraper_queue_depth', 'Items waiting in a crawl queue.', ('queue',))
+        self.workers = Gauge(
+            'scraper_workers', 'Workers in a pool.', ('pool',))
+        self.workers_busy = Gauge(
+            'scraper_workers_busy', 'Workers of a pool currently handling an item.', ('pool',))
+        self.busy_seconds = Counter(
+            'scraper_worker_busy_seconds_total', 'Time workers of a pool spent handling items.', ('pool',))
+        self.utilization = Gauge(
+            'scraper_worker_utilization_ratio', 'Busy share of a pool\'s workers.', ('pool',))
+        self._connect = threading.local()
+
+    def families(self):
+        return (self.stage_duration, self.response_size, self.responses, self.fetch_errors,
+                self.queue_depth, self.workers, self.workers_busy, self.busy_seconds, self.utilization)
+
+    def render(self):
+        """All metrics in the Prometheus text format"""
+        return '\n'.join(family.render() for family in self.families()) + '\n'
+
+    def observe(self, stage, seconds):
+        self.stage_duration.observe(seconds, stage=stage)
+
+    @contextmanager
+    def time_stage(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def observe_connect(self, seconds):
+        """A new connection (DNS, TCP and TLS) was opened by the current thread"""
+        self.observe('connect', seconds)
+        self._connect.seconds = getattr(self._connect, 'seconds', 0.0) + seconds
+
+    def take_connect_time(self):
+        """Connect time accumulated by the current thread since the last call"""
+        seconds = getattr(self._connect, 'seconds', 0.0)
+        self._connect.seconds = 0.0
+        return seconds
+
+    def record_response(self, status, size, ttfb, download):
+        """Status, body size and timings of one HTTP response"""
+        self.responses.inc(status=status)
+        self.observe('ttfb', max(0.0, ttfb))
+        self.observe('download', download)
+        if status != 304:
+            self.response_size.observe(size)
+
+    def record_fetch_error(self, error):
+        self.fetch_errors.inc(error=type(error).__name__)
+
+    def observe_parse(self, seconds):
+        """A page was parsed; parser processes count as busy for that long"""
+        self.observe('parse', seconds)
+        self.busy_seconds.inc(seconds, pool='parse')
+
+    def set_pool_size(self, pool, workers, busy=None):
+        """Add a worker pool of `workers` (a number or a function) to the pool's gauges
+
+        `busy` is a function returning the busy workers, for pools that do
+        not report them through busy(). Pools of concurrent crawls add up;
+        returns a callable that takes this pool out of the gauges again.
+        """
+        removers = [self.workers.add_function(workers if callable(workers) else lambda: workers, pool=pool)]
+        if busy is not None:
+            removers.append(self.workers_busy.add_function(busy, pool=pool))
+        else:
+            self.workers_busy.inc(0, pool=pool)
+
+        def utilization():
+            size = self.workers.get(pool=pool)
+            return self.workers_busy.get(pool=pool) / size if size else 0
+        self.utilization.set_function(utilization, pool=pool)
+
+        def remove():
+            for remover in removers:
+                remover()
+        return remove
+
+    @contextmanager
+    def busy(self, pool):
+        """Count a worker of `pool` as busy for the duration of the block"""
+        self.workers_busy.inc(pool=pool)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.busy_seconds.inc(time.perf_counter() - started, pool=pool)
+            self.workers_busy.dec(pool=pool)
+
+
+class _TimedQueueMixin:
+    """FIFO queue that reports how long each item waited before being taken"""
+
+    def __init__(self, maxsize=0, on_wait=None):
+        self.on_wait = on_wait
+        super().__init__(maxsize)
+
+    def _put(self, item):
+        super()._put((item, time.monotonic()))
+
+    def _get(self):
+        item, queued_at = super()._get()
+        if self.on_wait is not None:
+            self.on_wait(time.monotonic() - queued_at)
+        return item
+
+
+class TimedQueue(_TimedQueueMixin, Queue):
+    pass
+
+
+class AsyncTimedQueue(_TimedQueueMixin, asyncio.Queue):
+    pass
+
+
+def timed_pool_class(pool_class, on_connect):
+    """urllib3 connection pool class whose connections report how long connecting took"""
+
+    class TimedConnection(pool_class.ConnectionCls):
+        def connect(self):
+            started = time.perf_counter()
+            try:
+                super().connect()
+            finally:
+                on_connect(time.perf_counter() - started)
+
+    return type(pool_class.__name__, (pool_class,), {'ConnectionCls': TimedConnection})
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """requests adapter reporting the time spent opening each new connection"""
+
+    def __init__(self, on_connect, **kwargs):
+        self.on_connect = on_connect
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            scheme: timed_pool_class(pool_class, self.on_connect)
+            for scheme, pool_class in self.poolmanager.pool_classes_by_scheme.items()
+        }
@@ -0,0 +1,209 @@
+"""
+Page parsing for the Rainmeter Skins Scraper
+
+PageParser turns fetched listing and skin pages into plain Python objects
+without touching any crawl state, so the same code runs inline in the
+fetch workers or in a pool of parser processes (see parse_pool).
+"""
+
+import hashlib
+import re
+from datetime import datetime
+from urllib.parse import urljoin
+
+from bs4 import SoupStrainer
+
+from .html_parser import DEFAULT_PARSER, make_soup
+from .link_extractor import LinkExtractor
+from .listing_walk import ListingPage, find_page_links
+
+# Text cleanup and skin page field patterns
+WHITESPACE_RE = re.compile(r'\s+')
+NON_ASCII_RE = re.compile(r'[^\x00-\x7F]+')
+THEME_SUFFIX_RE = re.compile(r'\s*rainmeter\s*theme\s*$', re.IGNORECASE)
+PARENTHESIZED_RE = re.compile(r'\(([^)]+)\)')
+VERSION_RE = re.compile(r'(\d+[\._]\d+)')
+
+# Classes of the skin page regions parse_skin_details reads
+SKIN_PAGE_REGION_CLASSES = {
+    'h1': {'title'},
+    'div': {'desc', 'uk-slider-items', 'ratetxt', 'tmenu'},
+    'a': {'uk-button-primary'},
+    'ul': {'uk-breadcrumb'},
+}
+
+
+def is_skin_page_region(name, attrs):
+    """SoupStrainer filter: keep only the skin page regions that parse_skin_details uses"""
+    if name == 'dl':
+        return True
+    if name == 'meta':
+        return attrs.get('name') == 'description'
+    classes = SKIN_PAGE_REGION_CLASSES.get(name)
+    if not classes:
+        return False
+    value = attrs.get('class') or ''
+    return not classes.isdisjoint(value.split() if isinstance(value, str) else value)
+
+
+SKIN_PAGE_STRAINER = SoupStrainer(is_skin_page_region)
+
+
+def clean_text(text):
+    """Clean and normalize text data"""
+    if not text:
+        return ""
+    text = WHITESPACE_RE.sub(' ', text.strip())
+    text = NON_ASCII_RE.sub('', text)  # Remove non-ASCII characters
+    return text
+
+
+class PageParser:
+    """Parse listing and skin pages for one site with one parser backend"""
+
+    def __init__(self, base_url="https://visualskins.com", parser=DEFAULT_PARSER):
+        self.base_url = base_url
+        self.parser = parser
+        self.link_extractor = LinkExtractor(base_url)
+
+    def parse_listing_page(self, page_url, content):
+        """Return every skin link and the pagination of a listing page
+
+        skin_links holds all links on the page; the scraper filters out the
+        ones other pages have already reported.
+        """
+        soup = make_soup(content, self.parser)
+        extracted = self.link_extractor.extract(soup, page_url)
+        return ListingPage(extracted.links, len(extracted.candidates), find_page_links(soup, page_url))
+
+    def parse_skin_details(self, skin_url, content):
+        """Build a skin record from an already fetched skin page"""
+        soup = make_soup(content, self.parser, parse_only=SKIN_PAGE_STRAINER)
+        
+        # Initialize skin data structure
+        skin_data = {
+            'url': skin_url,
+            'name': '',
+            'description': '',
+            'thumbnail_url': '',
+            'download_url': '',
+            'tags': '',
+            'rating': '',
+            'developer': '',
+            'category': '',
+            'downloads': '',
+            'file_size': '',
+            'last_updated': '',
+            'version': '',
+            'scraped_at': datetime.now().isoformat()
+        }
+        
+        # Extract name from h1 title
+        name_element = soup.select_one('h1.title')
+        if name_element:
+            name_text = name_element.get_text().strip()
+            # Clean up "Rainmeter Theme" suffix
+            name_text = THEME_SUFFIX_RE.sub('', name_text)
+            skin_data['name'] = clean_text(name_text)
+        
+        # Extract description from the desc div
+        desc_element = soup.select_one('div.desc p')
+        if desc_element:
+            desc_text = desc_element.get_text().strip()
+            skin_data['description'] = clean_text(desc_text)
+        
+        # If no description found, try meta description
+        if not skin_data['description']:
+            meta_desc = soup.select_one('meta[name="description"]')
+            if meta_desc:
+                skin_data['description'] = clean_text(meta_desc.get('content', ''))
+        
+        # Extract thumbnail from slider images
+        img_element = soup.select_one('div.uk-slider-items img')
+        if img_element:
+            src = img_element.get('src')
+            if src:
+                skin_data['thumbnail_url'] = urljoin(self.base_url, src)
+        
+        # Extract download link and file info
+        download_element = soup.select_one('a.uk-button-primary[href*=".rmskin"]')
+        if download_element:
+            href = download_element.get('href')
+            if href:
+                skin_data['download_url'] = urljoin(self.base_url, href)
+                
+                # Extract file size from download button text
+                button_text = download_element.get_text()
+                size_match = PARENTHESIZED_RE.search(button_text)
+                if size_match:
+                    skin_data['file_size'] = size_match.group(1)
+        
+        # Extract rating
+        rate_element = soup.select_one('div.ratetxt')
+        if rate_element:
+            rating_text = rate_element.get_text().strip()
+            if 'not rated' not in rating_text.lower():
+                skin_data['rating'] = clean_text(rating_text)
+        
+        # Extract tags from sidebar
+        tag_elements = soup.select('div.tmenu a[href*="/tag/"]')
+        tags = []
+        for tag_elem in tag_elements:
+            tag_text = tag_elem.get_text().strip()
+            # Clean out SVG and other unwanted content
+            if tag_text and len(tag_text) > 1 and not tag_text.startswith('<'):
+                tags.append(tag_text)
+        
+        if tags:
+            skin_data['tags'] = ', '.join(tags[:10])  # Limit to 10 tags
+        
+        # Extract category from breadcrumb or URL
+        breadcrumb_elements = soup.select('ul.uk-breadcrumb a')
+        for breadcrumb in breadcrumb_elements:
+            href = breadcrumb.get('href', '')
+            if '/tag/' in href:
+                category = breadcrumb.get_text().strip()
+                if category and category.lower() not in ['rainmeter skins']:
+                    skin_data['category'] = clean_text(category)
+                    break
+        
+        # Extract developer, date added and file information from the infobox
+        developer_found = date_found = False
+        for label, dd_element in self.parse_infobox(soup):
+            upper_label = label.upper()
+            
+            if upper_label == 'DEVELOPER' and not developer_found:
+                # Get the link text or just the text content
+                dev_link = dd_element.find('a')
+                skin_data['developer'] = clean_text((dev_link or dd_element).get_text())
+                developer_found = True
+            
+            if 'date added' in label.lower() and not date_found:
+                skin_data['last_updated'] = clean_text(dd_element.get_text())
+                date_found = True
+            
+            if 'FILENAME' in upper_label:
+                # Extract version from filename if available
+                version_match = VERSION_RE.search(clean_text(dd_element.get_text()))
+                if version_match:
+                    skin_data['version'] = version_match.group(1).replace('_', '.')
+            
+            elif 'FILE SIZE' in upper_label and not skin_data['file_size']:
+                skin_data['file_size'] = clean_text(dd_element.get_text())
+        
+        # Generate content hash for duplicate detection
+        content_hash = hashlib.md5(
+            f"{skin_data['name']}{skin_data['developer']}{skin_data['download_url']}".encode()
+        ).hexdigest()
+        skin_data['content_hash'] = content_hash
+        
+        return skin_data
+
+    def parse_infobox(self, soup):
+        """Return (label, dd element) pairs of the skin infobox in page order"""
+        fields = []
+        for dt in soup.find_all('dt'):
+            dd_element = dt.find_next_sibling('dd')
+            if dd_element:
+                fields.append((dt.get_text().strip(), dd_element))
+        return fields
@@ -0,0 +1,178 @@
+"""
+Process pool parsing stage for the Rainmeter Skins Scraper
+
+Fetch workers hand raw page bodies to a ParsePool instead of parsing them
+while holding the GIL. With workers > 0 the bodies are parsed by a
+ProcessPoolExecutor, so parsing scales with the number of cores and fetch
+threads go straight back to the network; at most `max_pending` bodies wait
+for a parser at any time, and fetchers block until a slot frees up. With
+workers = 0 pages are parsed inline in the calling thread.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .page_parser import PageParser
+
+# One parser process per core; a single core gains nothing from a pool
+DEFAULT_PARSE_WORKERS = os.cpu_count() if (os.cpu_count() or 1) > 1 else 0
+
+# PageParser of a worker process, created by _init_worker
+_page_parser = None
+
+
+def _init_worker(base_url, parser):
+    global _page_parser
+    _page_parser = PageParser(base_url, parser)
+
+
+def _timed(parse, *args):
+    """Run a parse function; returns its result, when it started (time.time()) and the seconds it took"""
+    started = time.time()
+    clock = time.perf_counter()
+    result = parse(*args)
+    return result, started, time.perf_counter() - clock
+
+
+def _parse_listing_page(page_url, content):
+    return _timed(_page_parser.parse_listing_page, page_url, content) + (os.getpid(),)
+
+
+def _parse_skin_details(skin_url, content):
+    return _timed(_page_parser.parse_skin_details, skin_url, content) + (os.getpid(),)
+
+
+class ParsePool:
+    """Parse fetched pages in worker processes, or inline when workers is 0"""
+
+    def __init__(self, page_parser, workers=DEFAULT_PARSE_WORKERS, max_pending=None, on_parsed=None):
+        self.page_parser = page_parser
+        self.workers = max(0, workers)
+        self.max_pending = max_pending or self.workers * 4
+        # Called with the page URL, start time, seconds taken and parser process id (None inline)
+        self.on_parsed = on_parsed
+        self._executor = None
+        self._slots = None    # Bounds the raw bodies waiting for a parser
+        self._pending = 0
+        self._idle = threading.Condition()
+
+    def start(self):
+        """Start the parser processes (no-op for inline parsing)"""
+        if self.workers and self._executor is None:
+            # spawn: forking a process that runs fetch threads can copy held locks
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(self.page_parser.base_url, self.page_parser.parser)
+            )
+            self._slots = threading.BoundedSemaphore(self.max_pending)
+        return self
+
+    def _submit(self, func, *args, block=True, on_done=None):
+        """Queue a parse job; with block=True wait while max_pending bodies are queued
+
+        `on_done(future)` runs before the job stops counting as pending.
+        """
+        if block:
+            self._slots.acquire()
+        with self._idle:
+            self._pending += 1
+        try:
+            future = self._executor.submit(func, *args)
+        except Exception:
+            self._job_done(block)
+            raise
+
+        def finished(future):
+            try:
+                if on_done is not None:
+                    on_done(future)
+            finally:
+                self._job_done(block)
+
+        future.add_done_callback(finished)
+        return future
+
+    @property
+    def pending(self):
+        """Pages queued or being parsed by the worker processes"""
+        return self._pending
+
+    def _parsed(self, page_url, timed_result):
+        result, started, seconds, worker = timed_result
+        if self.on_parsed is not None:
+            self.on_parsed(page_url, started, seconds, worker)
+        return result
+
+    def _parse_inline(self, parse, page_url, content):
+        return self._parsed(page_url, _timed(parse, page_url, content) + (None,))
+
+    def _job_done(self, held_slot):
+        if held_slot:
+            self._slots.release()
+        with self._idle:
+            self._pending -= 1
+            if self._pending == 0:
+                self._idle.notify_all()
+
+    def parse_listing_page(self, page_url, content):
+        """Parse a listing page and wait for the result"""
+        if self._executor is None:
+            return self._parse_inline(self.page_parser.parse_listing_page, page_url, content)
+        return self._parsed(page_url, self._submit(_parse_listing_page, page_url, content).result())
+
+    def parse_skin_details(self, skin_url, content, callback, on_error):
+        """Parse a skin page and pass the record to `callback`
+
+        With parser processes this returns as soon as the body is queued;
+        `callback` (or `on_error` with the exception) runs once it is parsed.
+        """
+        if self._executor is None:
+            try:
+                skin_data = self._parse_inline(self.page_parser.parse_skin_details, skin_url, content)
+            except Exception as e:
+                on_error(e)
+                return
+            callback(skin_data)
+            return
+
+        def deliver(future):
+            error = future.exception()
+            if error is not None:
+                on_error(error)
+            else:
+                callback(self._parsed(skin_url, future.result()))
+
+        self._submit(_parse_skin_details, skin_url, content, on_done=deliver)
+
+    async def parse_listing_page_async(self, page_url, content):
+        """Event loop variant of parse_listing_page"""
+        if self._executor is None:
+            return self._parse_inline(self.page_parser.parse_listing_page, page_url, content)
+        return self._parsed(page_url, await asyncio.wrap_future(
+            self._submit(_parse_listing_page, page_url, content, block=False)))
+
+    async def parse_skin_details_async(self, skin_url, content):
+        """Parse a skin page without blocking the event loop"""
+        if self._executor is None:
+            return self._parse_inline(self.page_parser.parse_skin_details, skin_url, content)
+        return self._parsed(skin_url, await asyncio.wrap_future(
+            self._submit(_parse_skin_details, skin_url, content, block=False)))
+
+    def wait(self):
+        """Block until every queued page has been parsed and delivered"""
+        with self._idle:
+            while self._pending:
+                self._idle.wait()
+
+    def shutdown(self):
+        """Finish queued work and stop the parser processes"""
+        if self._executor is not None:
+            self.wait()
+            self._executor.shutdown()
+            self._executor = None
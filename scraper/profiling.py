@@ -0,0 +1,96 @@
+"""
+Per-stage profiling for the Rainmeter Skins Scraper
+
+StageProfiler runs cProfile in each worker thread of a crawl stage
+(discovery, scrape, main) and merges the profiles of a stage's threads,
+so a profile shows where one stage spends its time instead of one
+interleaved profile for the whole process. cProfile only sees the thread
+that enabled it: parser processes are not profiled (their time shows up
+as parse spans in the trace), and with the async engine all work runs in
+the main stage. Python 3.12+ allows only one active profiler per process,
+so there a block that starts while another thread is profiled runs
+unprofiled; StageProfiler.skipped counts those blocks per stage.
+"""
+
+import cProfile
+import functools
+import io
+import logging
+import os
+import pstats
+import threading
+from contextlib import contextmanager
+
+TOP_FUNCTIONS = 40
+
+
+class StageProfiler:
+    """cProfile per crawl stage, merged across the stage's threads"""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.profiles = {}  # stage -> finished cProfile.Profile objects
+        self.skipped = {}   # stage -> blocks that ran unprofiled because another profiler was active
+        self._active = threading.local()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def profile(self, stage):
+        """Profile the block under `stage`; nested blocks stay in the outer stage"""
+        if not self.enabled or getattr(self._active, 'stage', None):
+            yield
+            return
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:
+            # "Another profiling tool is already active" (Python 3.12+): run this block unprofiled
+            profiler = None
+            with self._lock:
+                first = not self.skipped
+                self.skipped[stage] = self.skipped.get(stage, 0) + 1
+            if first:
+                logging.getLogger(__name__).warning(f"Per-stage profiling unavailable, blocks started while "
+                                                    f"another thread is profiled run unprofiled: {e}")
+
+        self._active.stage = stage
+        try:
+            yield
+        finally:
+            self._active.stage = None
+            if profiler is not None:
+                profiler.disable()
+                with self._lock:
+                    self.profiles.setdefault(stage, []).append(profiler)
+
+    def wrap(self, stage, function):
+        """`function`, profiled under `stage` whenever it is called"""
+        if not self.enabled:
+            return function
+
+        @functools.wraps(function)
+        def profiled(*args, **kwargs):
+            with self.profile(stage):
+                return function(*args, **kwargs)
+        return profiled
+
+    def dump(self, directory):
+        """Write `<stage>.prof` (pstats) and `<stage>.txt` (top functions by cumulative time) per stage"""
+        os.makedirs(directory, exist_ok=True)
+        written = []
+        with self._lock:
+            profiles = dict(self.profiles)
+        for stage, profilers in sorted(profiles.items()):
+            stats = pstats.Stats(profilers[0])
+            for profiler in profilers[1:]:
+                stats.add(profiler)
+            path = os.path.join(directory, f'{stage}.prof')
+            stats.dump_stats(path)
+
+            report = io.StringIO()
+            pstats.Stats(path, stream=report).sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+            with open(os.path.join(directory, f'{stage}.txt'), 'w', encoding='utf-8') as f:
+                f.write(report.getvalue())
+            written.append(path)
+        return written
@@ -0,0 +1,70 @@
+"""
+Progress events for the web interface
+
+ProgressBroadcaster turns scraper progress into a Server-Sent Events
+stream. Scraper threads only bump a version number when a counter
+changes; each subscriber wakes up on the change, reads the current state
+once and sends the fields that differ from what it sent last, at most
+`max_rate` times per second. An idle stream only carries a keep-alive
+comment every `keepalive` seconds.
+"""
+
+import json
+import threading
+import time
+
+DEFAULT_MAX_RATE = 4.0    # Events per second per subscriber
+KEEPALIVE_INTERVAL = 15.0
+_UNSENT = object()
+
+
+class ProgressBroadcaster:
+    """Change notifications plus the latest progress state, shared by all SSE subscribers"""
+
+    def __init__(self, source, max_rate=DEFAULT_MAX_RATE, keepalive=KEEPALIVE_INTERVAL):
+        self.source = source          # Callable returning the current progress state as a dict
+        self.max_rate = max_rate
+        self.keepalive = keepalive
+        self.version = 0
+        self._changed = threading.Condition()
+        self._state = None
+        self._state_version = -1
+
+    def notify(self):
+        """Record that progress changed; cheap enough to call for every scraped skin"""
+        with self._changed:
+            self.version += 1
+            self._changed.notify_all()
+
+    def wait(self, seen_version, timeout):
+        """Block until the version moves past `seen_version`; returns the current version"""
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != seen_version, timeout)
+            return self.version
+
+    def state(self):
+        """Current progress state, read from the source at most once per version"""
+        version = self.version
+        if self._state_version != version:
+            self._state = self.source()
+            self._state_version = version
+        return self._state
+
+    def events(self, max_rate=None):
+        """Yield SSE messages: the full state first, then coalesced deltas"""
+        interval = 1.0 / (max_rate or self.max_rate)
+        sent = {}
+        seen_version = None
+        while True:
+            version = self.wait(seen_version, self.keepalive)
+            if version == seen_version:
+                yield ': keepalive\n\n'
+                continue
+
+            seen_version = version
+            state = self.state()
+            delta = {key: value for key, value in state.items() if sent.get(key, _UNSENT) != value}
+            if delta:
+                sent = dict(state)
+                yield f"data: {json.dumps(delta)}\n\n"
+            time.sleep(interval)  # Coalesce the changes made until the next event
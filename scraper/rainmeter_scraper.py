@@ -1,6 +1,4 @@
 import requests
-from bs4 import BeautifulSoup
-import pandas as pd
 import time
 import re
 import csv
@@ -9,32 +7,110 @@ from fake_useragent import UserAgent
 from tqdm import tqdm
 import json
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 import hashlib
 import os
 import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from queue import Queue, Empty
 import random
+from .rate_limiter import HostRateLimiter
+from .http_cache import HttpCache
+from .dataset_index import DatasetIndex
+from .dataset_store import DatasetStore
+from .checkpoint import CrawlJournal, CrawlState
+from .record_sink import RecordSink, export_csv, export_json
+from .listing_walk import ListingPage, ListingWalk
+from .html_parser import DEFAULT_PARSER, resolve_parser
+from .page_parser import PageParser, clean_text
+from .parse_pool import ParsePool, DEFAULT_PARSE_WORKERS
+from .metrics import CrawlMetrics, TimedHTTPAdapter, TimedQueue
+from .tracing import Tracer
+from .profiling import StageProfiler
+from .retry_policy import RetryPolicy, HostCircuitBreakers, NOT_FOUND, PERMANENT, TRANSIENT
+from .sitemap import SitemapReader
+from .web_archive import ArchiveReader, WebArchive
+from .cancellation import CancelToken
+from .completion import CountdownLatch
+
+ENGINES = ('threads', 'async')
+DEFAULT_BASE_URL = "https://visualskins.com"
 
 class RainmeterScraper:
-    def __init__(self, base_url="https://visualskins.com", delay=1, max_workers=8):
+    def __init__(self, base_url=None, delay=1, max_workers=8,
+                 engine="threads", concurrency=100, burst=1,
+                 cache_dir=os.path.join('data', 'http_cache'),
+                 checkpoint_path=os.path.join('data', 'crawl_journal.jsonl'), max_retries=3,
+                 parser=DEFAULT_PARSER, parse_workers=DEFAULT_PARSE_WORKERS, use_sitemaps=True,
+                 metrics=None, tracer=None, profiler=None, archive_path=None, replay_path=None, categories=None,
+                 shared_rate_limiter=None):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {ENGINES}")
+        
+        # An archive to serve pages from instead of the network; it records the site it was made from
+        self.replay = ArchiveReader(replay_path) if replay_path else None
+        recorded_url = self.replay.base_url if self.replay else None
+        if recorded_url and base_url and base_url.rstrip('/') != recorded_url.rstrip('/'):
+            self.replay.close()
+            raise ValueError(f"{replay_path} was recorded from {recorded_url}, not {base_url}")
+        base_url = base_url or recorded_url or DEFAULT_BASE_URL
+        
         self.base_url = base_url
         self.delay = delay
         self.max_workers = max_workers
+        self.engine = engine
+        self.concurrency = concurrency
+        # Shared per-host politeness budget: one request every `delay` seconds (none when replaying),
+        # within the budget of shared_rate_limiter when other crawls share the site with this one
+        self.rate_limiter = HostRateLimiter.from_delay(0 if replay_path else delay, burst=burst,
+                                                       parent=None if replay_path else shared_rate_limiter)
+        # Conditional-request cache; pass cache_dir=None to always download in full
+        self.http_cache = HttpCache(cache_dir) if cache_dir else None
+        # Raw responses archived for offline reprocessing
+        self.archive = WebArchive(archive_path, base_url) if archive_path else None
+        # HTML parser for listing and skin pages (lxml unless it is unavailable)
+        self.parser = resolve_parser(parser)
+        self.page_parser = PageParser(base_url, self.parser)
+        # Stage latencies, response sizes and worker utilization, exposed at /metrics by the web app
+        self.metrics = metrics or CrawlMetrics()
+        # Timed spans and per-stage cProfile output; both are off unless passed in enabled
+        self.tracer = tracer or Tracer()
+        self.profiler = profiler or StageProfiler()
+        # Parser processes fed with raw page bodies by the fetch workers (0 parses inline)
+        self.parse_pool = ParsePool(self.page_parser, workers=parse_workers, on_parsed=self.record_parse)
+        # Status-aware retries and a per-host circuit breaker shared by all workers
+        self.retry_policy = RetryPolicy(max_attempts=max_retries, base_delay=max(1.0, delay))
+        self.circuit_breakers = HostCircuitBreakers()
+        # Append-only progress journal used by resume; pass checkpoint_path=None to disable
+        self.checkpoint_path = checkpoint_path
+        self.journal = None
+        self.resume_state = CrawlState()
+        self.interrupted = False
+        # Set by cancel(): workers stop taking work and every wait returns early
+        self.cancel_token = CancelToken()
         self.session = requests.Session()
+        for scheme in ('http://', 'https://'):
+            self.session.mount(scheme, TimedHTTPAdapter(self.metrics.observe_connect))
         self.ua = UserAgent()
-        self.scraped_data = []
+        # Records stream to an NDJSON file as they are scraped (data/<output>.ndjson)
+        self.scraped_data = RecordSink()
         self.seen_urls = set()
         self.failed_urls = []
-        self.discovered_urls = Queue()
-        self.processing_stats = {
-            'discovered_count': 0,
-            'scraped_count': 0,
-            'failed_count': 0,
-            'discovery_complete': False
-        }
+        self.discovered_urls = TimedQueue(on_wait=lambda seconds: self.metrics.observe('queue_wait', seconds))
+        # Skin URLs queued for the worker threads and not yet scraped; opens when the crawl is done
+        self.pending_skins = CountdownLatch()
+        self.dataset_index = None  # Existing dataset, set for incremental crawls
+        # Targeted crawls walk only these categories' listings (tag slugs such as 'weather')
+        self.categories = [category.strip('/') for category in categories or []]
+        # Discover skins from robots.txt sitemaps first; listings then only fill gaps
+        # (sitemaps list the whole site, so targeted crawls skip them)
+        self.use_sitemaps = use_sitemaps and not self.categories
+        # Called without arguments whenever a progress counter changes (e.g. to push SSE updates)
+        self.progress_listener = None
+        self.discovery_progress = {'listings': {}, 'total_discovered': 0, 'pages_fetched': 0, 'sitemap_urls': 0,
+                                   'sitemaps_done': False}
         self._lock = threading.Lock()
+        self._pool_metrics = []  # Callables taking this crawl's queues and pools out of the gauges
+        self.reset_progress()
         
         # Setup logging
         logging.basicConfig(
@@ -64,42 +140,193 @@ class RainmeterScraper:
             'Upgrade-Insecure-Requests': '1'
         })
 
-    def get_page(self, url, retries=3):
-        """Safely fetch a page with error handling and retries"""
+    def get_page(self, url, retries=None, missing_ok=False):
+        """Safely fetch a page with status-aware retries
+        
+        Permanent errors such as 404 fail immediately; with missing_ok they are
+        expected (e.g. the page after the last one), not recorded as failures, and
+        NOT_FOUND is returned instead of None to tell them apart from failed fetches.
+        """
+        if self.replay:
+            return self.replayed_page(url, missing_ok)
+        
+        retries = retries or self.retry_policy.max_attempts
         for attempt in range(retries):
-            try:
-                # Rotate user agent occasionally
-                if random.random() < 0.1:  # 10% chance to rotate
-                    self.session.headers['User-Agent'] = random.choice(self.user_agents)
-                
-                # Random delay to avoid rate limiting
-                time.sleep(self.delay + random.uniform(0, 0.5))
-                
-                response = self.session.get(url, timeout=15)
-                response.raise_for_status()
-                return response
-            except requests.RequestException as e:
-                self.logger.warning(f"Attempt {attempt + 1} failed for {url}: {e}")
-                if attempt == retries - 1:
-                    with self._lock:
-                        self.failed_urls.append(url)
-                        self.processing_stats['failed_count'] += 1
+            # Hold off while the host's circuit breaker is open
+            pause = self.circuit_breakers.for_url(url).wait_time()
+            if pause > 0:
+                with self.tracer.span('circuit_breaker_pause', url=url, seconds=round(pause, 3)):
+                    self.cancel_token.wait(pause)
+            if self.cancelled:
+                return None
+            
+            with self.tracer.span('fetch', url=url, attempt=attempt + 1):
+                try:
+                    # Rotate user agent occasionally
+                    if random.random() < 0.1:  # 10% chance to rotate
+                        self.session.headers['User-Agent'] = random.choice(self.user_agents)
+                    
+                    # Wait for a slot in the shared per-host budget
+                    with self.tracer.span('rate_limit'), self.metrics.time_stage('rate_limit'):
+                        if not self.rate_limiter.acquire(url, self.cancel_token):
+                            return None
+                    
+                    # Revalidate cached pages instead of downloading them again (recording archives full bodies)
+                    headers = self.http_cache.conditional_headers(url) if self.http_cache and not self.archive else {}
+                    response = self.timed_get(url, headers)
+                    
+                    if response.status_code == 304 and headers:
+                        cached = self.cached_response(url)
+                        if cached:
+                            self.record_fetch_success(url)
+                            return cached
+                        # Cache entry vanished since the request was built
+                        response = self.timed_get(url)
+                    
+                    response.raise_for_status()
+                    self.record_fetch_success(url)
+                    if self.http_cache:
+                        self.http_cache.store(url, response.content, response.headers)
+                    return response
+                except requests.RequestException as e:
+                    response = e.response
+                    if response is None:
+                        self.metrics.record_fetch_error(e)
+                    wait = self.handle_fetch_error(
+                        url, attempt, retries, e,
+                        status=response.status_code if response is not None else None,
+                        headers=response.headers if response is not None else None,
+                        missing_ok=missing_ok
+                    )
+            
+            if wait is None or wait is NOT_FOUND:
+                return wait
+            with self.tracer.span('retry_sleep', url=url, attempt=attempt + 1, seconds=round(wait, 3)):
+                if self.cancel_token.wait(wait):
                     return None
-                time.sleep(self.delay * (attempt + 1))
         return None
 
+    def timed_get(self, url, headers=None):
+        """GET a page, recording time to first byte, download time, body size and status"""
+        self.metrics.take_connect_time()
+        started = time.perf_counter()
+        response = self.session.get(url, timeout=15, headers=headers, stream=True)
+        first_byte = time.perf_counter()
+        content = response.content
+        # Opening a new connection is reported as its own stage, not as waiting for the server
+        self.metrics.record_response(response.status_code, len(content),
+                                     first_byte - started - self.metrics.take_connect_time(),
+                                     time.perf_counter() - first_byte)
+        self.tracer.annotate(status=response.status_code, bytes=len(content))
+        if self.archive:
+            self.archive.record(url, response.status_code, response.headers, content)
+        return response
+
+    def replayed_page(self, url, missing_ok=False):
+        """Serve a page from the replay archive; a page that was never recorded counts as a 404"""
+        response = self.replay.get(url)
+        status = response.status_code if response else 404
+        if 200 <= status < 300:
+            return response
+        
+        failure_class = self.retry_policy.classify(status)
+        if missing_ok and failure_class == PERMANENT:
+            return NOT_FOUND
+        self.record_failure(url, failure_class, status,
+                            'not in the archive' if response is None else f'recorded as {status}')
+        return None
+
+    def record_fetch_success(self, url):
+        """Count a successful response towards the host's circuit breaker"""
+        self.circuit_breakers.for_url(url).record(True)
+
+    def handle_fetch_error(self, url, attempt, retries, error, status=None, headers=None, missing_ok=False):
+        """Classify a failed attempt and return seconds to wait before retrying, or None to give up
+        
+        An expected missing page (permanent error with missing_ok) returns NOT_FOUND.
+        """
+        failure_class = self.retry_policy.classify(status)
+        self.tracer.annotate(failure_class=failure_class)
+        
+        # A permanent error is a healthy answer from the host; only the rest count against it
+        if self.circuit_breakers.for_url(url).record(failure_class == PERMANENT):
+            with self._lock:
+                self.processing_stats['circuit_breaker_trips'] += 1
+            self.logger.warning(f"Error rate spiking for {urlparse(url).netloc}: circuit breaker opened, "
+                                f"pausing requests for {self.circuit_breakers.for_url(url).wait_time():.0f}s")
+        
+        if failure_class == PERMANENT and missing_ok:
+            self.logger.debug(f"Not found (expected): {url}")
+            return NOT_FOUND
+        
+        reason = str(error) or type(error).__name__
+        self.tracer.annotate(error=reason)
+        self.logger.warning(f"Attempt {attempt + 1} failed for {url} ({failure_class}): {reason}")
+        if attempt >= retries - 1 or not self.retry_policy.should_retry(failure_class, attempt):
+            self.record_failure(url, failure_class, status, reason)
+            return None
+        
+        with self._lock:
+            self.processing_stats['retry_count'] += 1
+        return self.retry_policy.delay_for(attempt, failure_class, headers)
+
+    def cached_response(self, url):
+        """Serve a 304 Not Modified page from the on-disk cache"""
+        cached = self.http_cache.load(url)
+        if cached:
+            with self._lock:
+                self.processing_stats['cache_hits'] += 1
+        return cached
+
+    def record_failure(self, url, failure_class=TRANSIENT, status=None, error=None):
+        """Remember a URL that could not be fetched, with its failure class"""
+        with self._lock:
+            self.failed_urls.append({
+                'url': url,
+                'failure_class': failure_class,
+                'status': status,
+                'error': str(error) if error else ''
+            })
+            self.processing_stats['failed_count'] += 1
+            self.processing_stats[f'{failure_class}_failures'] += 1
+        self.notify_progress()
+        # A page that is gone stays gone; a resumed run does not ask for it again
+        if failure_class == PERMANENT and self.journal:
+            self.journal.failed(url)
+
+    def record_parse(self, page_url, started, seconds, worker=None):
+        """Report a page parse timed by the parse pool (`worker` is the parser process, if any)"""
+        self.metrics.observe_parse(seconds)
+        self.tracer.record('parse', started, seconds, lane=f'parser-{worker}' if worker else None,
+                           url=page_url)
+
+    def notify_progress(self):
+        if self.progress_listener:
+            self.progress_listener()
+
+    @property
+    def cancelled(self):
+        return self.cancel_token.cancelled
+
+    def cancel(self, reason='Cancelled'):
+        """Stop the running crawl
+        
+        Workers finish the request they have on the wire, pages already fetched are
+        parsed and recorded, and the journal is left resumable. Safe to call from any thread.
+        """
+        if self.cancel_token.cancel(reason):
+            self.logger.info(f"Stopping crawl: {reason}")
+            self.notify_progress()
+
     def clean_text(self, text):
         """Clean and normalize text data"""
-        if not text:
-            return ""
-        text = re.sub(r'\s+', ' ', text.strip())
-        text = re.sub(r'[^\x00-\x7F]+', '', text)  # Remove non-ASCII characters
-        return text
+        return clean_text(text)
 
     def discover_comprehensive_urls(self):
-        """Professional comprehensive URL discovery using multiple strategies"""
-        all_urls = set()
+        """Professional comprehensive URL discovery using multiple strategies
         
+        Returns listing roots only; their pagination is walked lazily by walk_listing.
+        """
         # Strategy 1: Category-based discovery
         categories = [
             # Main categories from site structure
@@ -154,15 +381,7 @@ class RainmeterScraper:
             '/tag/windows/',
         ]
         
-        # Strategy 2: Add pagination for each category (up to 50 pages each)
-        paginated_urls = []
-        for category in categories:
-            for page in range(1, 51):  # Try up to 50 pages per category
-                paginated_urls.append(f"{category}page/{page}/")
-                if 'tag' not in category:  # For non-tag URLs
-                    paginated_urls.append(f"{category}/page/{page}/")
-        
-        # Strategy 3: Alphabetical skin discovery
+        # Strategy 2: Alphabetical skin discovery
         alphabet_urls = []
         for letter in 'abcdefghijklmnopqrstuvwxyz0123456789':
             alphabet_urls.extend([
@@ -171,246 +390,269 @@ class RainmeterScraper:
                 f"/?s={letter}",
             ])
         
-        # Strategy 4: Main site pagination (up to 100 pages)
-        main_pagination = [f"/page/{i}/" for i in range(1, 101)]
+        # Strategy 3: Main site listing
+        main_listing = ['/']
         
-        # Combine all strategies
-        discovery_urls = categories + paginated_urls + alphabet_urls + main_pagination
+        # Combine all strategies; each listing is paginated until its last real page
+        discovery_urls = main_listing + categories + alphabet_urls
         
         # Convert relative URLs to absolute
         full_urls = [urljoin(self.base_url, url) for url in discovery_urls]
         
-        self.logger.info(f"Generated {len(full_urls)} discovery URLs using professional multi-strategy approach")
+        self.logger.info(f"Generated {len(full_urls)} listing roots using professional multi-strategy approach")
         return full_urls
 
     def extract_skin_links_worker(self, category_url):
         """Enhanced worker function for extracting skin links with better selectors"""
         try:
-            response = self.get_page(category_url)
-            if not response:
-                return []
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            skin_links = []
-            
-            # Enhanced selectors based on site structure analysis
-            selectors = [
-                # Direct skin links
-                'a[href*="/skin/"]',
-                
-                # Title and heading links
-                'h1 a[href*="/skin/"]',
-                'h2 a[href*="/skin/"]', 
-                'h3 a[href*="/skin/"]',
-                'h4 a[href*="/skin/"]',
-                
-                # Post and entry links
-                '.entry-title a',
-                '.post-title a',
-                '.skin-title a',
-                
-                # Article and content links
-                'article a[href*="/skin/"]',
-                '.content a[href*="/skin/"]',
-                '.post-content a[href*="/skin/"]',
-                
-                # Grid and list items
-                '.grid-item a',
-                '.list-item a',
-                '.skin-item a',
-                '.item a',
-                
-                # Thumbnail and image links
-                '.thumbnail a',
-                '.image a',
-                '.featured-image a',
-                
-                # Card and widget links
-                '.card a',
-                '.widget a',
-                '.skin-card a',
+            with self.tracer.span('discovery_page', url=category_url), self.metrics.busy('discovery'):
+                response = self.get_page(category_url)
+                if not response:
+                    return []
                 
-                # More/read more links
-                '.more-link',
-                '.read-more',
-                '.continue-reading',
-                
-                # Links with skin-related attributes
-                'a[title*="Skin"]',
-                'a[title*="skin"]',
-                'a[title*="Rainmeter"]',
-                'a[title*="rainmeter"]',
-                
-                # Generic content links that might contain skins
-                '.entry a',
-                '.post a',
-                'main a',
-                '#content a',
-                
-                # Search result links
-                '.search-result a',
-                '.result a',
-                
-                # Navigation and pagination
-                '.navigation a',
-                '.pagination a',
-                '.page-numbers a',
-            ]
-            
-            # Process each selector
-            for selector in selectors:
-                try:
-                    links = soup.select(selector)
-                    for link in links:
-                        href = link.get('href')
-                        if href:
-                            full_url = urljoin(self.base_url, href)
-                            
-                            # Enhanced filtering for skin URLs
-                            if (('/skin/' in full_url or 
-                                 '/theme/' in full_url or
-                                 '/widget/' in full_url or
-                                 '/rainmeter/' in full_url) and 
-                                full_url not in self.seen_urls and
-                                'visualskins.com' in full_url and
-                                not any(exclude in full_url.lower() for exclude in [
-                                    'javascript:', 'mailto:', 'tel:', 
-                                    'contact', 'about', 'privacy', 'terms',
-                                    'how-to', 'tutorial', 'guide'
-                                ])):
-                                
-                                skin_links.append(full_url)
-                                with self._lock:
-                                    self.seen_urls.add(full_url)
-                except Exception as e:
-                    continue  # Skip problematic selectors
-            
-            # Additional discovery for collection/category pages
-            if any(keyword in category_url.lower() for keyword in [
-                'best-rainmeter', 'collection', 'rainmeter-', 'tag/'
-            ]):
-                # Look for any links that might lead to skins
-                all_links = soup.find_all('a', href=True)
-                for link in all_links:
-                    href = link.get('href')
-                    if href:
-                        full_url = urljoin(self.base_url, href)
-                        # Be more permissive for collection pages
-                        if ('visualskins.com' in full_url and 
-                            full_url not in self.seen_urls and
-                            not any(exclude in full_url.lower() for exclude in [
-                                'javascript:', 'mailto:', 'tel:', 'contact', 
-                                'about', 'privacy', 'wp-', 'admin'
-                            ])):
-                            
-                            # Check if link text suggests it's a skin
-                            link_text = link.get_text().lower()
-                            if any(keyword in link_text for keyword in [
-                                'skin', 'theme', 'widget', 'rainmeter', 'clock',
-                                'visualizer', 'weather', 'system', 'monitor'
-                            ]):
-                                skin_links.append(full_url)
-                                with self._lock:
-                                    self.seen_urls.add(full_url)
-            
-            # Remove duplicates while preserving order
-            unique_skin_links = []
-            seen_in_this_batch = set()
-            for link in skin_links:
-                if link not in seen_in_this_batch:
-                    unique_skin_links.append(link)
-                    seen_in_this_batch.add(link)
-            
-            if unique_skin_links:
-                self.logger.info(f"Found {len(unique_skin_links)} skin links from {category_url}")
-            
-            return unique_skin_links
+                return self.parse_skin_links(category_url, response.content)
             
         except Exception as e:
             self.logger.error(f"Error extracting links from {category_url}: {e}")
             return []
 
-    def discovery_worker(self, category_urls, max_urls=None):
-        """Enhanced discovery worker with intelligent completion detection"""
+    def parse_skin_links(self, category_url, content):
+        """Extract skin links from an already fetched listing page"""
+        return self.parse_listing_page(category_url, content).skin_links
+
+    def parse_listing_page(self, category_url, content):
+        """Extract new skin links and pagination from an already fetched listing page"""
+        return self.claim_listing_links(category_url, self.parse_pool.parse_listing_page(category_url, content))
+
+    def claim_listing_links(self, category_url, listing):
+        """Keep only the listing's skin links that no other page has reported yet"""
+        with self._lock:
+            unique_skin_links = [link for link in listing.skin_links if link not in self.seen_urls]
+            self.seen_urls.update(unique_skin_links)
         
+        if unique_skin_links:
+            self.logger.info(f"Found {len(unique_skin_links)} skin links from {category_url}")
+        
+        return ListingPage(unique_skin_links, listing.candidate_count, listing.page_links)
+
+    def prepare_discovery_urls(self, category_urls):
+        """Extend the seed URLs with the comprehensive listing roots, without duplicates"""
         # Use comprehensive discovery instead of limited categories
-        if not hasattr(self, '_comprehensive_urls_generated'):
+        if not self.categories and not hasattr(self, '_comprehensive_urls_generated'):
             comprehensive_urls = self.discover_comprehensive_urls()
             category_urls.extend(comprehensive_urls)
             self._comprehensive_urls_generated = True
-            self.logger.info(f"Enhanced discovery with {len(category_urls)} total URLs to check")
+        return list(dict.fromkeys(category_urls))
+
+    def discovery_cursor(self):
+        """Return each listing's next page (0 once finished), continuing a resumed run's cursor"""
+        cursor = {'listings': {}, 'total_discovered': 0, 'pages_fetched': 0, 'sitemap_urls': 0,
+                  'sitemaps_done': False}
+        if self.resume_state.cursor:
+            cursor.update(json.loads(json.dumps(self.resume_state.cursor)))
+        return cursor
+
+    def start_listing_walks(self, category_urls, gaps_only=False):
+        """Create a ListingWalk for every listing root that still has pages left
+        
+        With gaps_only (the sitemaps already listed the skins) only the newest-first
+        main listing is walked, up to the first page without unknown skins.
+        """
+        if gaps_only:
+            listing_urls = [f"{self.base_url}/"]
+        else:
+            listing_urls = self.prepare_discovery_urls(category_urls)
+        
+        walks = []
+        for url in listing_urls:
+            next_page = self.discovery_progress['listings'].get(url, 1)
+            if next_page:
+                walks.append(ListingWalk(url, next_page, until_known=gaps_only))
+        
+        self.logger.info(f"Enhanced discovery walking {len(walks)} of {len(listing_urls)} listings page by page")
+        return walks
+
+    def discovery_target_reached(self, max_urls=None):
+        """True once enough skin URLs were discovered for a limited run"""
+        if not max_urls:
+            return False
+        with self._lock:
+            return self.discovery_progress['total_discovered'] >= max_urls
+
+    def handle_listing_page(self, walk, listing, emit, failed=False):
+        """Queue a listing page's new skin links and checkpoint the walk's position
+        
+        `listing` is None when the page does not exist, which ends the walk. A page
+        that `failed` to load stops the walk but stays in the cursor for a resumed run.
+        """
+        walk.advance(listing, failed)
+        
+        if listing:
+            for skin_url in listing.skin_links:
+                with self._lock:
+                    self.discovery_progress['total_discovered'] += 1
+                if self.accept_discovered(skin_url):
+                    emit(skin_url)
+        
+        with self._lock:
+            self.discovery_progress['pages_fetched'] += 1
+            self.discovery_progress['listings'][walk.root_url] = 0 if walk.finished else walk.page
+            cursor = json.loads(json.dumps(self.discovery_progress))
+        self.checkpoint_discovery(cursor)
+
+    def handle_sitemap(self, reader, sitemap_url, content, emit, max_urls=None):
+        """Queue the unseen skin URLs of a fetched sitemap and checkpoint discovery"""
+        for entry in reader.read(sitemap_url, content):
+            with self._lock:
+                if entry.url in self.seen_urls:
+                    continue
+                self.seen_urls.add(entry.url)
+                self.discovery_progress['total_discovered'] += 1
+                self.discovery_progress['sitemap_urls'] += 1
+            if self.accept_discovered(entry.url, entry.lastmod):
+                emit(entry.url)
+            if self.discovery_target_reached(max_urls):
+                break
+        
+        with self._lock:
+            self.discovery_progress['pages_fetched'] += 1
+            cursor = json.loads(json.dumps(self.discovery_progress))
+        self.checkpoint_discovery(cursor)
+
+    def discover_from_sitemaps(self, max_urls=None):
+        """Queue the skin URLs listed in the site's sitemaps; returns how many were listed"""
+        reader = SitemapReader(self.base_url)
+        response = self.get_page(reader.robots_url, missing_ok=True)
+        reader.read_robots(response.text if response else '')
+        failed = response is None
+        
+        while not self.discovery_target_reached(max_urls) and not self.cancelled:
+            sitemap_url = reader.next_sitemap()
+            if sitemap_url is None:
+                self.mark_sitemaps_read(failed)
+                break
+            try:
+                with self.tracer.span('sitemap', url=sitemap_url):
+                    response = self.get_page(sitemap_url, missing_ok=True)
+                    failed = failed or response is None
+                    if response:
+                        self.handle_sitemap(reader, sitemap_url, response.content, self.queue_skin, max_urls)
+            except Exception as e:
+                self.logger.error(f"Error reading sitemap {sitemap_url}: {e}")
+                failed = True
+        
+        self.logger.info(f"Sitemaps listed {reader.skin_urls} skin URLs in {len(reader.visited)} sitemaps")
+        return reader.skin_urls
+
+    def mark_sitemaps_read(self, failed=False):
+        """Checkpoint that every sitemap was read, so a resumed run goes on with the listings
+        
+        Sitemaps that failed to load are read again on resume.
+        """
+        if failed:
+            return
+        with self._lock:
+            self.discovery_progress['sitemaps_done'] = True
+            cursor = json.loads(json.dumps(self.discovery_progress))
+        self.checkpoint_discovery(cursor)
+
+    def sitemaps_pending(self):
+        """True unless sitemaps are off or a resumed run already read them all"""
+        return self.use_sitemaps and not self.discovery_progress.get('sitemaps_done')
+
+    def checkpoint_discovery(self, cursor):
+        """Journal the discovery position after a finished listing page"""
+        if self.journal:
+            self.journal.cursor(cursor)
+
+    def mark_discovery_complete(self, walks=()):
+        """Flag discovery as finished for the workers and the journal
+        
+        When a listing walk stopped on a page that failed to load, discovery is not
+        journaled as complete, so a resumed run walks that listing on from the page.
+        """
+        with self._lock:
+            self.processing_stats['discovery_complete'] = True
+        self.notify_progress()
+        unfinished = [walk.root_url for walk in walks if walk.failed]
+        if unfinished:
+            self.logger.warning(f"{len(unfinished)} listing(s) stopped at a page that failed to load: "
+                                f"{', '.join(unfinished[:5])}")
+        elif self.journal:
+            self.journal.append('discovery_complete')
+            self.journal.flush()
+
+    def walk_listing(self, walk, max_urls=None):
+        """Fetch a listing's pages in order, stopping at its last page, an empty page or a 404"""
+        while not walk.done and not self.discovery_target_reached(max_urls) and not self.cancelled:
+            page_url = walk.next_url()
+            listing = None
+            failed = False
+            try:
+                with self.tracer.span('discovery_page', url=page_url), self.metrics.busy('discovery'):
+                    response = self.get_page(page_url, missing_ok=True)
+                    failed = response is None
+                    if response:
+                        listing = self.parse_listing_page(page_url, response.content)
+                        self.tracer.annotate(skin_links=len(listing.skin_links))
+            except Exception as e:
+                self.logger.error(f"Error extracting links from {page_url}: {e}")
+                failed = True
+            
+            # A page cut short by cancellation is not checkpointed, so a resumed run fetches it again
+            if listing is None and self.cancelled:
+                break
+            self.handle_listing_page(walk, listing, self.queue_skin, failed)
+        return walk
+
+    def queue_skin(self, skin_url):
+        """Hand a skin URL to the scraping workers, counting it as outstanding work"""
+        self.pending_skins.add()
+        self.discovered_urls.put(skin_url)
+
+    def run_discovery(self, category_urls, max_urls=None):
+        """Run discovery_worker, then tell the workers' latch that no more skin URLs are coming"""
+        try:
+            self.discovery_worker(category_urls, max_urls)
+        finally:
+            self.pending_skins.close()
+
+    def discovery_worker(self, category_urls, max_urls=None):
+        """Enhanced discovery worker: sitemaps first, then listings paginated lazily"""
+        if self.resume_state.discovery_complete:
+            self.mark_discovery_complete()
+            return
+        
+        self.discovery_progress = self.discovery_cursor()
+        if self.sitemaps_pending():
+            sitemap_urls = self.discover_from_sitemaps(max_urls)
+        else:
+            sitemap_urls = self.discovery_progress['sitemap_urls']
+        walks = self.start_listing_walks(category_urls, gaps_only=sitemap_urls > 0)
         
         with ThreadPoolExecutor(max_workers=min(8, self.max_workers)) as executor:
-            # Process URLs in batches to avoid overwhelming the server
-            batch_size = 25  # Smaller batches for better control
-            total_discovered = 0
-            last_discovery_count = 0
-            stagnant_batches = 0
-            max_stagnant_batches = 8  # Allow 8 batches without new discoveries
+            walk_listing = self.profiler.wrap('discovery', self.walk_listing)
+            future_to_walk = {executor.submit(walk_listing, walk, max_urls): walk 
+                              for walk in walks}
             
-            for i in range(0, len(category_urls), batch_size):
-                batch = category_urls[i:i+batch_size]
-                
-                future_to_url = {executor.submit(self.extract_skin_links_worker, url): url 
-                               for url in batch}
-                
-                batch_discoveries = 0
-                for future in as_completed(future_to_url):
-                    url = future_to_url[future]
-                    try:
-                        skin_links = future.result()
-                        for skin_url in skin_links:
-                            self.discovered_urls.put(skin_url)
-                            total_discovered += 1
-                            batch_discoveries += 1
-                            with self._lock:
-                                self.processing_stats['discovered_count'] += 1
-                            
-                            # Stop discovery if we have enough URLs (with generous buffer)
-                            if max_urls and total_discovered >= max_urls * 2:
-                                break
-                        
-                        if max_urls and total_discovered >= max_urls * 2:
-                            break
-                            
-                    except Exception as e:
-                        self.logger.error(f"Discovery error for {url}: {e}")
-                
-                # Check for stagnation (no new discoveries in this batch)
-                if batch_discoveries == 0:
-                    stagnant_batches += 1
-                    self.logger.debug(f"Batch {i//batch_size + 1} found no new URLs. Stagnant count: {stagnant_batches}")
-                else:
-                    stagnant_batches = 0  # Reset if we found something
-                    self.logger.info(f"Batch {i//batch_size + 1} discovered {batch_discoveries} new URLs. Total: {total_discovered}")
-                
-                # Intelligent completion detection
-                if stagnant_batches >= max_stagnant_batches:
-                    self.logger.info(f"Discovery appears complete - no new URLs found in {max_stagnant_batches} consecutive batches")
-                    break
-                
-                # Check if we should stop processing more batches
-                if max_urls and total_discovered >= max_urls:
-                    self.logger.info(f"Reached discovery target with {total_discovered} URLs")
-                    break
-                
-                # Check if we've found a reasonable number of skins
-                if total_discovered >= 500:  # More than the claimed 394 we found before
-                    remaining_batches = (len(category_urls) - i) // batch_size
-                    if remaining_batches > 50:  # If many batches remain, check for diminishing returns
-                        recent_rate = batch_discoveries / batch_size if batch_size > 0 else 0
-                        if recent_rate < 0.02:  # Less than 2% discovery rate
-                            self.logger.info(f"Discovery rate too low ({recent_rate:.1%}). Stopping early with {total_discovered} URLs")
-                            break
-                
-                # Brief pause between batches to be respectful
-                time.sleep(0.3)
+            for future in as_completed(future_to_walk):
+                walk = future_to_walk[future]
+                try:
+                    future.result()
+                    self.logger.debug(f"Listing {walk.root_url} finished after page {walk.page - 1}")
+                except Exception as e:
+                    self.logger.error(f"Discovery error for {walk.root_url}: {e}")
+        
+        if self.cancelled:
+            self.logger.info("Discovery stopped before finishing")
+            return
         
         # Mark discovery as complete
-        with self._lock:
-            self.processing_stats['discovery_complete'] = True
+        self.mark_discovery_complete(walks)
         
-        self.logger.info(f"Professional discovery complete. Found {total_discovered} unique skin URLs using intelligent completion detection")
+        progress = self.discovery_progress
+        self.logger.info(f"Professional discovery complete. Found {progress['total_discovered']} unique skin URLs "
+                         f"({progress['sitemap_urls']} from sitemaps) in {progress['pages_fetched']} pages")
 
     def extract_skin_details(self, skin_url):
         """Extract detailed information from a skin page (same as before but optimized)"""
@@ -418,195 +660,72 @@ class RainmeterScraper:
         if not response:
             return None
         
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Initialize skin data structure
-        skin_data = {
-            'url': skin_url,
-            'name': '',
-            'description': '',
-            'thumbnail_url': '',
-            'download_url': '',
-            'tags': '',
-            'rating': '',
-            'developer': '',
-            'category': '',
-            'downloads': '',
-            'file_size': '',
-            'last_updated': '',
-            'version': '',
-            'scraped_at': datetime.now().isoformat()
-        }
-        
-        # Extract name from h1 title
-        name_element = soup.select_one('h1.title')
-        if name_element:
-            name_text = name_element.get_text().strip()
-            # Clean up "Rainmeter Theme" suffix
-            name_text = re.sub(r'\s*rainmeter\s*theme\s*$', '', name_text, flags=re.IGNORECASE)
-            skin_data['name'] = self.clean_text(name_text)
-        
-        # Extract description from the desc div
-        desc_element = soup.select_one('div.desc p')
-        if desc_element:
-            desc_text = desc_element.get_text().strip()
-            skin_data['description'] = self.clean_text(desc_text)
-        
-        # If no description found, try meta description
-        if not skin_data['description']:
-            meta_desc = soup.select_one('meta[name="description"]')
-            if meta_desc:
-                skin_data['description'] = self.clean_text(meta_desc.get('content', ''))
-        
-        # Extract thumbnail from slider images
-        img_element = soup.select_one('div.uk-slider-items img')
-        if img_element:
-            src = img_element.get('src')
-            if src:
-                skin_data['thumbnail_url'] = urljoin(self.base_url, src)
-        
-        # Extract download link and file info
-        download_element = soup.select_one('a.uk-button-primary[href*=".rmskin"]')
-        if download_element:
-            href = download_element.get('href')
-            if href:
-                skin_data['download_url'] = urljoin(self.base_url, href)
-                
-                # Extract file size from download button text
-                button_text = download_element.get_text()
-                size_match = re.search(r'\(([^)]+)\)', button_text)
-                if size_match:
-                    skin_data['file_size'] = size_match.group(1)
-        
-        # Extract developer from infobox
-        developer_elements = soup.select('dt')
-        for dt in developer_elements:
-            if dt.get_text().strip().upper() == 'DEVELOPER':
-                dd_element = dt.find_next_sibling('dd')
-                if dd_element:
-                    # Get the link text or just the text content
-                    dev_link = dd_element.select_one('a')
-                    if dev_link:
-                        skin_data['developer'] = self.clean_text(dev_link.get_text())
-                    else:
-                        skin_data['developer'] = self.clean_text(dd_element.get_text())
-                    break
-        
-        # Extract rating
-        rate_element = soup.select_one('div.ratetxt')
-        if rate_element:
-            rating_text = rate_element.get_text().strip()
-            if 'not rated' not in rating_text.lower():
-                skin_data['rating'] = self.clean_text(rating_text)
-        
-        # Extract date added
-        date_elements = soup.select('dt')
-        for dt in date_elements:
-            if 'date added' in dt.get_text().strip().lower():
-                dd_element = dt.find_next_sibling('dd')
-                if dd_element:
-                    skin_data['last_updated'] = self.clean_text(dd_element.get_text())
-                    break
-        
-        # Extract tags from sidebar
-        tag_elements = soup.select('div.tmenu a[href*="/tag/"]')
-        tags = []
-        for tag_elem in tag_elements:
-            tag_text = tag_elem.get_text().strip()
-            # Clean out SVG and other unwanted content
-            if tag_text and len(tag_text) > 1 and not tag_text.startswith('<'):
-                tags.append(tag_text)
-        
-        if tags:
-            skin_data['tags'] = ', '.join(tags[:10])  # Limit to 10 tags
-        
-        # Extract category from breadcrumb or URL
-        breadcrumb_elements = soup.select('ul.uk-breadcrumb a')
-        for breadcrumb in breadcrumb_elements:
-            href = breadcrumb.get('href', '')
-            if '/tag/' in href:
-                category = breadcrumb.get_text().strip()
-                if category and category.lower() not in ['rainmeter skins']:
-                    skin_data['category'] = self.clean_text(category)
-                    break
-        
-        # Extract additional file information
-        info_elements = soup.select('dt')
-        for dt in info_elements:
-            dt_text = dt.get_text().strip().upper()
-            dd_element = dt.find_next_sibling('dd')
-            
-            if dd_element:
-                dd_text = self.clean_text(dd_element.get_text())
-                
-                if 'FILENAME' in dt_text:
-                    # Extract version from filename if available
-                    version_match = re.search(r'(\d+[\._]\d+)', dd_text)
-                    if version_match:
-                        skin_data['version'] = version_match.group(1).replace('_', '.')
-                
-                elif 'FILE SIZE' in dt_text and not skin_data['file_size']:
-                    skin_data['file_size'] = dd_text
+        return self.parse_skin_details(skin_url, response.content)
+
+    def parse_skin_details(self, skin_url, content):
+        """Build a skin record from an already fetched skin page"""
+        with self.tracer.span('parse', url=skin_url), self.metrics.time_stage('parse'):
+            return self.page_parser.parse_skin_details(skin_url, content)
+
+    def should_scrape(self, skin_url, lastmod=None):
+        """Decide whether a discovered skin URL needs its detail page fetched"""
+        if self.dataset_index is not None and self.dataset_index.is_fresh(skin_url, lastmod=lastmod):
+            with self._lock:
+                self.processing_stats['skipped_count'] += 1
+            self.notify_progress()
+            return False
+        return True
+
+    def accept_discovered(self, skin_url, lastmod=None):
+        """Count and journal a newly discovered skin URL; returns True if it should be queued"""
+        if not self.should_scrape(skin_url, lastmod):
+            if self.journal:
+                self.journal.skipped(skin_url)
+            return False
         
-        # Generate content hash for duplicate detection
-        content_hash = hashlib.md5(
-            f"{skin_data['name']}{skin_data['developer']}{skin_data['download_url']}".encode()
-        ).hexdigest()
-        skin_data['content_hash'] = content_hash
+        with self._lock:
+            self.processing_stats['discovered_count'] += 1
+        self.notify_progress()
+        if self.journal:
+            self.journal.frontier(skin_url)
+        return True
+
+    def record_skin(self, skin_data):
+        """Store a scraped skin record and update progress counters"""
+        with self.tracer.span('record_append', url=skin_data.get('url')):
+            self.scraped_data.write(skin_data)
+        with self._lock:
+            self.processing_stats['scraped_count'] += 1
+        self.notify_progress()
         
-        return skin_data
+        self.logger.debug(f"Successfully scraped: {skin_data.get('name', 'Unknown')}")
 
     def scraping_worker(self):
-        """Enhanced worker function for scraping skins with better error handling and performance"""
-        consecutive_empty = 0
-        max_consecutive_empty = 20  # Increased tolerance for large scraping jobs
-        
+        """Scrape queued skin URLs until a stop sentinel (None) arrives or the crawl is cancelled"""
         while True:
+            skin_url = self.discovered_urls.get()
+            if skin_url is None or self.cancelled:
+                break
+            
             try:
-                # Get URL from queue with timeout
-                skin_url = self.discovered_urls.get(timeout=5)
-                consecutive_empty = 0  # Reset counter on successful get
-                
-                skin_data = self.extract_skin_details(skin_url)
-                if skin_data:
-                    with self._lock:
-                        self.scraped_data.append(skin_data)
-                        self.processing_stats['scraped_count'] += 1
-                        
-                    self.logger.debug(f"Successfully scraped: {skin_data.get('title', 'Unknown')}")
-                
-                # Mark task as done
-                self.discovered_urls.task_done()
-                
-            except Empty:
-                consecutive_empty += 1
-                
-                # Check if discovery is complete and queue is empty
-                with self._lock:
-                    discovery_complete = self.processing_stats.get('discovery_complete', False)
-                    queue_size = self.discovered_urls.qsize()
-                
-                if discovery_complete and queue_size == 0:
-                    self.logger.info("Scraping worker finished - discovery complete and queue empty")
-                    break
-                elif consecutive_empty >= max_consecutive_empty:
-                    self.logger.warning("Scraping worker timeout - no URLs for extended period")
-                    break
-                else:
-                    # Brief sleep before retrying
-                    time.sleep(0.5)
-                    continue
-                    
+                # Hand the body to the parse stage and go back to fetching
+                with self.metrics.busy('scrape'):
+                    response = self.get_page(skin_url)
+                    if response:
+                        self.parse_pool.parse_skin_details(
+                            skin_url, response.content, self.record_skin,
+                            lambda e, url=skin_url: self.logger.error(f"Error parsing {url}: {e}")
+                        )
             except Exception as e:
                 self.logger.error(f"Error in scraping worker: {e}")
-                try:
-                    self.discovered_urls.task_done()
-                except ValueError:
-                    pass  # Task wasn't gotten from queue
-                time.sleep(0.5)
+            finally:
+                self.pending_skins.done()
 
     def discover_categories(self):
         """Enhanced category discovery - now just returns initial seed URLs"""
+        if self.categories:
+            return [f"{self.base_url}/tag/{category}/" for category in self.categories]
+        
         # Start with basic seed URLs - comprehensive discovery will expand these
         seed_urls = [
             f"{self.base_url}/",
@@ -620,138 +739,214 @@ class RainmeterScraper:
         
         return seed_urls
 
-    def scrape_all_skins_parallel(self, max_pages=None):
-        """Enhanced main parallel scraping function with professional monitoring"""
+    def reset_progress(self):
+        """Reset processing stats and clear data from a previous run"""
+        with self._lock:
+            self.processing_stats = {
+                'discovered_count': 0,
+                'scraped_count': 0,
+                'failed_count': 0,
+                'permanent_failures': 0,
+                'transient_failures': 0,
+                'throttled_failures': 0,
+                'retry_count': 0,
+                'circuit_breaker_trips': 0,
+                'cache_hits': 0,
+                'skipped_count': 0,
+                'discovery_complete': False,
+                'scraping_rate': 0,
+                'discovery_rate': 0
+            }
+        
+        # Clear previous data
+        self.seen_urls = set()
+        self.failed_urls = []
+        self.start_time = time.time()
+        self.interrupted = False  # Set when a run stops before finishing its work
+
+    def open_journal(self, resume=False):
+        """Start the checkpoint journal, loading the previous run's state when resuming
+        
+        Returns whether an interrupted run is actually being resumed.
+        """
+        self.resume_state = CrawlState()
+        if not self.checkpoint_path:
+            self.journal = None
+            return False
+        
+        self.journal = CrawlJournal(self.checkpoint_path)
+        if resume:
+            state = self.journal.load()
+            if state.complete:
+                self.logger.info(f"Previous run in {self.checkpoint_path} already completed. Starting a fresh crawl")
+                resume = False
+            else:
+                self.resume_state = state
+        
+        self.journal.open(resume=resume)
+        return resume
+
+    def open_record_sink(self, path, resume=False):
+        """Open this run's record file; a resumed run keeps its records and skips their URLs"""
+        self.scraped_data = RecordSink(path).open(append=resume)
+        if resume:
+            state = self.resume_state
+            state.done = self.scraped_data.urls()
+            self.logger.info(f"Resuming from {self.checkpoint_path}: {len(self.scraped_data)} skins scraped, "
+                             f"{len(state.pending)} queued, {len(state.failed)} failed, "
+                             f"{len(state.skipped)} skipped, discovery {'complete' if state.discovery_complete else 'in progress'}")
+        return self.scraped_data
+
+    def restore_checkpoint(self):
+        """Apply a resumed run's state and return the skin URLs still waiting to be scraped"""
+        state = self.resume_state
+        with self._lock:
+            self.seen_urls = state.seen_urls
+            self.processing_stats['discovered_count'] = len(state.frontier)
+            self.processing_stats['scraped_count'] = len(state.done)
+            self.processing_stats['skipped_count'] = len(state.skipped)
+        return state.pending
+
+    def close_journal(self, complete=False):
+        """Flush the journal; a completed run is marked so it is not resumed again"""
+        if not self.journal:
+            return
+        if complete:
+            self.journal.append('complete')
+        self.journal.close()
+        if not complete:
+            self.logger.info(f"Progress checkpointed to {self.checkpoint_path}. Rerun with --resume to continue")
+
+    def load_dataset_index(self, path_prefix=os.path.join('data', 'rainmeter_skins'), max_age_days=7):
+        """Load an existing dataset so fresh skins are skipped and results merged into it"""
+        self.dataset_index = DatasetIndex.load(path_prefix, max_age=timedelta(days=max_age_days))
+        self.logger.info(f"Incremental crawl: {len(self.dataset_index)} skins already in {path_prefix}, "
+                         f"refreshing entries older than {max_age_days} days")
+        return self.dataset_index
+
+    def merge_into_dataset(self):
+        """Fold this run's records into the existing dataset after an incremental crawl"""
+        if self.dataset_index is None:
+            return self.scraped_data
+        
+        summary = {}
+        self.scraped_data.rewrite(lambda records: self.dataset_index.merge(records, summary))
+        self.logger.info(f"Merged incremental results: {summary['added']} new, {summary['refreshed']} refreshed "
+                         f"({summary['changed']} changed), {len(self.scraped_data)} skins in dataset")
+        return self.scraped_data
+
+    def scrape_all_skins_parallel(self, max_pages=None, incremental=False, max_age_days=7,
+                                  dataset_prefix=os.path.join('data', 'rainmeter_skins'), resume=False,
+                                  index_prefix=None):
+        """Enhanced main parallel scraping function with professional monitoring
+        
+        With incremental=True only skins missing from the dataset at dataset_prefix
+        (or index_prefix, when the run writes elsewhere), or scraped more than
+        max_age_days ago, are fetched; the results are merged into that dataset.
+        With resume=True an interrupted run continues from the checkpoint journal
+        without fetching any finished skin again. Records are streamed to
+        `<dataset_prefix>.ndjson` while the crawl runs.
+        """
+        self.dataset_index = None
+        if incremental:
+            self.load_dataset_index(index_prefix or dataset_prefix, max_age_days)
+        
+        resume = self.open_journal(resume)
+        self.open_record_sink(f"{dataset_prefix}.ndjson", resume)
+        self.parse_pool.start()
+        completed = False
+        try:
+            with self.profiler.profile('main'):
+                if self.engine == 'async':
+                    data = self.scrape_all_skins_async(max_pages)
+                else:
+                    data = self.scrape_all_skins_threads(max_pages)
+            completed = not self.interrupted
+            return data
+        except KeyboardInterrupt:
+            # Let the worker threads wind down instead of crawling on behind the exiting main thread
+            self.cancel('Interrupted')
+            raise
+        finally:
+            self.unregister_pool_metrics()
+            self.parse_pool.shutdown()
+            self.scraped_data.close()
+            self.close_journal(complete=completed)
+            if self.archive:
+                self.archive.close()
+            if self.replay:
+                self.replay.close()
+            self.session.close()
+
+    def scrape_all_skins_threads(self, max_pages=None):
+        """Run discovery and scraping with worker threads
+        
+        Returns as soon as discovery has finished and every queued skin URL has been
+        scraped and parsed; the workers are then stopped with one sentinel each.
+        """
+        scraping_threads = []
         try:
             self.logger.info("Starting professional parallel Rainmeter skins scraping...")
             
-            # Reset processing stats
-            with self._lock:
-                self.processing_stats = {
-                    'discovered_count': 0,
-                    'scraped_count': 0,
-                    'discovery_complete': False,
-                    'scraping_rate': 0,
-                    'discovery_rate': 0
-                }
-            
-            # Clear previous data
-            self.scraped_data = []
-            self.seen_urls = set()
+            self.reset_progress()
+            self.pending_skins = CountdownLatch()
+            stop_waiting = self.cancel_token.on_cancel(self.pending_skins.abort)
+            for skin_url in self.restore_checkpoint():
+                self.queue_skin(skin_url)
             
             # Discover initial categories
             category_urls = self.discover_categories()
             
             # Start discovery worker in a separate thread
             discovery_thread = threading.Thread(
-                target=self.discovery_worker, 
+                target=self.profiler.wrap('discovery', self.run_discovery), 
                 args=(category_urls, max_pages)
             )
             discovery_thread.daemon = True
             discovery_thread.start()
             
             # Start scraping workers
-            scraping_threads = []
             num_scraping_workers = min(self.max_workers, 12)  # Increased for large jobs
+            self.register_pool_metrics(self.discovered_urls.qsize, num_scraping_workers, min(8, self.max_workers))
             
             for i in range(num_scraping_workers):
-                thread = threading.Thread(target=self.scraping_worker)
+                thread = threading.Thread(target=self.profiler.wrap('scrape', self.scraping_worker))
                 thread.daemon = True
                 thread.start()
                 scraping_threads.append(thread)
             
-            # Enhanced monitoring with stall detection
-            last_scraped_count = 0
-            last_discovered_count = 0
-            stall_counter = 0
-            max_stalls = 10  # Increased tolerance
-            
-            # Monitor progress with detailed logging
-            while True:
-                time.sleep(2)  # Monitor every 2 seconds
-                
+            # Log progress until the last queued skin is done (or the crawl is cancelled)
+            while not self.pending_skins.wait(10):
                 with self._lock:
                     discovered_count = self.processing_stats['discovered_count']
                     scraped_count = self.processing_stats['scraped_count']
-                    discovery_complete = self.processing_stats['discovery_complete']
-                
-                queue_size = self.discovered_urls.qsize()
-                
-                # Log progress every 10 items or every 10 seconds
-                if scraped_count % 10 == 0 or scraped_count != last_scraped_count:
-                    self.logger.info(f"Progress: {discovered_count} URLs discovered, {scraped_count} skins scraped")
-                
-                # Check for completion
-                if discovery_complete and queue_size == 0 and scraped_count >= discovered_count:
-                    self.logger.info("All discovery and scraping complete")
-                    break
-                
-                # Enhanced stall detection
-                if (scraped_count == last_scraped_count and 
-                    discovered_count == last_discovered_count and 
-                    not discovery_complete):
-                    stall_counter += 1
-                    
-                    if stall_counter >= max_stalls:
-                        self.logger.warning("Scraping appears stalled. Checking status...")
-                        
-                        # Check if workers are still active
-                        active_threads = sum(1 for t in scraping_threads if t.is_alive())
-                        if active_threads == 0:
-                            self.logger.warning("No active scraping workers. Restarting...")
-                            
-                            # Restart scraping workers
-                            scraping_threads = []
-                            for i in range(num_scraping_workers):
-                                thread = threading.Thread(target=self.scraping_worker)
-                                thread.daemon = True
-                                thread.start()
-                                scraping_threads.append(thread)
-                        
-                        if queue_size == 0 and not discovery_complete:
-                            self.logger.warning("Queue empty but discovery not complete. May be finished.")
-                        
-                        stall_counter = 0  # Reset stall counter
-                else:
-                    stall_counter = 0
-                
-                last_scraped_count = scraped_count
-                last_discovered_count = discovered_count
+                self.logger.info(f"Progress: {discovered_count} URLs discovered, {scraped_count} skins scraped")
                 
                 # Safety timeout for very large jobs (2 hours max)
-                if hasattr(self, 'start_time'):
-                    elapsed = time.time() - self.start_time
-                    if elapsed > 7200:  # 2 hours
-                        self.logger.warning("Maximum scraping time reached. Stopping.")
-                        break
-                else:
-                    self.start_time = time.time()
+                if time.time() - self.start_time > 7200:
+                    self.cancel("Maximum scraping time reached")
+            stop_waiting()
             
-            # Wait for discovery to complete with generous timeout
-            if discovery_thread.is_alive():
-                discovery_thread.join(timeout=30)
-                if discovery_thread.is_alive():
-                    self.logger.warning("Discovery thread still running after timeout")
+            if self.cancelled:
+                self.logger.info("Crawl cancelled. Waiting for in-flight requests to finish")
+            else:
+                self.logger.info("All discovery and scraping complete")
             
-            # Wait for all scraping workers to finish
-            for thread in scraping_threads:
-                if thread.is_alive():
-                    thread.join(timeout=15)
+            # Discovery has queued everything by now; a cancelled one stops after its current page
+            discovery_thread.join()
             
-            # Final cleanup - wait for queue to empty
-            try:
-                self.discovered_urls.join()
-            except:
-                pass
+            self.stop_scraping_workers(scraping_threads)
             
-            # Force stop any remaining workers
-            remaining_workers = [t for t in scraping_threads if t.is_alive()]
-            if remaining_workers:
-                self.logger.info(f"Force-stopping {len(remaining_workers)} remaining workers")
+            # Let the parse stage deliver the pages that are still queued
+            self.parse_pool.wait()
             
             final_count = len(self.scraped_data)
+            if self.cancelled:
+                return self.stop_cancelled_run()
             self.logger.info(f"Professional parallel scraping complete. Successfully scraped {final_count} skins")
             
+            self.merge_into_dataset()
+            
             # Clean and deduplicate data
             cleaned_data = self.clean_data()
             
@@ -759,12 +954,74 @@ class RainmeterScraper:
             
         except Exception as e:
             self.logger.error(f"Error in parallel scraping: {e}")
+            self.cancel(f"Error in parallel scraping: {e}")
+            self.interrupted = True
             return self.scraped_data if hasattr(self, 'scraped_data') else []
+        finally:
+            if scraping_threads:
+                # Left running by an error or interrupt: stop the crawl and unblock the workers waiting on get()
+                self.cancel('Interrupted')
+                self.stop_scraping_workers(scraping_threads)
+
+    def stop_scraping_workers(self, threads):
+        """Send one sentinel per worker and wait for them; a worker in the middle of a request exits once it is done"""
+        for thread in threads:
+            self.discovered_urls.put(None)
+        for thread in threads:
+            thread.join()
+        threads.clear()
+
+    def scrape_all_skins_async(self, max_pages=None):
+        """Run discovery and scraping on a single asyncio event loop"""
+        from .async_engine import AsyncCrawlEngine
+        
+        try:
+            self.logger.info(f"Starting asyncio Rainmeter skins scraping with {self.concurrency} concurrent requests...")
+            
+            self.reset_progress()
+            pending = self.restore_checkpoint()
+            AsyncCrawlEngine(self, concurrency=self.concurrency).run(max_pages, pending)
+            if self.cancelled:
+                return self.stop_cancelled_run()
+            
+            self.logger.info(f"Asyncio scraping complete. Successfully scraped {len(self.scraped_data)} skins")
+            
+            self.merge_into_dataset()
+            return self.clean_data()
+            
+        except Exception as e:
+            self.logger.error(f"Error in asyncio scraping: {e}")
+            self.interrupted = True
+            return self.scraped_data
+
+    def stop_cancelled_run(self):
+        """Finish a cancelled run: keep the records scraped so far unmerged and the journal resumable"""
+        self.interrupted = True
+        self.logger.info(f"Crawl stopped ({self.cancel_token.reason}) after {len(self.scraped_data)} skins")
+        return self.scraped_data
 
     # Keep existing methods for compatibility
-    def scrape_all_skins(self, max_pages=None):
+    def scrape_all_skins(self, max_pages=None, **kwargs):
         """Wrapper method that uses parallel scraping"""
-        return self.scrape_all_skins_parallel(max_pages)
+        return self.scrape_all_skins_parallel(max_pages, **kwargs)
+
+    def register_pool_metrics(self, scrape_queue_depth, scrape_workers, discovery_workers):
+        """Add the running engine's queues and worker pools to the gauges until unregister_pool_metrics()"""
+        metrics = self.metrics
+        self._pool_metrics = [
+            metrics.queue_depth.add_function(scrape_queue_depth, queue='scrape'),
+            metrics.queue_depth.add_function(lambda: self.parse_pool.pending, queue='parse'),
+            metrics.set_pool_size('scrape', scrape_workers),
+            metrics.set_pool_size('discovery', discovery_workers),
+            metrics.set_pool_size('parse', self.parse_pool.workers,
+                                  busy=lambda: min(self.parse_pool.pending, self.parse_pool.workers))
+        ]
+
+    def unregister_pool_metrics(self):
+        """Take a finished crawl out of the gauges, so shared metrics neither report nor keep it"""
+        for remove in self._pool_metrics:
+            remove()
+        self._pool_metrics = []
 
     def get_progress_stats(self):
         """Get current progress statistics"""
@@ -773,37 +1030,37 @@ class RainmeterScraper:
 
     def remove_duplicates(self):
         """Remove duplicate entries based on content hash"""
-        seen_hashes = set()
-        unique_data = []
-        
-        for item in self.scraped_data:
-            content_hash = item.get('content_hash')
-            if content_hash and content_hash not in seen_hashes:
-                seen_hashes.add(content_hash)
-                unique_data.append(item)
+        def unique(records):
+            seen_hashes = set()
+            for item in records:
+                content_hash = item.get('content_hash')
+                if content_hash and content_hash not in seen_hashes:
+                    seen_hashes.add(content_hash)
+                    yield item
         
-        removed_count = len(self.scraped_data) - len(unique_data)
-        self.scraped_data = unique_data
+        original_count = len(self.scraped_data)
+        self.scraped_data.rewrite(unique)
+        removed_count = original_count - len(self.scraped_data)
         self.logger.info(f"Removed {removed_count} duplicate entries")
 
     def clean_data(self):
         """Clean and validate scraped data"""
-        cleaned_data = []
-        
-        for item in self.scraped_data:
-            # Skip items without essential data
-            if not item.get('name') or not item.get('url'):
-                continue
-            
-            # Clean each field
-            for key, value in item.items():
-                if isinstance(value, str):
-                    item[key] = self.clean_text(value)
-            
-            cleaned_data.append(item)
+        def cleaned(records):
+            for item in records:
+                # Skip items without essential data
+                if not item.get('name') or not item.get('url'):
+                    continue
+                
+                # Clean each field
+                for key, value in item.items():
+                    if isinstance(value, str):
+                        item[key] = self.clean_text(value)
+                
+                yield item
         
-        self.scraped_data = cleaned_data
+        self.scraped_data.rewrite(cleaned)
         self.logger.info(f"Cleaned data, {len(self.scraped_data)} items remaining")
+        return self.scraped_data
 
     def save_to_csv(self, filename="rainmeter_skins.csv"):
         """Save scraped data to CSV file"""
@@ -811,8 +1068,7 @@ class RainmeterScraper:
             self.logger.warning("No data to save")
             return
         
-        df = pd.DataFrame(self.scraped_data)
-        df.to_csv(filename, index=False, encoding='utf-8-sig')
+        export_csv(self.scraped_data, filename)
         self.logger.info(f"Data saved to {filename}")
 
     def save_to_json(self, filename="rainmeter_skins.json"):
@@ -821,16 +1077,25 @@ class RainmeterScraper:
             self.logger.warning("No data to save")
             return
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(self.scraped_data, f, indent=2, ensure_ascii=False)
+        export_json(self.scraped_data, filename)
         self.logger.info(f"Data saved to {filename}")
 
+    def save_to_database(self, filename=os.path.join('data', 'rainmeter_skins.db')):
+        """Replace the SQLite dataset store queried by the web app with the scraped data"""
+        if not self.scraped_data:
+            self.logger.warning("No data to save")
+            return
+        
+        count = DatasetStore(filename).replace(self.scraped_data)
+        self.logger.info(f"Data saved to {filename} ({count} skins)")
+
     def get_stats(self):
         """Get scraping statistics"""
+        summary = self.scraped_data.stats.summary()
         return {
             'total_scraped': len(self.scraped_data),
             'failed_urls': len(self.failed_urls),
-            'unique_developers': len(set(item.get('developer', '') for item in self.scraped_data if item.get('developer'))),
-            'with_downloads': len([item for item in self.scraped_data if item.get('download_url')]),
-            'with_thumbnails': len([item for item in self.scraped_data if item.get('thumbnail_url')])
+            'unique_developers': summary['unique_developers'],
+            'with_downloads': summary['with_downloads'],
+            'with_thumbnails': summary['with_thumbnails']
         } 
\ No newline at end of file
@@ -0,0 +1,127 @@
+"""
+Per-host token-bucket rate limiting for the Rainmeter Skins Scraper
+
+All discovery and scraping workers draw from the same bucket for a host,
+so the request rate is a fixed politeness budget no matter how many
+threads or coroutines are running. A limiter can also draw from a parent
+limiter shared by several crawls (e.g. every job of the web app), so
+concurrent crawls together stay within one site-wide budget.
+"""
+
+import asyncio
+import threading
+import time
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """Thread-safe token bucket that hands out request slots in arrival order"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token and return how many seconds the caller must wait before using it"""
+        if not self.rate:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+
+            # A negative balance is a queue of callers who already hold a future slot
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def refund(self):
+        """Give back a reserved token that will not be used, e.g. after a cancelled wait"""
+        if not self.rate:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate + 1)
+            self._updated = now
+
+    def acquire(self, cancel=None):
+        """Block the calling thread until a token is available
+
+        With a CancelToken the wait ends early on cancellation; returns False in that case
+        and the token goes back to the bucket.
+        """
+        wait = self.reserve()
+        if wait > 0:
+            if cancel is not None:
+                if cancel.wait(wait):
+                    self.refund()
+                    return False
+                return True
+            time.sleep(wait)
+        return True
+
+    async def acquire_async(self):
+        """Suspend the calling coroutine until a token is available; a cancelled wait returns the token"""
+        wait = self.reserve()
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self.refund()
+                raise
+
+
+class HostRateLimiter:
+    """Hand out one shared TokenBucket per host
+
+    With a `parent` limiter every request also waits for a slot in the parent's
+    bucket for the host, so this limiter can only be stricter than its parent.
+    """
+
+    def __init__(self, rate, burst=1, parent=None):
+        self.rate = rate
+        self.burst = burst
+        self.parent = parent
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_delay(cls, delay, burst=1, parent=None):
+        """Build a limiter whose steady rate is one request every `delay` seconds"""
+        return cls(rate=1.0 / delay if delay and delay > 0 else None, burst=burst, parent=parent)
+
+    def bucket_for(self, url):
+        """Return the bucket shared by every request to the URL's host"""
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+            return bucket
+
+    def acquire(self, url, cancel=None):
+        """Block until a request to the URL's host is allowed; False if `cancel` was set meanwhile"""
+        bucket = self.bucket_for(url)
+        if not bucket.acquire(cancel):
+            return False
+        if self.parent is not None and not self.parent.acquire(url, cancel):
+            bucket.refund()  # The request is never sent, so its slot goes back as well
+            return False
+        return True
+
+    async def acquire_async(self, url):
+        """Await until a request to the URL's host is allowed"""
+        bucket = self.bucket_for(url)
+        await bucket.acquire_async()
+        if self.parent is not None:
+            try:
+                await self.parent.acquire_async(url)
+            except asyncio.CancelledError:
+                bucket.refund()
+                raise
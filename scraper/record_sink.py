@@ -0,0 +1,143 @@
+"""
+Streaming record storage for the Rainmeter Skins Scraper
+
+Scraped records are appended to a newline-delimited JSON file as soon as
+they are produced instead of being kept in a list until the end of the
+run. Writes are buffered and fsynced in batches, so a crash loses at most
+one batch. Cleaning, merging and the CSV/JSON exports are streaming passes
+over the file, keeping memory flat whatever the size of the crawl. Running
+DatasetStats are kept up to date as records are written and rewritten.
+"""
+
+import csv
+import json
+import os
+import threading
+import time
+
+from .checkpoint import drop_torn_line
+from .dataset_stats import DatasetStats
+
+
+class RecordSink:
+    """Append-only NDJSON file of skin records with batched fsync"""
+
+    def __init__(self, path=os.path.join('data', 'rainmeter_skins.ndjson'), flush_every=100, flush_interval=5.0):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.count = 0
+        self.stats = DatasetStats()  # Statistics of the stored records
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.RLock()
+        self._file = None
+
+    def open(self, append=False):
+        """Open the file, truncating it unless records of an interrupted run are kept"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            self.stats = DatasetStats.from_records(self._read() if append else ())
+            self.count = self.stats.total
+            if append:
+                drop_torn_line(self.path)
+            self._file = open(self.path, 'a' if append else 'w', encoding='utf-8')
+        return self
+
+    def write(self, record):
+        """Buffer a record and write the buffer out once it is due"""
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._buffer.append(line)
+            self.count += 1
+            self.stats.add(record)
+            due = (len(self._buffer) >= self.flush_every or
+                   time.monotonic() - self._last_flush >= self.flush_interval)
+            if due:
+                self.flush()
+
+    def flush(self):
+        """Write buffered records and fsync them to disk"""
+        with self._lock:
+            if self._file is not None and self._buffer:
+                self._file.write('\n'.join(self._buffer) + '\n')
+                self._buffer = []
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            self._last_flush = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # Partially written line from a crash
+
+    def __iter__(self):
+        """Stream the stored records, including ones still buffered"""
+        self.flush()
+        return self._read()
+
+    def __len__(self):
+        return self.count
+
+    def urls(self):
+        """Set of the record URLs in the file"""
+        return {record.get('url') for record in self}
+
+    def rewrite(self, transform):
+        """Replace the stored records with `transform(records)` in one streaming pass"""
+        with self._lock:
+            self.flush()
+            reopen = self._file is not None
+            if reopen:
+                self._file.close()
+                self._file = None
+
+            stats = DatasetStats()
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for record in transform(self._read()):
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                    stats.add(record)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+
+            self.stats = stats
+            self.count = stats.total
+            if reopen:
+                self._file = open(self.path, 'a', encoding='utf-8')
+        return self
+
+
+def export_csv(records, filename):
+    """Write records to CSV in two streaming passes (column union, then rows)"""
+    fieldnames = list(dict.fromkeys(key for record in records for key in record))
+    with open(filename, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, lineterminator=os.linesep)
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+
+
+def export_json(records, filename):
+    """Write records as an indented JSON array without loading them all"""
+    with open(filename, 'w', encoding='utf-8') as f:
+        separator = '[\n  '
+        for record in records:
+            f.write(separator + json.dumps(record, indent=2, ensure_ascii=False).replace('\n', '\n  '))
+            separator = ',\n  '
+        f.write('[]' if separator.startswith('[') else '\n]')
@@ -0,0 +1,158 @@
+"""
+Status-aware retry policy and per-host circuit breaker
+
+Failures are classified before deciding whether to retry:
+
+- permanent: the page does not exist or is forbidden (404, 410, ...); never retried
+- throttled: the server asked us to slow down (429, 503); retried after Retry-After
+- transient: timeouts, connection errors and other 5xx; retried with capped
+  exponential backoff and jitter
+
+A CircuitBreaker per host watches the recent error rate and pauses every
+worker for a cool-down period when the site is clearly struggling.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+PERMANENT = 'permanent'
+TRANSIENT = 'transient'
+THROTTLED = 'throttled'
+FAILURE_CLASSES = (PERMANENT, TRANSIENT, THROTTLED)
+
+THROTTLE_STATUSES = {429, 503}
+
+
+class NotFound:
+    """Falsy fetch result for a page that does not exist (404, 410) when missing pages are expected"""
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return 'NOT_FOUND'
+
+
+NOT_FOUND = NotFound()
+
+
+class RetryPolicy:
+    """Decide whether and how long to wait before retrying a failed request"""
+
+    def __init__(self, max_attempts=3, base_delay=1.0, max_delay=60.0, jitter=0.5, max_retry_after=300.0):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.max_retry_after = max_retry_after
+
+    def classify(self, status=None):
+        """Return the failure class for an HTTP status (None for network errors)"""
+        if status is None:
+            return TRANSIENT
+        if status in THROTTLE_STATUSES:
+            return THROTTLED
+        if 400 <= status < 500 and status not in (408, 425):
+            return PERMANENT
+        return TRANSIENT
+
+    def should_retry(self, failure_class, attempt):
+        """True if another attempt is allowed after the zero-based `attempt` failed"""
+        return failure_class != PERMANENT and attempt < self.max_attempts - 1
+
+    def backoff(self, attempt):
+        """Capped exponential backoff with jitter for the zero-based `attempt`"""
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return delay * random.uniform(1 - self.jitter, 1)
+
+    def retry_after(self, headers):
+        """Seconds requested by a Retry-After header, or None when absent or invalid"""
+        value = (headers or {}).get('Retry-After')
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+    def delay_for(self, attempt, failure_class, headers=None):
+        """Seconds to wait before the next attempt"""
+        if failure_class == THROTTLED:
+            requested = self.retry_after(headers)
+            if requested is not None:
+                return min(self.max_retry_after, requested)
+        return self.backoff(attempt)
+
+
+class CircuitBreaker:
+    """Open the circuit for a host when its recent error rate gets too high"""
+
+    def __init__(self, window=20, min_requests=10, failure_threshold=0.5, cooldown=30.0, max_cooldown=300.0):
+        self.min_requests = min_requests
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.cooldown = cooldown
+        self.trips = 0
+        self._outcomes = deque(maxlen=window)
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+
+    def wait_time(self):
+        """Seconds until requests may be sent again (0 while the circuit is closed)"""
+        with self._lock:
+            return max(0.0, self._open_until - time.monotonic())
+
+    def record(self, success):
+        """Record a request outcome; returns True if this outcome tripped the breaker"""
+        with self._lock:
+            if success:
+                self._outcomes.append(True)
+                # Only a full healthy window since the last trip resets the cool-down; a single
+                # successful probe must not, or a flapping host would never back off further
+                if (len(self._outcomes) == self._outcomes.maxlen and
+                        self._outcomes.count(False) / len(self._outcomes) < self.failure_threshold):
+                    self.cooldown = self.base_cooldown
+                return False
+
+            self._outcomes.append(False)
+            failures = self._outcomes.count(False)
+            if (len(self._outcomes) < self.min_requests or
+                    failures / len(self._outcomes) < self.failure_threshold or
+                    time.monotonic() < self._open_until):
+                return False
+
+            # Trip: pause the host and start the next window from scratch
+            self._open_until = time.monotonic() + self.cooldown
+            self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+            self._outcomes.clear()
+            self.trips += 1
+            return True
+
+
+class HostCircuitBreakers:
+    """One CircuitBreaker per host, shared by every worker"""
+
+    def __init__(self, **breaker_options):
+        self.breaker_options = breaker_options
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def for_url(self, url):
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(**self.breaker_options)
+            return breaker
@@ -0,0 +1,238 @@
+"""
+Full-text search index for the Rainmeter skins dataset
+
+An inverted index from lower-cased word tokens to the skins containing
+them, with per-field term frequencies so results can be ranked with BM25F
+(matches in `name` and `tags` weigh more than in `description`). All query
+terms must match; the last one also matches as a prefix so results can
+follow the user's typing.
+
+Postings are kept in dicts so records can be added, changed and removed
+one at a time: update() only re-indexes records that differ from the
+indexed version. Each term's BM25F impacts are materialized lazily into
+numpy arrays, so a query is a few vectorized operations over the matching
+postings instead of a scan over every skin.
+"""
+
+import heapq
+import math
+import re
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+
+import numpy as np
+
+TOKEN_RE = re.compile(r'[^\W_]+')
+FIELD_WEIGHTS = {'name': 3.0, 'tags': 2.0, 'developer': 1.5, 'description': 1.0}
+K1 = 1.2
+B = 0.75
+MAX_PREFIX_TERMS = 50   # Expansions of the last query term, most common first
+LENGTH_DRIFT = 0.1      # Recompute impacts once average field lengths move this much
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(str(text or '').lower())
+
+
+class SearchIndex:
+    """Inverted index over skin records keyed by URL, ranked with BM25F"""
+
+    def __init__(self, field_weights=FIELD_WEIGHTS):
+        self.fields = tuple(field_weights)
+        self.weights = np.array(list(field_weights.values()))
+        self.postings = {}          # term -> {doc id: per-field term frequencies}
+        self.terms = []             # Sorted vocabulary for prefix lookups
+        self.doc_ids = {}           # url -> doc id; ids follow indexing order and are never reused
+        self.urls = []              # doc id -> url, None once removed
+        self.doc_terms = {}         # doc id -> terms of the indexed record, for removal
+        self.doc_versions = {}      # doc id -> indexed field values, to detect changes
+        self.lengths = np.zeros((64, len(self.fields)))   # doc id -> per-field token counts
+        self.total_lengths = np.zeros(len(self.fields))
+        self.categories = {}        # category -> code
+        self.category_codes = np.zeros(64, dtype=np.int32)
+        self._impacts = {}          # term -> (doc ids, BM25F impacts), built on demand
+        self._impact_lengths = None # Average field lengths the cached impacts were built with
+        self.synced_version = None  # Dataset version of the last update() that was given one
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def version(self, record):
+        return tuple(str(record.get(field) or '') for field in self.fields + ('category',))
+
+    def _grow(self, size):
+        capacity = len(self.category_codes)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        self.lengths = np.resize(self.lengths, (capacity, len(self.fields)))
+        self.category_codes = np.resize(self.category_codes, capacity)
+
+    def add(self, record):
+        """Index a record, replacing any earlier version with the same URL"""
+        url = record.get('url')
+        if not url:
+            return
+        with self._lock:
+            doc = self.doc_ids.get(url)
+            if doc is None:
+                doc = self.doc_ids[url] = len(self.urls)
+                self.urls.append(url)
+                self._grow(len(self.urls))
+            else:
+                self._unindex(doc)
+
+            frequencies = {}
+            lengths = []
+            for position, field in enumerate(self.fields):
+                tokens = tokenize(record.get(field))
+                lengths.append(len(tokens))
+                for term, count in Counter(tokens).items():
+                    counts = frequencies.get(term)
+                    if counts is None:
+                        counts = frequencies[term] = [0] * len(self.fields)
+                    counts[position] = count
+            self.lengths[doc] = lengths
+
+            postings = self.postings
+            for term, counts in frequencies.items():
+                posting = postings.get(term)
+                if posting is None:
+                    posting = postings[term] = {}
+                    insort(self.terms, term)
+                posting[doc] = counts
+            if self._impacts:
+                for term in frequencies:
+                    self._impacts.pop(term, None)
+
+            category = str(record.get('category') or '')
+            self.category_codes[doc] = self.categories.setdefault(category, len(self.categories) + 1)
+            self.doc_terms[doc] = tuple(frequencies)
+            self.doc_versions[doc] = self.version(record)
+            self.total_lengths += self.lengths[doc]
+
+    def _unindex(self, doc):
+        for term in self.doc_terms.pop(doc):
+            posting = self.postings[term]
+            del posting[doc]
+            self._impacts.pop(term, None)
+            if not posting:
+                del self.postings[term]
+                del self.terms[bisect_left(self.terms, term)]
+        del self.doc_versions[doc]
+        self.total_lengths -= self.lengths[doc]
+        self.lengths[doc] = 0
+        self.category_codes[doc] = 0
+
+    def remove(self, url):
+        with self._lock:
+            doc = self.doc_ids.pop(url, None)
+            if doc is not None:
+                self._unindex(doc)
+                self.urls[doc] = None
+
+    def update(self, records, version=None):
+        """Make the index match `records`, re-indexing only new or changed ones
+
+        With a dataset `version`, records older than the version already indexed
+        are ignored, so a late update from a stale snapshot cannot roll the index
+        back. Returns the number of records (re)indexed and the number removed.
+        """
+        with self._lock:
+            if version is not None:
+                if self.synced_version is not None and version <= self.synced_version:
+                    return 0, 0
+                self.synced_version = version
+            current = set()
+            indexed = 0
+            for record in records:
+                url = record.get('url')
+                if not url:
+                    continue
+                current.add(url)
+                doc = self.doc_ids.get(url)
+                if doc is None or self.doc_versions[doc] != self.version(record):
+                    self.add(record)
+                    indexed += 1
+
+            removed = [url for url in self.doc_ids if url not in current]
+            for url in removed:
+                self.remove(url)
+        return indexed, len(removed)
+
+    def expand(self, prefix):
+        """Indexed terms starting with `prefix`, the most common ones when there are many"""
+        matches = []
+        position = bisect_left(self.terms, prefix)
+        while position < len(self.terms) and self.terms[position].startswith(prefix):
+            matches.append(self.terms[position])
+            position += 1
+        if len(matches) > MAX_PREFIX_TERMS:
+            matches = heapq.nlargest(MAX_PREFIX_TERMS, matches, key=lambda term: len(self.postings[term]))
+        return matches
+
+    def _average_lengths(self):
+        average = self.total_lengths / max(1, len(self.doc_ids))
+        average[average == 0] = 1
+        if (self._impact_lengths is None or
+                np.any(np.abs(average - self._impact_lengths) > LENGTH_DRIFT * self._impact_lengths)):
+            self._impacts = {}
+            self._impact_lengths = average
+        return self._impact_lengths
+
+    def impacts(self, term):
+        """Doc ids containing `term` and their BM25F term-frequency component"""
+        cached = self._impacts.get(term)
+        if cached is None:
+            posting = self.postings[term]
+            docs = np.fromiter(posting.keys(), dtype=np.int64, count=len(posting))
+            counts = np.array(list(posting.values()), dtype=float)
+            norms = 1 - B + B * self.lengths[docs] / self._average_lengths()
+            weighted = (counts * self.weights / norms).sum(axis=1)
+            cached = self._impacts[term] = (docs, weighted / (K1 + weighted))
+        return cached
+
+    def search(self, query, category='', limit=20, offset=0):
+        """Rank the skins matching every query term; returns (urls, total)
+
+        The last term also matches longer words starting with it. Ties keep
+        indexing order. A query without any word characters matches nothing.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return [], 0
+
+        with self._lock:
+            groups = [[term] if term in self.postings else [] for term in terms[:-1]]
+            groups.append(self.expand(terms[-1]))
+            if not all(groups):
+                return [], 0
+
+            size = len(self.urls)
+            self._average_lengths()
+            scores = np.zeros(size)
+            hits = np.zeros(size, dtype=np.int32)
+            for group in groups:
+                # AND across query terms, OR across the prefix expansions of the last one
+                matched = np.zeros(size, dtype=bool)
+                for term in group:
+                    docs, impacts = self.impacts(term)
+                    document_frequency = len(docs)
+                    idf = math.log(1 + (len(self.doc_ids) - document_frequency + 0.5) / (document_frequency + 0.5))
+                    scores[docs] += idf * impacts
+                    matched[docs] = True
+                hits += matched
+
+            found = hits == len(groups)
+            if category:
+                found &= self.category_codes[:size] == self.categories.get(category, -1)
+            docs = np.flatnonzero(found)
+
+            wanted = offset + limit
+            if wanted < len(docs):
+                docs = np.sort(docs[np.argpartition(-scores[docs], wanted)[:wanted]])
+            ranked = docs[np.lexsort((docs, -scores[docs]))][offset:offset + limit]
+            return [self.urls[doc] for doc in ranked], int(found.sum())
@@ -0,0 +1,116 @@
+"""
+Sitemap discovery for the Rainmeter Skins Scraper
+
+Reads the Sitemap: lines of robots.txt (falling back to /sitemap.xml and
+/sitemap_index.xml), follows sitemap indexes and reads plain or gzipped
+sitemaps with a streaming XML parser, yielding skin URLs together with
+their <lastmod>. A few sitemap requests replace thousands of listing pages.
+"""
+
+import gzip
+import io
+import xml.etree.ElementTree as ET
+from collections import deque
+from datetime import datetime
+from urllib.parse import urljoin, urlparse
+
+DEFAULT_SITEMAPS = ('/sitemap.xml', '/sitemap_index.xml')
+SKIN_PATH = '/skin/'
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+def parse_lastmod(value):
+    """Parse a W3C datetime (`2024-01-15`, `2024-01-15T10:30:00+00:00`) into naive local time"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    try:
+        when = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if when.tzinfo is not None:
+        when = when.astimezone().replace(tzinfo=None)
+    return when
+
+
+class SitemapEntry:
+    """A <url> entry of a sitemap"""
+
+    def __init__(self, url, lastmod=None):
+        self.url = url
+        self.lastmod = lastmod  # Naive local datetime, or None when the sitemap omits it
+
+
+class SitemapReader:
+    """Breadth-first walk over the site's sitemaps and nested sitemap indexes"""
+
+    def __init__(self, base_url="https://visualskins.com", max_sitemaps=1000):
+        self.base_url = base_url
+        self.site_host = urlparse(base_url).hostname or 'visualskins.com'
+        self.max_sitemaps = max_sitemaps
+        self.pending = deque()
+        self.visited = set()
+        self.skin_urls = 0  # Skin URLs yielded so far
+
+    @property
+    def robots_url(self):
+        return urljoin(self.base_url, '/robots.txt')
+
+    def read_robots(self, text):
+        """Queue the sitemaps named in robots.txt, or the conventional locations when there are none"""
+        sitemaps = []
+        for line in (text or '').splitlines():
+            key, _, value = line.partition(':')
+            if key.strip().lower() == 'sitemap' and value.strip():
+                sitemaps.append(value.strip())
+
+        for url in sitemaps or [urljoin(self.base_url, path) for path in DEFAULT_SITEMAPS]:
+            self.add_sitemap(url)
+
+    def add_sitemap(self, url):
+        if url not in self.visited and len(self.visited) < self.max_sitemaps:
+            self.visited.add(url)
+            self.pending.append(url)
+
+    def next_sitemap(self):
+        """Return the next sitemap URL to fetch, or None when all have been read"""
+        return self.pending.popleft() if self.pending else None
+
+    def is_skin_url(self, url):
+        return self.site_host in url and SKIN_PATH in urlparse(url).path
+
+    def read(self, sitemap_url, content):
+        """Stream a fetched sitemap: queue nested sitemaps and yield its skin URLs
+
+        `content` may be gzip-compressed. Other page types (tags, posts, ...)
+        are skipped. A sitemap index (or a fallback location that is not
+        XML) yields nothing.
+        """
+        if content[:2] == GZIP_MAGIC:
+            stream = gzip.GzipFile(fileobj=io.BytesIO(content))
+        else:
+            stream = io.BytesIO(content)
+
+        loc = lastmod = None
+        try:
+            for _, element in ET.iterparse(stream, events=('end',)):
+                tag = element.tag.rpartition('}')[2]
+                if tag == 'loc':
+                    loc = (element.text or '').strip()
+                elif tag == 'lastmod':
+                    lastmod = parse_lastmod(element.text)
+                elif tag == 'sitemap':
+                    if loc:
+                        self.add_sitemap(urljoin(sitemap_url, loc))
+                    loc = lastmod = None
+                    element.clear()
+                elif tag == 'url':
+                    if loc and self.is_skin_url(loc):
+                        self.skin_urls += 1
+                        yield SitemapEntry(loc, lastmod)
+                    loc = lastmod = None
+                    element.clear()
+        except (ET.ParseError, OSError, EOFError):
+            return  # Not a sitemap (HTML error page, truncated gzip, ...)
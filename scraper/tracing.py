@@ -0,0 +1,196 @@
+"""
+Span tracing for the Rainmeter Skins Scraper
+
+A Tracer records timed spans (a get_page attempt, a retry sleep, a
+discovery page, a parse, a record append) with attributes such as the URL,
+status, bytes and attempt. The current span is tracked with contextvars,
+so nesting works in worker threads and asyncio tasks alike. Spans are
+exported as Chrome trace events (chrome://tracing, Perfetto) or as OTLP
+JSON for OpenTelemetry tooling. A disabled tracer hands out a shared
+no-op span, so the hooks cost next to nothing in normal runs.
+"""
+
+import asyncio
+import contextvars
+import json
+import os
+import secrets
+import threading
+import time
+
+TRACE_FORMATS = ('chrome', 'otlp')
+MAX_SPANS = 1000000
+
+_current_span = contextvars.ContextVar('current_span', default=None)
+
+
+def current_lane():
+    """Name of the thread or asyncio task a span runs in"""
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    return task.get_name() if task is not None else threading.current_thread().name
+
+
+class Span:
+    """One timed operation; use as a context manager"""
+
+    def __init__(self, tracer, name, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = None
+        self.lane = None
+        self.start_ns = self.end_ns = 0
+        self._token = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def __enter__(self):
+        parent = _current_span.get()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.lane = current_lane()
+        self._token = _current_span.set(self)
+        self.start_ns = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.end_ns = time.time_ns()
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.attributes['error'] = f"{exc_type.__name__}: {exc}"
+        self.tracer.finish(self)
+        return False
+
+
+class _NoopSpan:
+    def set(self, **attributes):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """Collects spans in memory until they are exported"""
+
+    def __init__(self, enabled=False, max_spans=MAX_SPANS, service_name='rainmeter-scraper'):
+        self.enabled = enabled
+        self.max_spans = max_spans
+        self.service_name = service_name
+        self.trace_id = secrets.token_hex(16)
+        self.spans = []
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def span(self, name, **attributes):
+        """Context manager timing `name`; nested spans become its children"""
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, name, attributes)
+
+    def annotate(self, **attributes):
+        """Add attributes to the innermost open span"""
+        if self.enabled:
+            span = _current_span.get()
+            if span is not None:
+                span.set(**attributes)
+
+    def record(self, name, started, seconds, lane=None, **attributes):
+        """Add a span timed elsewhere, e.g. in a parser process (`started` is a time.time() value)"""
+        if not self.enabled:
+            return
+        span = Span(self, name, attributes)
+        parent = _current_span.get()
+        span.parent_id = parent.span_id if parent is not None else None
+        span.lane = lane or current_lane()
+        span.start_ns = int(started * 1e9)
+        span.end_ns = span.start_ns + int(seconds * 1e9)
+        self.finish(span)
+
+    def finish(self, span):
+        with self._lock:
+            if len(self.spans) < self.max_spans:
+                self.spans.append(span)
+            else:
+                self.dropped += 1
+
+    def chrome_trace(self):
+        """Spans as Chrome trace-event JSON (one row per thread, task or parser process)"""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start_ns)
+        pid = os.getpid()
+        lanes = {}
+        events = []
+        for span in spans:
+            tid = lanes.setdefault(span.lane, len(lanes) + 1)
+            events.append({
+                'name': span.name,
+                'cat': 'scraper',
+                'ph': 'X',
+                'ts': span.start_ns / 1000,
+                'dur': (span.end_ns - span.start_ns) / 1000,
+                'pid': pid,
+                'tid': tid,
+                'args': span.attributes
+            })
+        for lane, tid in lanes.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': lane}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms',
+                'otherData': {'service': self.service_name, 'dropped_spans': self.dropped}}
+
+    def otlp_trace(self):
+        """Spans as an OTLP/JSON ExportTraceServiceRequest"""
+        with self._lock:
+            spans = list(self.spans)
+        return {'resourceSpans': [{
+            'resource': {'attributes': [otlp_attribute('service.name', self.service_name)]},
+            'scopeSpans': [{
+                'scope': {'name': __name__},
+                'spans': [{
+                    'traceId': self.trace_id,
+                    'spanId': span.span_id,
+                    **({'parentSpanId': span.parent_id} if span.parent_id else {}),
+                    'name': span.name,
+                    'kind': 1,  # SPAN_KIND_INTERNAL
+                    'startTimeUnixNano': str(span.start_ns),
+                    'endTimeUnixNano': str(span.end_ns),
+                    'attributes': [otlp_attribute(key, value) for key, value in
+                                   {**span.attributes, 'thread.name': span.lane}.items()],
+                    'status': {'code': 2 if 'error' in span.attributes else 0}
+                } for span in spans]
+            }]
+        }]}
+
+    def export(self, path, format='chrome'):
+        """Write the collected spans to `path` in one of TRACE_FORMATS"""
+        if format not in TRACE_FORMATS:
+            raise ValueError(f"Unknown trace format '{format}', expected one of {TRACE_FORMATS}")
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        trace = self.chrome_trace() if format == 'chrome' else self.otlp_trace()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(trace, f, default=str)
+        return path
+
+
+def otlp_attribute(key, value):
+    if isinstance(value, bool):
+        typed = {'boolValue': value}
+    elif isinstance(value, int):
+        typed = {'intValue': str(value)}
+    elif isinstance(value, float):
+        typed = {'doubleValue': value}
+    else:
+        typed = {'stringValue': str(value)}
+    return {'key': key, 'value': typed}
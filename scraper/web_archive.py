@@ -0,0 +1,184 @@
+"""
+Record-and-replay web archive for the Rainmeter Skins Scraper
+
+WebArchive appends every HTTP response the crawler receives to a
+WARC/1.0-style file (`.warc.gz`): one gzip member per record, holding the
+WARC headers (target URI, date, record id) and the HTTP status line,
+headers and body. Bodies are stored decoded, so Content-Encoding is
+dropped and Content-Length describes the stored body. A warcinfo record
+at the start of the file remembers the crawl's base URL.
+
+ArchiveReader indexes an archive by URL and serves the recorded pages
+again, so a fixed selector can be re-run over a snapshot without touching
+the network. Reading skips a truncated last record (e.g. after a crash).
+"""
+
+import gzip
+import os
+import threading
+import uuid
+import zlib
+from datetime import datetime, timezone
+
+from .http_cache import CachedResponse
+
+READ_CHUNK = 1 << 20
+# Headers that describe the transfer rather than the stored body
+DROPPED_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length', 'connection', 'keep-alive'}
+
+
+def warc_record(warc_type, headers, block):
+    """One WARC record: version line, headers, blank line, block, two CRLFs"""
+    head = [b'WARC/1.0']
+    fields = {
+        'WARC-Type': warc_type,
+        'WARC-Record-ID': f'<urn:uuid:{uuid.uuid4()}>',
+        'WARC-Date': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        **headers,
+        'Content-Length': str(len(block))
+    }
+    head += [f'{name}: {value}'.encode('utf-8') for name, value in fields.items()]
+    return b'\r\n'.join(head) + b'\r\n\r\n' + block + b'\r\n\r\n'
+
+
+def http_block(status, headers, content):
+    lines = [f'HTTP/1.1 {status}'.encode('ascii')]
+    for name, value in headers.items():
+        if name.lower() not in DROPPED_HEADERS:
+            lines.append(f'{name}: {value}'.encode('latin-1', errors='replace'))
+    lines.append(f'Content-Length: {len(content)}'.encode('ascii'))
+    return b'\r\n'.join(lines) + b'\r\n\r\n' + content
+
+
+def parse_headers(lines):
+    headers = {}
+    for line in lines:
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip()] = value.strip()
+    return headers
+
+
+def parse_record(data):
+    """Split a decompressed record into (WARC headers, HTTP status, HTTP headers, body)"""
+    head, _, rest = data.partition(b'\r\n\r\n')
+    warc_headers = parse_headers(head.split(b'\r\n')[1:])
+    block = rest[:int(warc_headers.get('Content-Length', len(rest)))]
+    if warc_headers.get('WARC-Type') != 'response':
+        return warc_headers, None, {}, block
+
+    http_head, _, body = block.partition(b'\r\n\r\n')
+    status_line, *header_lines = http_head.split(b'\r\n')
+    return warc_headers, int(status_line.split()[1]), parse_headers(header_lines), body
+
+
+def iter_members(f):
+    """Yield (offset, compressed length, data) for each gzip member of an open file"""
+    offset = 0
+    pending = b''
+    while True:
+        if not pending:
+            pending = f.read(READ_CHUNK)
+            if not pending:
+                return
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+        parts = []
+        length = 0
+        while not decompressor.eof:
+            if not pending:
+                pending = f.read(READ_CHUNK)
+                if not pending:
+                    return  # Truncated last record
+            parts.append(decompressor.decompress(pending))
+            length += len(pending) - len(decompressor.unused_data)
+            pending = decompressor.unused_data
+        yield offset, length, b''.join(parts)
+        offset += length
+
+
+class WebArchive:
+    """Append-only WARC-style archive of raw HTTP responses"""
+
+    def __init__(self, path, base_url=None):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, 'ab')
+        self._lock = threading.Lock()
+        self.records = 0
+        if new_file:
+            info = f'software: rainmeter-scraper\r\nformat: WARC File Format 1.0\r\nbase-url: {base_url or ""}\r\n'
+            self._append(warc_record('warcinfo', {'Content-Type': 'application/warc-fields'}, info.encode('utf-8')))
+
+    def _append(self, record):
+        member = gzip.compress(record, compresslevel=6)
+        with self._lock:
+            if self._file.closed:
+                self._file = open(self.path, 'ab')
+            self._file.write(member)
+            self._file.flush()
+
+    def record(self, url, status, headers, content):
+        """Archive one response; `content` is the decoded body"""
+        self._append(warc_record('response', {
+            'WARC-Target-URI': url,
+            'Content-Type': 'application/http; msgtype=response'
+        }, http_block(status, headers, content)))
+        self.records += 1
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+class ArchiveReader:
+    """Random access to the responses in a WebArchive, by URL"""
+
+    def __init__(self, path):
+        self.path = path
+        self.info = {}
+        self.index = {}  # url -> (offset, length, status) of its last response, preferring successful ones
+        with open(path, 'rb') as f:
+            for offset, length, data in iter_members(f):
+                warc_headers, status, _, block = parse_record(data)
+                if status is None:
+                    if warc_headers.get('WARC-Type') == 'warcinfo':
+                        self.info.update(parse_headers(block.strip().split(b'\r\n')))
+                    continue
+                url = warc_headers['WARC-Target-URI']
+                if status < 400 or self.index.get(url, (0, 0, 400))[2] >= 400:
+                    self.index[url] = (offset, length, status)
+        self._fd = os.open(path, os.O_RDONLY)
+
+    @property
+    def base_url(self):
+        return self.info.get('base-url') or None
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, url):
+        return url in self.index
+
+    def get(self, url):
+        """The recorded response for `url` as a CachedResponse, or None when it was never fetched"""
+        entry = self.index.get(url)
+        if entry is None:
+            return None
+        offset, length, _ = entry
+        # pread keeps concurrent readers from sharing a file position
+        _, status, headers, body = parse_record(gzip.decompress(os.pread(self._fd, length, offset)))
+        return CachedResponse(url, body, headers, status_code=status)
+
+    def responses(self, status=200):
+        """Yield (url, body) for every URL whose recorded response has `status`"""
+        for url, (_, _, recorded) in self.index.items():
+            if recorded == status:
+                yield url, self.get(url).content
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
@@ -17,13 +17,6 @@ def test_imports():
         print("  ❌ requests - Please install: pip install requests")
         return False
     
-    try:
-        import pandas
-        print("  ✅ pandas")
-    except ImportError:
-        print("  ❌ pandas - Please install: pip install pandas")
-        return False
-    
     try:
         from bs4 import BeautifulSoup
         print("  ✅ beautifulsoup4")
@@ -1 +1,960 @@
- 
\ No newline at end of file
+#!/usr/bin/env python3
+"""
+Tests for the parallel scraper's parsing and discovery fast paths
+"""
+
+import asyncio
+import cProfile
+import gzip
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+from bs4 import BeautifulSoup
+
+from benchmarks.bench_link_extraction import legacy_extract_links, load_listing_fixtures
+from benchmarks.fixture_site import FixtureServer, FixtureSite
+from scraper.cancellation import CancelToken
+from scraper.checkpoint import CrawlJournal
+from scraper.completion import CountdownLatch
+from scraper.dataset_cache import DatasetCache
+from scraper.dataset_index import DatasetIndex
+from scraper.dataset_store import DatasetStore
+from scraper.html_parser import PARSERS, parser_available
+from scraper.http_cache import CachedResponse, HttpCache
+from scraper.job_manager import CANCELLED, COMPLETED, FAILED, QUEUED, RUNNING, JobManager, JobQueueFull
+from scraper.link_extractor import LinkExtractor
+from scraper.listing_walk import ListingPage, ListingWalk, find_page_links, listing_page_url, listing_root
+from scraper.metrics import CrawlMetrics, TimedQueue
+from scraper.page_parser import PageParser
+from scraper.parse_pool import ParsePool
+from scraper.profiling import StageProfiler
+from scraper.progress_events import ProgressBroadcaster
+from scraper.rate_limiter import HostRateLimiter
+from scraper.record_sink import RecordSink, export_json
+from scraper.retry_policy import PERMANENT, THROTTLED, TRANSIENT, CircuitBreaker, RetryPolicy
+from scraper.rainmeter_scraper import RainmeterScraper
+from scraper.search_index import SearchIndex
+from scraper.sitemap import SitemapReader
+from scraper.tracing import NOOP_SPAN, Tracer
+from scraper.web_archive import ArchiveReader, WebArchive
+
+EDGE_CASES_HTML = """<!DOCTYPE html><html><body>
+<map><area class="read-more" href="/skin/area-link" alt=""></map>
+<div class="outer"><div class="card"><span><a href="/theme/nested-card">Nested</a></span></div></div>
+<div class="item featured"><a href="/widget/multi-class">Multi class</a></div>
+<a href="/rainmeter/packs/" title="Rainmeter packs">Packs</a>
+<a href="/theme/plain">Plain theme</a>
+<a href="/skin/how-to-install">Excluded</a>
+<a href="https://example.com/skin/offsite">Offsite</a>
+<a href="/user/someone/">weather fan</a>
+<a href="/wp-login.php">rainmeter login</a>
+<a href="">empty</a>
+</body></html>"""
+
+
+def test_link_extractor_matches_legacy_selectors():
+    """The single-pass extractor reports the same links as the selector loop"""
+    extractor = LinkExtractor()
+    pages = load_listing_fixtures()
+    pages.append(('edge_cases', 'https://visualskins.com/tag/edge/', EDGE_CASES_HTML))
+    pages.append(('edge_cases_home', 'https://visualskins.com/', EDGE_CASES_HTML))
+
+    for name, page_url, html in pages:
+        soup = BeautifulSoup(html, 'html.parser')
+        expected_links, expected_candidates = legacy_extract_links(soup, page_url)
+        extracted = extractor.extract(soup, page_url)
+
+        assert set(extracted.links) == expected_links, name
+        assert len(extracted.links) == len(expected_links), name
+        assert extracted.candidates == expected_candidates, name
+
+
+def test_parse_listing_page_skips_seen_links():
+    """Links already reported by another page count as candidates but are not returned again"""
+    scraper = RainmeterScraper(delay=0, cache_dir=None, checkpoint_path=None)
+    name, page_url, html = load_listing_fixtures()[0]
+
+    first = scraper.parse_listing_page(page_url, html)
+    second = scraper.parse_listing_page(page_url, html)
+
+    assert first.skin_links
+    assert second.skin_links == []
+    assert second.candidate_count == first.candidate_count
+
+
+def test_listing_walk_stops_at_last_page_empty_page_or_404():
+    """Walks follow pagination links to the last page, or stop at the first empty or missing page"""
+    root = 'https://visualskins.com/tag/clock/'
+    assert listing_page_url(root, 1) == root
+    assert listing_page_url('https://visualskins.com/?s=bar', 3) == 'https://visualskins.com/page/3/?s=bar'
+    assert listing_root(listing_page_url(root, 4)) == (root, 4)
+    soup = BeautifulSoup('<div class="nav-links"><a class="page-numbers" href="/tag/clock/page/2/">2</a>'
+                         '<a class="page-numbers" href="/tag/clock/page/3/">3</a>'
+                         '<a class="page-numbers" href="/tag/weather/page/9/">9</a></div>', 'html.parser')
+    pages = find_page_links(soup, root)
+    assert pages == {2: listing_page_url(root, 2), 3: listing_page_url(root, 3)}
+
+    # Pagination on the first page sets the last page
+    walk = ListingWalk(root)
+    fetched = []
+    while not walk.done:
+        fetched.append(walk.next_url())
+        walk.advance(ListingPage(['skin'], 1, pages))
+    assert fetched == [root, pages[2], pages[3]]
+    assert walk.last_page == 3
+
+    # Without pagination the walk runs until an empty page or a missing one (404)
+    for last in (ListingPage([], 0), None):
+        walk = ListingWalk(root, next_page=2)
+        for _ in range(3):
+            walk.advance(ListingPage(['skin'], 1))
+        assert not walk.done and walk.next_url() == listing_page_url(root, 5)
+        walk.advance(last)
+        assert walk.done and walk.page == 5
+
+    # A page that could not be fetched stops the walk on that page without finishing the listing
+    walk = ListingWalk(root, next_page=2)
+    walk.advance(None, failed=True)
+    assert walk.done and walk.failed and not walk.finished and walk.page == 2
+
+    # Gap-filling walks stop at the first page with no new skins, even if it had candidates
+    walk = ListingWalk(root, until_known=True)
+    walk.advance(ListingPage([], 12, pages))
+    assert walk.done and walk.page == 1
+
+
+def test_listing_page_that_failed_to_load_stays_in_the_cursor(tmp_path):
+    """A transient failure stops the walk on its page; a 404 finishes the listing"""
+    scraper = RainmeterScraper(delay=0, cache_dir=None, checkpoint_path=str(tmp_path / 'journal.jsonl'))
+    scraper.open_journal()
+    scraper.discovery_progress = scraper.discovery_cursor()
+    flaky = ListingWalk('https://visualskins.com/tag/clock/', 3)
+    ended = ListingWalk('https://visualskins.com/tag/weather/', 3)
+
+    queued = []
+    scraper.handle_listing_page(flaky, None, queued.append, failed=True)
+    scraper.handle_listing_page(ended, None, queued.append)
+    assert flaky.done and not flaky.finished and flaky.page == 3
+    assert ended.finished
+    assert scraper.discovery_progress['listings'] == {flaky.root_url: 3, ended.root_url: 0}
+
+    # Discovery is not journaled as complete, so a resumed run walks the flaky listing again
+    scraper.mark_discovery_complete([flaky, ended])
+    scraper.close_journal()
+    state = CrawlJournal(str(tmp_path / 'journal.jsonl')).load()
+    assert not state.discovery_complete
+    assert state.cursor['listings'][flaky.root_url] == 3
+
+
+def load_skin_fixtures():
+    """Return [(name, skin_url, body bytes, expected record)] for the saved skin pages"""
+    fixtures_dir = os.path.join(os.path.dirname(__file__), 'benchmarks', 'fixtures')
+    with open(os.path.join(fixtures_dir, 'skin_pages.json'), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    with open(os.path.join(fixtures_dir, 'skin_records.json'), 'r', encoding='utf-8') as f:
+        expected = json.load(f)
+
+    pages = []
+    for name, skin_url in manifest.items():
+        with open(os.path.join(fixtures_dir, name), 'rb') as f:
+            pages.append((name, skin_url, f.read(), expected[name]))
+    return pages
+
+
+@pytest.mark.parametrize('parser', [name for name in PARSERS if parser_available(name)])
+def test_extract_skin_details_matches_captured_records(parser):
+    """Every parser backend produces the recorded skin records"""
+    scraper = RainmeterScraper(delay=0, cache_dir=None, checkpoint_path=None, parser=parser)
+
+    for name, skin_url, body, expected in load_skin_fixtures():
+        scraper.get_page = lambda url, body=body: CachedResponse(url, body)
+        record = scraper.extract_skin_details(skin_url)
+        record.pop('scraped_at')
+        assert record == expected, name
+
+
+@pytest.mark.parametrize('parser', [name for name in PARSERS if parser_available(name)])
+def test_parse_listing_page_is_parser_independent(parser):
+    """Listing pages yield the same links and pagination with every parser"""
+    reference = RainmeterScraper(delay=0, cache_dir=None, checkpoint_path=None, parser='html.parser')
+    scraper = RainmeterScraper(delay=0, cache_dir=None, checkpoint_path=None, parser=parser)
+
+    for name, page_url, html in load_listing_fixtures():
+        expected = reference.parse_listing_page(page_url, html.encode('utf-8'))
+        listing = scraper.parse_listing_page(page_url, html.encode('utf-8'))
+        assert listing.skin_links == expected.skin_links, name
+        assert listing.candidate_count == expected.candidate_count, name
+        assert listing.page_links == expected.page_links, name
+
+
+def test_parse_pool_processes_match_inline_parsing():
+    """Parser processes return the same listings and records as inline parsing"""
+    page_parser = PageParser()
+    pool = ParsePool(page_parser, workers=1).start()
+    records = []
+    try:
+        for name, page_url, html in load_listing_fixtures():
+            expected = page_parser.parse_listing_page(page_url, html)
+            listing = pool.parse_listing_page(page_url, html)
+            assert listing.skin_links == expected.skin_links, name
+            assert listing.candidate_count == expected.candidate_count, name
+            assert listing.page_links == expected.page_links, name
+
+        for name, skin_url, body, expected in load_skin_fixtures():
+            pool.parse_skin_details(skin_url, body, records.append, pytest.fail)
+        pool.wait()
+    finally:
+        pool.shutdown()
+
+    for record in records:
+        record.pop('scraped_at')
+    expected = sorted((fixture[3] for fixture in load_skin_fixtures()), key=lambda record: record['url'])
+    assert sorted(records, key=lambda record: record['url']) == expected
+
+
+def test_rate_limiter_budget_is_steady_bursty_and_per_host():
+    """One request per `delay` after the burst, reservations in arrival order, one bucket per host"""
+    limiter = HostRateLimiter.from_delay(10)
+    bucket = limiter.bucket_for('https://visualskins.com/skin/a')
+    assert limiter.bucket_for('https://VISUALSKINS.com/tag/b/') is bucket
+    assert limiter.bucket_for('https://example.com/') is not bucket
+    waits = [bucket.reserve() for _ in range(4)]
+    assert waits[0] == 0 and [round(wait, 2) for wait in waits[1:]] == [10.0, 20.0, 30.0]
+
+    bursty = HostRateLimiter.from_delay(10, burst=3).bucket_for('https://visualskins.com/')
+    assert [round(bursty.reserve(), 2) for _ in range(4)] == [0, 0, 0, 10.0]
+    assert [HostRateLimiter.from_delay(0).bucket_for('https://visualskins.com/').reserve() for _ in range(3)] == [0, 0, 0]
+
+    # Threads share one bucket; with coroutines mixed in, four requests still need three intervals
+    shared = HostRateLimiter.from_delay(10)
+    waits = []
+    threads = [threading.Thread(target=lambda: waits.append(shared.bucket_for('https://visualskins.com/').reserve()))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert [round(wait, 2) for wait in sorted(waits)] == [0, 10.0, 20.0, 30.0]
+
+    fast = HostRateLimiter.from_delay(0.05)
+
+    async def four_requests():
+        await asyncio.gather(*(fast.acquire_async('https://visualskins.com/') for _ in range(2)),
+                             *(asyncio.to_thread(fast.acquire, 'https://visualskins.com/') for _ in range(2)))
+    started = time.monotonic()
+    asyncio.run(four_requests())
+    assert time.monotonic() - started >= 0.14
+
+    # Crawls drawing from a shared parent budget together keep to the parent's rate
+    site = HostRateLimiter.from_delay(0.05)
+    jobs = [HostRateLimiter.from_delay(0, parent=site), HostRateLimiter.from_delay(0, parent=site)]
+    started = time.monotonic()
+    assert all(jobs[number % 2].acquire('https://visualskins.com/') for number in range(4))
+    assert time.monotonic() - started >= 0.14
+
+    # Waiting for a slot ends early once the crawl is cancelled
+    token = CancelToken()
+    limiter = HostRateLimiter.from_delay(10)
+    assert limiter.acquire('https://visualskins.com/', token)
+    threading.Timer(0.05, token.cancel).start()
+    started = time.monotonic()
+    assert not limiter.acquire('https://visualskins.com/', token)
+    assert time.monotonic() - started < 1
+    assert not limiter.acquire('https://visualskins.com/', token)
+
+
+def test_rate_limiter_gives_back_the_slots_of_cancelled_waits():
+    """Cancelled threads and coroutines return their tokens to the job's bucket and the shared parent"""
+    url = 'https://visualskins.com/'
+    site = HostRateLimiter.from_delay(10)
+    job = HostRateLimiter.from_delay(10, parent=site)
+    site.bucket_for(url).reserve()  # Another job holds the site's only token
+    token = CancelToken()
+    token.cancel()
+    assert not job.acquire(url, token)
+    assert job.bucket_for(url).reserve() == 0
+    assert round(site.bucket_for(url).reserve()) == 10
+
+    async def cancelled_wait(limiter):
+        task = asyncio.create_task(limiter.acquire_async(url))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    site = HostRateLimiter.from_delay(10)
+    job = HostRateLimiter.from_delay(10, parent=site)
+    site.bucket_for(url).reserve()
+    asyncio.run(cancelled_wait(job))
+    assert job.bucket_for(url).reserve() == 0
+    assert round(site.bucket_for(url).reserve()) == 10
+
+
+def test_retry_policy_classifies_statuses_and_caps_waits():
+    """Statuses map to failure classes; Retry-After (seconds or HTTP-date) and backoff are capped"""
+    policy = RetryPolicy(max_attempts=3, base_delay=1.0, max_delay=8.0, jitter=0.5, max_retry_after=120.0)
+    statuses = (None, 404, 410, 403, 408, 425, 429, 503, 500, 502)
+    assert [policy.classify(status) for status in statuses] == [
+        TRANSIENT, PERMANENT, PERMANENT, PERMANENT, TRANSIENT, TRANSIENT, THROTTLED, THROTTLED, TRANSIENT, TRANSIENT]
+    assert not policy.should_retry(PERMANENT, 0)
+    assert policy.should_retry(THROTTLED, 1) and not policy.should_retry(TRANSIENT, 2)
+
+    for attempt in range(8):
+        ceiling = min(8.0, 2.0 ** attempt)
+        assert ceiling * 0.5 <= policy.backoff(attempt) <= ceiling
+
+    in_30s = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert policy.retry_after({'Retry-After': '7'}) == 7.0
+    assert 28 <= policy.retry_after({'Retry-After': in_30s}) <= 30
+    assert policy.retry_after({'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'}) == 0.0
+    assert policy.retry_after({'Retry-After': 'soon'}) is None
+    assert policy.retry_after({}) is None
+
+    assert policy.delay_for(0, THROTTLED, {'Retry-After': '3600'}) == 120.0
+    assert 0.5 <= policy.delay_for(0, THROTTLED, {}) <= 1.0
+    assert 0.5 <= policy.delay_for(0, TRANSIENT, {'Retry-After': '60'}) <= 1.0
+
+
+def fetch_async(scraper, urls):
+    """Fetch page bodies one after another through the async engine's fetch()"""
+    aiohttp = pytest.importorskip('aiohttp')
+    from scraper.async_engine import AsyncCrawlEngine
+
+    async def fetch_all():
+        crawl = AsyncCrawlEngine(scraper, concurrency=2)
+        crawl.semaphore = asyncio.Semaphore(2)
+        async with aiohttp.ClientSession() as session:
+            return [await crawl.fetch(session, url) for url in urls]
+    return asyncio.run(fetch_all())
+
+
+@pytest.mark.parametrize('engine', ['threads', 'async'])
+def test_cached_pages_are_revalidated_and_served_on_304(tmp_path, engine):
+    """A second run sends the stored validators, gets 304 and parses the cached body"""
+    cache = HttpCache(str(tmp_path / 'validators'))
+    assert not cache.store('https://visualskins.com/skin/a', b'body', {})
+    cache.store('https://visualskins.com/skin/a', b'body', {'Last-Modified': 'Wed, 21 Oct 2015 07:28:00 GMT'})
+    assert cache.conditional_headers('https://visualskins.com/skin/a') == {
+        'If-Modified-Since': 'Wed, 21 Oct 2015 07:28:00 GMT'}
+    assert cache.conditional_headers('https://visualskins.com/skin/b') == {}
+
+    metrics = CrawlMetrics()
+    records, cache_hits = [], []
+    with FixtureServer(FixtureSite(skins=5)) as server:
+        url = f'{server.base_url}/skin/skin-2'
+        for run in range(2):
+            scraper = RainmeterScraper(base_url=server.base_url, delay=0, engine=engine, metrics=metrics,
+                                       cache_dir=str(tmp_path / 'cache'), checkpoint_path=None)
+            if engine == 'threads':
+                record = scraper.extract_skin_details(url)
+            else:
+                record = scraper.parse_skin_details(url, fetch_async(scraper, [url])[0])
+            records.append({**record, 'scraped_at': None})
+            cache_hits.append(scraper.get_progress_stats()['cache_hits'])
+        assert 'If-None-Match' in scraper.http_cache.conditional_headers(url)
+
+    assert records[0] == records[1] and records[0]['url'] == url
+    assert cache_hits == [0, 1]
+    lines = metrics.render().splitlines()
+    assert 'scraper_http_responses_total{status="200"} 1' in lines
+    assert 'scraper_http_responses_total{status="304"} 1' in lines
+
+
+@pytest.mark.parametrize('engine', ['threads', 'async'])
+def test_failed_urls_carry_the_failure_class(engine):
+    """A 404 fails at once as permanent; a host answering 503 is retried, then failed as throttled"""
+    with FixtureServer(FixtureSite(skins=5)) as up, FixtureServer(FixtureSite(skins=5, error_rate=1.0)) as down:
+        scraper = RainmeterScraper(base_url=up.base_url, delay=0, max_retries=2, engine=engine,
+                                   cache_dir=None, checkpoint_path=None)
+        urls = [f'{up.base_url}/skin/skin-99', f'{down.base_url}/skin/skin-1']
+        if engine == 'threads':
+            assert [scraper.get_page(url) for url in urls] == [None, None]
+        else:
+            assert fetch_async(scraper, urls) == [None, None]
+
+    assert [(failure['url'], failure['failure_class'], failure['status']) for failure in scraper.failed_urls] == [
+        (urls[0], PERMANENT, 404), (urls[1], THROTTLED, 503)]
+    stats = scraper.get_progress_stats()
+    assert (stats['permanent_failures'], stats['throttled_failures'], stats['retry_count']) == (1, 1, 1)
+
+
+def test_circuit_breaker_cooldown_doubles_until_a_full_healthy_window():
+    """A single successful probe between trips keeps the doubled cool-down; a healthy window resets it"""
+    breaker = CircuitBreaker(window=4, min_requests=4, failure_threshold=0.5, cooldown=0.05, max_cooldown=0.15)
+    assert [breaker.record(False) for _ in range(4)] == [False, False, False, True]
+    assert 0 < breaker.wait_time() <= 0.05 and breaker.cooldown == 0.1
+    time.sleep(breaker.wait_time())
+
+    assert not breaker.record(True)
+    assert breaker.cooldown == 0.1
+    assert [breaker.record(False) for _ in range(2)] == [False, False]
+    assert breaker.trips == 1
+    breaker.record(False)
+    assert breaker.trips == 2 and 0.05 < breaker.wait_time() <= 0.1 and breaker.cooldown == 0.15
+    time.sleep(breaker.wait_time())
+
+    for _ in range(3):
+        breaker.record(True)
+    assert breaker.cooldown == 0.15
+    breaker.record(True)
+    assert breaker.cooldown == 0.05
+
+
+def test_sitemap_reader_follows_gzipped_index_and_lastmod():
+    """Sitemap indexes are followed and only skin URLs are yielded, with their lastmod"""
+    reader = SitemapReader('https://visualskins.com')
+    reader.read_robots('User-agent: *\nDisallow: /wp-admin/\nSitemap: https://visualskins.com/sitemap_index.xml\n')
+    assert reader.next_sitemap() == 'https://visualskins.com/sitemap_index.xml'
+
+    index = (b'<?xml version="1.0"?><sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+             b'<sitemap><loc>https://visualskins.com/skins.xml.gz</loc></sitemap></sitemapindex>')
+    assert list(reader.read('https://visualskins.com/sitemap_index.xml', index)) == []
+    assert reader.next_sitemap() == 'https://visualskins.com/skins.xml.gz'
+
+    urlset = gzip.compress(
+        b'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        b'<url><loc>https://visualskins.com/skin/mond</loc><lastmod>2024-03-01</lastmod></url>'
+        b'<url><loc>https://visualskins.com/tag/clock/</loc></url>'
+        b'<url><loc>https://visualskins.com/skin/neon-bars</loc></url></urlset>'
+    )
+    entries = list(reader.read('https://visualskins.com/skins.xml.gz', urlset))
+    assert [(entry.url, entry.lastmod) for entry in entries] == [
+        ('https://visualskins.com/skin/mond', datetime(2024, 3, 1)),
+        ('https://visualskins.com/skin/neon-bars', None),
+    ]
+    assert reader.next_sitemap() is None
+
+    # lastmod decides freshness for incremental crawls, regardless of max_age
+    index = DatasetIndex([{'url': 'https://visualskins.com/skin/mond', 'content_hash': 'x',
+                           'scraped_at': '2024-02-01T00:00:00'}], max_age=timedelta(days=7))
+    assert not index.is_fresh('https://visualskins.com/skin/mond', lastmod=datetime(2024, 3, 1))
+    assert index.is_fresh('https://visualskins.com/skin/mond', lastmod=datetime(2024, 1, 1))
+
+
+def test_dataset_index_freshness_and_merges():
+    """max_age applies without lastmod, max_age 0 refetches everything, merges keep the newest copy"""
+    now = datetime(2024, 3, 1)
+    records = [
+        {'url': 'u/recent', 'content_hash': 'a', 'scraped_at': '2024-02-28T00:00:00'},
+        {'url': 'u/old', 'content_hash': 'b', 'scraped_at': '2024-01-01T00:00:00'},
+        {'url': 'u/unhashed', 'content_hash': '', 'scraped_at': '2024-02-28T00:00:00'},
+        {'url': 'u/undated', 'content_hash': 'c', 'scraped_at': ''},
+        {'name': 'no url'},
+    ]
+    index = DatasetIndex(records, max_age=timedelta(days=7))
+    assert len(index) == 4 and 'u/recent' in index
+    assert [url for url in index.records if index.is_fresh(url, now=now)] == ['u/recent']
+    assert not index.is_fresh('u/missing', now=now)
+    assert not DatasetIndex(records, max_age=timedelta(days=0)).is_fresh('u/recent', now=now)
+
+    index.merge_newest([
+        {'url': 'u/recent', 'content_hash': 'stale', 'scraped_at': '2024-02-01T00:00:00'},
+        {'url': 'u/old', 'content_hash': 'b2', 'scraped_at': '2024-02-29T00:00:00'},
+        {'url': 'u/new', 'content_hash': 'd', 'scraped_at': '2024-02-29T00:00:00'},
+        {'content_hash': 'no url'},
+    ])
+    assert {url: record['content_hash'] for url, record in index.records.items()} == {
+        'u/recent': 'a', 'u/old': 'b2', 'u/unhashed': '', 'u/undated': 'c', 'u/new': 'd'}
+
+    summary = {}
+    merged = list(index.merge([
+        {'url': 'u/recent', 'content_hash': 'a'},
+        {'url': 'u/old', 'content_hash': 'b3'},
+        {'url': 'u/added', 'content_hash': 'e'},
+    ], summary))
+    assert summary == {'added': 1, 'refreshed': 2, 'changed': 1}
+    assert [record['url'] for record in merged] == ['u/recent', 'u/old', 'u/added', 'u/unhashed', 'u/undated', 'u/new']
+    assert merged[1]['content_hash'] == 'b3'
+
+
+def test_record_sink_streams_records_and_exports(tmp_path):
+    """Records survive a torn final line, rewrites stream, and the JSON export matches json.dump"""
+    records = [fixture[3] for fixture in load_skin_fixtures()]
+    path = tmp_path / 'skins.ndjson'
+    sink = RecordSink(str(path), flush_every=2).open()
+    for record in records:
+        sink.write(record)
+    sink.close()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"url": "https://visualskins.com/skin/torn"')  # Crash mid-write
+
+    sink = RecordSink(str(path)).open(append=True)
+    assert len(sink) == len(records)
+    assert list(sink) == records
+    sink.write(records[0])  # The record after a torn line must not be glued onto it
+    assert list(sink)[-1] == records[0]
+
+    sink.rewrite(lambda stored: (record for record in stored if record['url'] != records[0]['url']))
+    assert len(sink) == len(records) - 1
+    assert list(sink) == records[1:]
+    sink.close()
+
+    export_json(sink, str(tmp_path / 'skins.json'))
+    with open(tmp_path / 'skins.json', 'r', encoding='utf-8') as f:
+        exported = f.read()
+    assert exported == json.dumps(list(sink), indent=2, ensure_ascii=False)
+
+
+def test_crawl_journal_replays_past_a_torn_line_and_resumes(tmp_path):
+    """Replay ignores a torn final line, discovery_complete is restored, and resuming starts a fresh line"""
+    path = str(tmp_path / 'journal.jsonl')
+    journal = CrawlJournal(path, flush_every=2).open()
+    for url in ('u/a', 'u/b', 'u/c'):
+        journal.frontier(url)
+    journal.cursor('page-2')
+    state = CrawlJournal(path).load()
+    assert (state.frontier, state.cursor, state.discovery_complete) == (['u/a', 'u/b', 'u/c'], 'page-2', False)
+
+    journal.append('discovery_complete')
+    journal.close()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"type": "frontier", "url": "u/to')  # Crash mid-write
+
+    state = CrawlJournal(path).load()
+    assert state.frontier == ['u/a', 'u/b', 'u/c']
+    assert state.discovery_complete and not state.complete
+    state.done = {'u/b'}
+    assert state.pending == ['u/a', 'u/c']
+    assert state.seen_urls == {'u/a', 'u/b', 'u/c'}
+
+    journal = CrawlJournal(path).open(resume=True)
+    journal.failed('u/c')
+    journal.skipped('u/e')
+    journal.flush()
+    state = CrawlJournal(path).load()
+    state.done = {'u/b'}
+    assert (state.failed, state.skipped, state.pending) == ({'u/c'}, {'u/e'}, ['u/a'])
+    assert state.seen_urls == {'u/a', 'u/b', 'u/c', 'u/e'}
+    journal.frontier('u/d')
+    journal.append('complete')
+    journal.close()
+    state = CrawlJournal(path).load()
+    assert state.frontier == ['u/a', 'u/b', 'u/c', 'u/d'] and state.complete
+    with open(path, 'r', encoding='utf-8') as f:
+        assert all(json.loads(line) for line in f)
+
+    CrawlJournal(path).open().close()
+    assert CrawlJournal(path).load().frontier == []
+
+
+def test_dataset_store_saves_records_with_their_statistics(tmp_path):
+    """The store's records, summary and stats agree with the records written to it"""
+    records = [fixture[3] for fixture in load_skin_fixtures()]
+    store = DatasetStore(str(tmp_path / 'skins.db'))
+    assert store.replace(records) == len(records)
+    assert store.records() == [{**record, 'scraped_at': ''} for record in records]
+
+    saved = store.snapshot()[1]
+    summary = saved['summary']
+    assert summary['total_skins'] == len(records)
+    assert summary['unique_developers'] == len({record['developer'] for record in records if record['developer']})
+    assert summary['categories'] == sorted({record['category'] for record in records if record['category']})
+    assert saved['stats']['top_developers'] == {
+        developer: sum(record['developer'] == developer for record in records)
+        for developer in sorted({record['developer'] for record in records})
+    }
+    assert DatasetIndex.load(str(tmp_path / 'skins')).records.keys() == {record['url'] for record in records}
+
+    # Statistics are saved with the data and match the running totals of the record sink
+    sink = RecordSink(str(tmp_path / 'skins.ndjson')).open()
+    for record in records[1:]:
+        sink.write(record)
+    sink.close()
+    assert store.replace(sink) == len(records) - 1
+    assert store.snapshot()[1] == sink.stats.to_dict()
+
+
+def test_dataset_cache_reloads_only_when_the_store_changes(tmp_path):
+    """Reads share one snapshot until the store is rewritten or the cache is invalidated"""
+    records = [fixture[3] for fixture in load_skin_fixtures()]
+    store = DatasetStore(str(tmp_path / 'skins.db'))
+    store.replace(records)
+    cache = DatasetCache(store)
+
+    snapshot = cache.snapshot()
+    assert cache.snapshot() is snapshot and cache.loads == 1
+    in_category = [record for record in snapshot.records if record['category'] == records[0]['category']]
+    assert snapshot.search('', records[0]['category'], limit=2) == (in_category[:2], len(in_category))
+    assert snapshot.search('ZZZ') == ([], 0)
+
+    store.replace(records[1:])
+    assert len(cache.snapshot()) == len(records) - 1
+    assert cache.snapshot().summary == store.snapshot()[1]['summary']
+
+    cache.invalidate()
+    cache.snapshot()
+    assert cache.loads == 3
+
+    # A request still holding an older snapshot does not roll the shared search index back
+    old = cache.snapshot()
+    store.replace(records)
+    new = cache.snapshot()
+    new.sync_index()
+    old.sync_index()
+    assert len(cache.search_index) == len(records)
+    assert cache.search_index.update(records[1:], version=old.version) == (0, 0)
+    assert new.search(records[0]['name'])[1] >= 1
+
+
+def test_dataset_cache_snapshot_reads_records_and_stats_from_one_save(tmp_path, monkeypatch):
+    """A save landing between the record and statistics reads does not mix two data versions"""
+    records = [fixture[3] for fixture in load_skin_fixtures()]
+    store = DatasetStore(str(tmp_path / 'skins.db'))
+    store.replace(records)
+    read_meta = store._read_meta
+
+    def save_between_reads(conn, key):
+        if key == 'stats':
+            monkeypatch.undo()
+            store.replace(records[1:])
+        return read_meta(conn, key)
+
+    monkeypatch.setattr(store, '_read_meta', save_between_reads)
+    cache = DatasetCache(store)
+    snapshot = cache.snapshot()
+    assert len(snapshot) == snapshot.summary['total_skins'] == len(records)
+
+    cache.invalidate()
+    assert len(cache.snapshot()) == cache.snapshot().summary['total_skins'] == len(records) - 1
+
+
+def test_search_index_ranks_and_updates_incrementally():
+    """AND across terms, prefix on the last one, name/tags ranked above description, in-place updates"""
+    records = [
+        {'url': 'u/desc', 'name': 'Orbit', 'description': 'A weather skin with a clock', 'tags': 'weather', 'category': 'Weather'},
+        {'url': 'u/name', 'name': 'Clock Suite', 'description': 'Minimal desktop widgets', 'tags': 'time', 'category': 'Clock'},
+        {'url': 'u/tags', 'name': 'Mond', 'description': 'Elegant typography', 'tags': 'clock, date', 'category': 'Clock'},
+    ]
+    index = SearchIndex()
+    assert index.update(records) == (3, 0)
+
+    assert index.search('clock') == (['u/name', 'u/tags', 'u/desc'], 3)
+    assert index.search('clo') == (['u/name', 'u/tags', 'u/desc'], 3)
+    assert index.search('clock wea') == (['u/desc'], 1)
+    assert index.search('clock', category='Clock', limit=1, offset=1) == (['u/tags'], 2)
+    assert index.search('weather clocks') == ([], 0)
+    assert index.search('!!') == ([], 0)
+
+    changed = [dict(records[0], name='Clockwork'), records[1]]
+    assert index.update(changed) == (1, 1)
+    assert index.search('clockw') == (['u/desc'], 1)
+    assert index.search('mond') == ([], 0)
+
+
+def test_progress_events_send_full_state_then_coalesced_deltas():
+    """First event is the whole status, later ones only changed fields, several changes folded into one"""
+    state = {'is_running': True, 'scraped_count': 0, 'errors': [], 'estimated_time': None}
+    broadcaster = ProgressBroadcaster(lambda: dict(state), max_rate=1000, keepalive=0.01)
+    events = broadcaster.events()
+
+    assert json.loads(next(events)[len('data: '):]) == state
+    assert next(events) == ': keepalive\n\n'
+
+    for count in (1, 2, 3):
+        state['scraped_count'] = count
+        broadcaster.notify()
+    assert json.loads(next(events)[len('data: '):]) == {'scraped_count': 3}
+
+    broadcaster.notify()  # A change notification without any changed field sends nothing
+    state['errors'] = ['timeout']
+    broadcaster.notify()
+    assert json.loads(next(events)[len('data: '):]) == {'errors': ['timeout']}
+
+
+def test_crawl_metrics_render_prometheus_text():
+    """Cumulative histogram buckets, labelled counters, function gauges and queue wait times"""
+    metrics = CrawlMetrics()
+    metrics.record_response(200, 2000, ttfb=0.02, download=0.2)
+    metrics.record_response(304, 0, ttfb=0.03, download=0.0)
+    metrics.record_fetch_error(TimeoutError())
+    metrics.set_pool_size('scrape', 4)
+    with metrics.busy('scrape'):
+        assert metrics.workers_busy.get(pool='scrape') == 1
+
+    queue = TimedQueue(on_wait=lambda seconds: metrics.observe('queue_wait', seconds))
+    queue.put('https://example.com/skin/')
+    metrics.queue_depth.set_function(queue.qsize, queue='scrape')
+    assert 'scraper_queue_depth{queue="scrape"} 1' in metrics.render()
+    assert queue.get() == 'https://example.com/skin/'
+
+    lines = metrics.render().splitlines()
+    assert '# TYPE scraper_stage_duration_seconds histogram' in lines
+    assert 'scraper_stage_duration_seconds_bucket{stage="ttfb",le="0.025"} 1' in lines
+    assert 'scraper_stage_duration_seconds_bucket{stage="ttfb",le="+Inf"} 2' in lines
+    assert 'scraper_stage_duration_seconds_count{stage="queue_wait"} 1' in lines
+    assert 'scraper_response_size_bytes_count 1' in lines
+    assert 'scraper_http_responses_total{status="304"} 1' in lines
+    assert 'scraper_fetch_errors_total{error="TimeoutError"} 1' in lines
+    assert 'scraper_queue_depth{queue="scrape"} 0' in lines
+    assert 'scraper_workers{pool="scrape"} 4' in lines
+    assert 'scraper_worker_utilization_ratio{pool="scrape"} 0' in lines
+
+    # Pools of concurrent crawls add up, and a finished crawl takes its pool out again
+    remove = metrics.set_pool_size('scrape', 2)
+    with metrics.busy('scrape'), metrics.busy('scrape'), metrics.busy('scrape'):
+        assert metrics.workers.get(pool='scrape') == 6
+        assert 'scraper_worker_utilization_ratio{pool="scrape"} 0.5' in metrics.render().splitlines()
+    remove()
+    assert metrics.workers.get(pool='scrape') == 4
+
+
+def test_tracer_nests_spans_and_exports_chrome_and_otlp(tmp_path):
+    """Child spans point at their parent, failed spans carry the error, both formats are written"""
+    assert Tracer().span('fetch') is NOOP_SPAN
+
+    tracer = Tracer(enabled=True)
+    with tracer.span('fetch', url='https://example.com/', attempt=1) as fetch:
+        with tracer.span('rate_limit'):
+            pass
+        tracer.annotate(status=200, bytes=512)
+    with pytest.raises(ValueError):
+        with tracer.span('record_append'):
+            raise ValueError('disk full')
+    tracer.record('parse', started=1700000000.0, seconds=0.25, lane='parser-42', url='https://example.com/')
+
+    spans = {span.name: span for span in tracer.spans}
+    assert spans['rate_limit'].parent_id == fetch.span_id
+    assert spans['fetch'].attributes == {'url': 'https://example.com/', 'attempt': 1, 'status': 200, 'bytes': 512}
+    assert spans['record_append'].attributes['error'] == 'ValueError: disk full'
+
+    chrome = json.load(open(tracer.export(str(tmp_path / 'trace.json')), encoding='utf-8'))
+    parse = next(event for event in chrome['traceEvents'] if event['name'] == 'parse')
+    assert (parse['ph'], parse['ts'], parse['dur']) == ('X', 1700000000000000.0, 250000.0)
+    assert {'name': 'thread_name', 'ph': 'M', 'pid': parse['pid'], 'tid': parse['tid'],
+            'args': {'name': 'parser-42'}} in chrome['traceEvents']
+
+    otlp = json.load(open(tracer.export(str(tmp_path / 'trace.otlp.json'), 'otlp'), encoding='utf-8'))
+    exported = {span['name']: span for span in otlp['resourceSpans'][0]['scopeSpans'][0]['spans']}
+    assert exported['rate_limit']['parentSpanId'] == exported['fetch']['spanId']
+    assert {'key': 'status', 'value': {'intValue': '200'}} in exported['fetch']['attributes']
+    assert exported['record_append']['status'] == {'code': 2}
+    assert exported['parse']['endTimeUnixNano'] == str(1700000000250000000)
+
+
+def test_stage_profiler_merges_threads_and_survives_a_busy_profiler(tmp_path, monkeypatch):
+    """Concurrent threads of a stage are profiled (or counted as skipped on 3.12+) and dumped as one profile"""
+    profiler = StageProfiler(enabled=True)
+    together = threading.Barrier(2)
+
+    def work():
+        together.wait()
+        sum(range(10000))
+        together.wait()
+
+    threads = [threading.Thread(target=profiler.wrap('scrape', work)) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(profiler.profiles['scrape']) + profiler.skipped.get('scrape', 0) == 2
+    assert profiler.dump(str(tmp_path)) == [str(tmp_path / 'scrape.prof')]
+
+    # Python 3.12+ refuses a second active profiler; the block still runs, unprofiled
+    def busy(self):
+        raise ValueError('Another profiling tool is already active')
+    monkeypatch.setattr(cProfile.Profile, 'enable', busy)
+    with profiler.profile('discovery'):
+        with profiler.profile('scrape'):
+            ran = True
+    assert ran and 'discovery' not in profiler.profiles
+    assert profiler.skipped['discovery'] == 1
+
+
+@pytest.mark.parametrize('use_sitemaps', [True, False])
+def test_crawl_of_fixture_site_finds_every_skin(tmp_path, use_sitemaps):
+    """Both discovery paths reach every skin page of the synthetic site, retrying injected 503s"""
+    pytest.importorskip('aiohttp')
+    site = FixtureSite(skins=40, categories=2, per_page=5, sitemaps=use_sitemaps, error_rate=0.02)
+    assert site.render('/skin/skin-40') is None
+    assert 'page/4/' in site.render('/tag/weather/page/2/')
+
+    with FixtureServer(site) as server:
+        scraper = RainmeterScraper(base_url=server.base_url, delay=0, engine='async', parse_workers=0,
+                                   use_sitemaps=use_sitemaps, cache_dir=None, checkpoint_path=None)
+        scraper.scrape_all_skins(dataset_prefix=str(tmp_path / 'fixture'))
+
+    urls = {record['url'] for record in scraper.scraped_data}
+    assert urls == {f'{server.base_url}/skin/skin-{number}' for number in range(40)}
+    assert scraper.metrics.workers.get(pool='scrape') == 0
+    assert scraper.metrics.queue_depth.get(queue='scrape') == 0
+
+
+def test_replaying_an_archive_rebuilds_the_crawl_offline(tmp_path):
+    """A recorded crawl replays to the same records with the server gone"""
+    pytest.importorskip('aiohttp')
+    archive = str(tmp_path / 'crawl.warc.gz')
+    with FixtureServer(FixtureSite(skins=20, categories=2, per_page=5)) as server:
+        live = RainmeterScraper(base_url=server.base_url, delay=0, engine='async', parse_workers=0,
+                                cache_dir=None, checkpoint_path=None, archive_path=archive)
+        live.scrape_all_skins(dataset_prefix=str(tmp_path / 'live'))
+
+    # A later error for an archived page does not replace its successful response
+    writer = WebArchive(archive)
+    writer.record(f'{server.base_url}/skin/skin-3', 503, {}, b'')
+    writer.close()
+    reader = ArchiveReader(archive)
+    assert reader.base_url == server.base_url
+    assert reader.get(f'{server.base_url}/skin/skin-3').status_code == 200
+    assert reader.get(f'{server.base_url}/skin/skin-20') is None
+    reader.close()
+
+    # The site defaults to the one the archive was recorded from; a different one is refused
+    with pytest.raises(ValueError):
+        RainmeterScraper(base_url='https://visualskins.com', replay_path=archive)
+    replay = RainmeterScraper(delay=5, engine='async', parse_workers=0,
+                              cache_dir=None, checkpoint_path=None, replay_path=archive)
+    assert replay.base_url == server.base_url
+    replay.scrape_all_skins(dataset_prefix=str(tmp_path / 'replay'))
+    assert replay.replay._fd is None
+
+    def records(scraper):
+        return sorted(({**record, 'scraped_at': None} for record in scraper.scraped_data), key=lambda r: r['url'])
+    assert len(records(replay)) == 20
+    assert records(replay) == records(live)
+    assert replay.failed_urls == []
+
+
+def test_threads_engine_returns_as_soon_as_the_last_skin_is_scraped(tmp_path):
+    """The latch opens once discovery is closed and drained, so a small crawl has no idle tail"""
+    latch = CountdownLatch()
+    latch.add(2)
+    latch.done()
+    latch.close()
+    assert not latch.wait(0.01)
+    latch.done()
+    assert latch.is_open and latch.wait(0)
+
+    with FixtureServer(FixtureSite(skins=30, categories=2, per_page=10)) as server:
+        scraper = RainmeterScraper(base_url=server.base_url, delay=0, max_workers=4, parse_workers=0,
+                                   cache_dir=None, checkpoint_path=None)
+        started = time.monotonic()
+        scraper.scrape_all_skins(dataset_prefix=str(tmp_path / 'skins'))
+        assert time.monotonic() - started < 3
+
+    assert len(scraper.scraped_data) == 30 and not scraper.interrupted
+
+
+def test_threads_engine_error_cancels_and_releases_the_workers(tmp_path, monkeypatch):
+    """An error while the workers run cancels the crawl and stops every worker instead of leaking them"""
+    def broken_wait(latch, timeout=None):
+        raise RuntimeError('monitor failed')
+
+    with FixtureServer(FixtureSite(skins=30, categories=2, per_page=10)) as server:
+        scraper = RainmeterScraper(base_url=server.base_url, delay=0, max_workers=4, parse_workers=0,
+                                   cache_dir=None, checkpoint_path=None)
+        baseline = threading.active_count()
+        monkeypatch.setattr(CountdownLatch, 'wait', broken_wait)
+        scraper.scrape_all_skins(dataset_prefix=str(tmp_path / 'skins'))
+        deadline = time.monotonic() + 5
+        while threading.active_count() > baseline and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        assert threading.active_count() == baseline
+    assert scraper.interrupted and scraper.cancelled
+    assert scraper.cancel_token.reason == 'Error in parallel scraping: monitor failed'
+
+
+@pytest.mark.parametrize('engine', ['threads', 'async'])
+def test_cancelled_crawl_stops_promptly_and_resumes(tmp_path, engine):
+    """Cancelling mid-crawl releases the workers, keeps the records and leaves the journal resumable"""
+    pytest.importorskip('aiohttp')
+    site = FixtureSite(skins=200, categories=2, per_page=10, latency=0.05)
+    prefix, journal = str(tmp_path / 'skins'), str(tmp_path / 'journal.jsonl')
+    with FixtureServer(site) as server:
+        scraper = RainmeterScraper(base_url=server.base_url, delay=0, max_workers=4, engine=engine, concurrency=4,
+                                   parse_workers=0, cache_dir=None, checkpoint_path=journal)
+        crawl = threading.Thread(target=scraper.scrape_all_skins, kwargs={'dataset_prefix': prefix})
+        crawl.start()
+        while scraper.get_progress_stats()['scraped_count'] < 5 and crawl.is_alive():
+            time.sleep(0.05)
+        stopping = time.monotonic()
+        scraper.cancel('test')
+        crawl.join(10)
+        assert not crawl.is_alive() and time.monotonic() - stopping < 3
+
+        scraped = len(scraper.scraped_data)
+        assert scraper.interrupted and 5 <= scraped < 200
+        with open(f'{prefix}.ndjson', encoding='utf-8') as f:
+            assert len(f.readlines()) == scraped
+        assert not CrawlJournal(journal).load().complete
+
+        resumed = RainmeterScraper(base_url=server.base_url, delay=0, engine='async', concurrency=8,
+                                   parse_workers=0, cache_dir=None, checkpoint_path=journal)
+        resumed.scrape_all_skins(dataset_prefix=prefix, resume=True)
+
+    assert {record['url'] for record in resumed.scraped_data} == {
+        f'{server.base_url}/skin/skin-{number}' for number in range(200)}
+
+
+@pytest.mark.parametrize('engine', ['threads', 'async'])
+def test_resumed_crawl_does_not_fetch_missing_skins_or_sitemaps_again(tmp_path, engine):
+    """Skins that returned 404 and sitemaps that were read are journaled, so resuming fetches neither"""
+    pytest.importorskip('aiohttp')
+
+    class MissingSkinSite(FixtureSite):
+        def render(self, path):
+            return None if path == '/skin/skin-3' else super().render(path)
+
+    site = MissingSkinSite(skins=20, categories=2, per_page=5)
+    prefix, journal = str(tmp_path / 'skins'), str(tmp_path / 'journal.jsonl')
+    with FixtureServer(site) as server:
+        scraper = RainmeterScraper(base_url=server.base_url, delay=0, max_workers=4, engine=engine, concurrency=4,
+                                   parse_workers=0, cache_dir=None, checkpoint_path=journal)
+        scraper.scrape_all_skins(dataset_prefix=prefix)
+        assert len(scraper.scraped_data) == 19
+
+        # Crash before discovery and the run were journaled as finished
+        with open(journal, 'r', encoding='utf-8') as f:
+            lines = [line for line in f if json.loads(line)['type'] not in ('discovery_complete', 'complete')]
+        with open(journal, 'w', encoding='utf-8') as f:
+            f.writelines(lines)
+        state = CrawlJournal(journal).load()
+        assert state.failed == {f'{server.base_url}/skin/skin-3'} and state.cursor['sitemaps_done']
+
+        requests = site.requests
+        resumed = RainmeterScraper(base_url=server.base_url, delay=0, max_workers=4, engine=engine, concurrency=4,
+                                   parse_workers=0, cache_dir=None, checkpoint_path=journal)
+        resumed.scrape_all_skins(dataset_prefix=prefix, resume=True)
+        assert site.requests == requests
+    assert len(resumed.scraped_data) == 19 and not resumed.interrupted
+
+
+def test_job_manager_caps_running_jobs_and_bounds_the_queue(tmp_path):
+    """Jobs beyond the cap wait in FIFO order, a full queue refuses jobs, and each job keeps its own status"""
+    release = threading.Event()
+    started = []
+
+    def runner(job):
+        started.append(job.params['name'])
+        job.update(scraped_count=len(job.params['name']))
+        release.wait(5)
+        if job.params['name'] == 'broken':
+            raise RuntimeError('site down')
+
+    manager = JobManager(runner, max_running=2, max_queued=2, output_root=str(tmp_path))
+    full, incremental, broken, category = (manager.submit({'name': name})
+                                           for name in ('full', 'incremental', 'broken', 'category'))
+    with pytest.raises(JobQueueFull):
+        manager.submit({'name': 'one too many'})
+
+    assert [job.state for job in (full, incremental, broken, category)] == [RUNNING, RUNNING, QUEUED, QUEUED]
+    assert manager.cancel(category.id).state == CANCELLED
+    assert full.output_dir != incremental.output_dir
+    assert full.outputs['records'].startswith(str(tmp_path / full.id))
+
+    release.set()
+    for job in (full, incremental):
+        job.thread.join(5)
+    broken.thread.join(5)
+
+    assert sorted(started[:2]) == ['full', 'incremental'] and started[2:] == ['broken']
+    assert [job.state for job in (full, incremental, broken)] == [COMPLETED, COMPLETED, FAILED]
+    assert (full.progress()['scraped_count'], incremental.progress()['scraped_count']) == (4, 11)
+    assert broken.progress()['errors'] == ['site down']
+    assert manager.current() is broken
+    assert manager.active_jobs() == []